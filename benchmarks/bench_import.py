@@ -0,0 +1,74 @@
+"""
+Time how long importing gtfparse takes in a fresh interpreter, over and above
+starting Python itself, so that slow imports creeping back into
+`import gtfparse` are noticed.
+
+    python benchmarks/bench_import.py --repeats 20 --max-ms 20
+"""
+
+# ruff: noqa: S603, T201
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "import gtfparse": "import gtfparse",
+    "from gtfparse import ParsingError": "from gtfparse import ParsingError",
+    "from gtfparse import read_gtf": "from gtfparse import read_gtf",
+}
+
+
+def time_statement(statement: str, repeats: int) -> float:
+    """
+    Median milliseconds it takes to run `statement` in a new interpreter
+    """
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def slowest_imports(statement: str, n_modules: int) -> list[tuple[int, str]]:
+    """
+    The modules that took longest to import, with the microseconds they took
+    including their own imports, from `python -X importtime`
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():  # noqa: PLR2004
+            modules.append((int(fields[1]), fields[2].rstrip()))
+    return sorted(modules, reverse=True)[:n_modules]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--breakdown", type=int, default=0, help="show this many of the slowest imports")
+    parser.add_argument("--max-ms", type=float, help="exit with an error if `import gtfparse` takes longer")
+    args = parser.parse_args()
+
+    startup = time_statement("pass", args.repeats)
+    print(f"{'python startup':<36}{startup:>8.1f} ms")
+    extra = {}
+    for name, statement in STATEMENTS.items():
+        extra[name] = time_statement(statement, args.repeats) - startup
+        print(f"{name:<36}{extra[name]:>+8.1f} ms")
+        for microseconds, module in slowest_imports(statement, args.breakdown):
+            print(f"    {module:<32}{microseconds / 1000:>8.1f} ms")
+
+    if args.max_ms is not None and extra["import gtfparse"] > args.max_ms:
+        print(f"`import gtfparse` took longer than {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare `parse_gtf` against the way it used to read a GTF: per-cell
+`converters` for the core columns in `read_csv`, then repairing the
+'attribute', 'start' and 'end' columns one value at a time. Runs on a
+synthetic GTF (see synthetic_gtf.py) with millions of rows.
+
+    python benchmarks/bench_parse_gtf.py --rows 5000000
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from sys import intern
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+from loguru import logger
+from synthetic_gtf import FLAVORS, write_synthetic_gtf
+
+from gtfparse.read_gtf import fix_attribute_column, parse_frame, parse_gtf
+
+
+def parse_with_converters(filepath: Path) -> pd.DataFrame:
+    df = pd.read_csv(
+        filepath,
+        sep="\t",
+        comment="#",
+        names=["seqname", "source", "feature", "start", "end", "score", "strand", "frame", "attribute"],
+        skipinitialspace=True,
+        engine="c",
+        na_values=".",
+        converters={"frame": parse_frame, "seqname": intern, "source": intern, "feature": intern, "score": intern},
+        dtype={"start": np.int64, "end": np.int64, "strand": "category"},
+        low_memory=False,
+    )
+    df["attribute"] = df["attribute"].apply(fix_attribute_column)
+    df["start"] = df["start"].apply(np.nan_to_num).astype(np.int64)
+    df["end"] = df["end"].apply(np.nan_to_num).astype(np.int64)
+    return df
+
+
+def best_of(repeats: int, function, *args) -> tuple[float, pd.DataFrame]:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--flavor", choices=FLAVORS, default="ensembl")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.remove()
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / "synthetic.gtf"
+        write_synthetic_gtf(filepath, args.flavor, args.rows)
+
+        converters_seconds, old = best_of(args.repeats, parse_with_converters, filepath)
+        vectorized_seconds, new = best_of(args.repeats, lambda f: parse_gtf(f, chunksize=len(old) + 1), filepath)
+
+    pdt.assert_frame_equal(new, old)
+    print(f"rows:       {len(old):,}")
+    print(f"converters: {converters_seconds:.2f}s")
+    print(f"parse_gtf:  {vectorized_seconds:.2f}s")
+    print(f"speedup:    {converters_seconds / vectorized_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
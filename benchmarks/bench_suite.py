@@ -0,0 +1,285 @@
+"""
+Time the main paths through gtfparse on synthetic Ensembl, RefSeq and
+StringTie shaped GTFs (see synthetic_gtf.py) of several sizes, recording
+rows/s and peak memory of each, and save the results as JSON so that runs
+from different releases or machines can be compared.
+
+    python benchmarks/bench_suite.py --sizes 10k 1M --output before.json
+    python benchmarks/bench_suite.py --sizes 10k 1M --output after.json --compare before.json
+
+Every run of a case happens in a fresh process, so that neither its time
+nor its memory use depends on what ran before it. Generated GTFs are written
+to a temporary directory unless `--data-dir` is given, in which case they're
+kept there and reused by later runs. The 10M row files are several gigabytes
+and need tens of gigabytes of memory to expand.
+"""
+
+# ruff: noqa: T201
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from synthetic_gtf import FLAVORS, write_synthetic_gtf
+
+from gtfparse.create_missing_features import create_missing_features
+from gtfparse.read_gtf import parse_gtf, parse_gtf_and_expand_attributes, read_gtf
+from gtfparse.stats import ParseStats, peak_rss
+from gtfparse.synthesize_features import synthesize_features
+from gtfparse.write_gtf import df_to_gtf
+
+DEFAULT_SIZES = ["10k", "1M", "10M"]
+
+USECOLS = ["seqname", "feature", "start", "end", "strand", "gene_id", "transcript_id"]
+
+MISSING_FEATURE_KEYS = {"gene": "gene_id", "transcript": "transcript_id"}
+
+# how often memory use is sampled while a case runs
+MEMORY_SAMPLE_SECONDS = 0.005
+
+_SUFFIXES = {"k": 1_000, "M": 1_000_000, "G": 1_000_000_000}
+
+
+def parse_size(size: str) -> int:
+    if size[-1] in _SUFFIXES:
+        return int(float(size[:-1]) * _SUFFIXES[size[-1]])
+    return int(size)
+
+
+def current_rss() -> int | None:
+    """
+    Resident set size of this process in bytes, where /proc has it
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class PeakMemory:
+    """
+    Largest increase in resident memory over the `with` block, sampled by a
+    background thread. Where the current RSS can't be read, falls back to
+    how much the peak RSS of the process grew, which misses anything below
+    an earlier peak.
+    """
+
+    def __enter__(self) -> "PeakMemory":
+        gc.collect()
+        self._sampled = current_rss() is not None
+        self.start = current_rss() if self._sampled else peak_rss()
+        self.peak = self.start
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _rss(self) -> int | None:
+        return current_rss() if self._sampled else peak_rss()
+
+    def _sample(self) -> None:
+        while not self._done.wait(MEMORY_SAMPLE_SECONDS):
+            self.peak = max(self.peak, self._rss() or 0)
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss() or 0)
+
+    @property
+    def increase(self) -> int | None:
+        return None if self.start is None else self.peak - self.start
+
+
+# Each case takes the GTF's path, its expanded DataFrame and a scratch
+# directory, and returns how many rows it handled
+def _parse(filepath: Path, df: pd.DataFrame, scratch: Path, stats: ParseStats) -> int:
+    return len(parse_gtf(filepath, stats=stats))
+
+
+def _parse_and_expand(filepath: Path, df: pd.DataFrame, scratch: Path, stats: ParseStats) -> int:
+    return len(parse_gtf_and_expand_attributes(filepath, stats=stats))
+
+
+def _read_usecols(filepath: Path, df: pd.DataFrame, scratch: Path, stats: ParseStats) -> int:
+    return len(read_gtf(filepath, usecols=USECOLS, stats=stats))
+
+
+def _create_missing(filepath: Path, df: pd.DataFrame, scratch: Path, stats: ParseStats) -> int:
+    create_missing_features(df, unique_keys=MISSING_FEATURE_KEYS)
+    return len(df)
+
+
+def _synthesize(filepath: Path, df: pd.DataFrame, scratch: Path, stats: ParseStats) -> int:
+    synthesize_features(df)
+    return len(df)
+
+
+def _write(filepath: Path, df: pd.DataFrame, scratch: Path, stats: ParseStats) -> int:
+    output = scratch / "written.gtf"
+    df_to_gtf(df, output, format="gtf")
+    output.unlink()
+    return len(df)
+
+
+CASES: dict[str, Callable[[Path, pd.DataFrame, Path, ParseStats], int]] = {
+    "parse_gtf": _parse,
+    "parse_gtf_and_expand_attributes": _parse_and_expand,
+    "read_gtf_usecols": _read_usecols,
+    "create_missing_features": _create_missing,
+    "synthesize_features": _synthesize,
+    "df_to_gtf": _write,
+}
+
+# cases run on the parsed GTF rather than on the file
+DATAFRAME_CASES = {"create_missing_features", "synthesize_features", "df_to_gtf"}
+
+
+def _in_new_process(function: Callable[..., Any], *args: object) -> Any:
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def _save_expanded(filepath: Path, frame_path: Path) -> None:
+    logger.remove()
+    parse_gtf_and_expand_attributes(filepath).to_pickle(frame_path)
+
+
+def _run_once(case: str, filepath: Path, frame_path: Path, scratch: Path) -> dict[str, object]:
+    logger.remove()
+    # unpickling leaves much less freed memory behind to be reused than
+    # parsing, which would hide some of the memory the case itself uses
+    df = pd.read_pickle(frame_path) if case in DATAFRAME_CASES else None  # noqa: S301
+    stats = ParseStats()
+    with PeakMemory() as memory:
+        started = time.perf_counter()
+        n_rows = CASES[case](filepath, df, scratch, stats)
+        seconds = time.perf_counter() - started
+    return {"rows": n_rows, "seconds": seconds, "peak_memory": memory.increase, "stages": stats.to_dict()["stages"]}
+
+
+def run_case(case: str, filepath: Path, frame_path: Path, scratch: Path, repeats: int) -> dict[str, object]:
+    """
+    Run a case `repeats` times, keeping the fastest time and the largest
+    memory increase
+    """
+    runs = [_in_new_process(_run_once, case, filepath, frame_path, scratch) for _ in range(repeats)]
+    fastest = min(runs, key=lambda run: run["seconds"])
+    memory = [run["peak_memory"] for run in runs if run["peak_memory"] is not None]
+    return {
+        "case": case,
+        "seconds": fastest["seconds"],
+        "rows_per_second": fastest["rows"] / fastest["seconds"] if fastest["seconds"] else None,
+        "peak_memory": max(memory) if memory else None,
+        "stages": fastest["stages"],
+    }
+
+
+def environment() -> dict[str, object]:
+    try:
+        gtfparse_version = version("gtfparse")
+    except PackageNotFoundError:
+        gtfparse_version = None
+    return {
+        "gtfparse": gtfparse_version,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "date": datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], max_slowdown: float | None) -> bool:
+    """
+    Print how long each case took relative to `baseline`, returning False if
+    any of them got slower by more than `max_slowdown` times
+    """
+    before = {(r["flavor"], r["rows"], r["case"]): r for r in baseline}
+    ok = True
+    print(f"\n{'case':<34}{'flavor':<11}{'rows':>11}{'before':>10}{'after':>10}{'ratio':>8}")
+    for result in results:
+        old = before.get((result["flavor"], result["rows"], result["case"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        slower = max_slowdown is not None and ratio > max_slowdown
+        ok &= not slower
+        print(
+            f"{result['case']:<34}{result['flavor']:<11}{result['rows']:>11,}"
+            f"{old['seconds']:>9.3f}s{result['seconds']:>9.3f}s{ratio:>7.2f}x{'  SLOWER' if slower else ''}"
+        )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="rows per GTF, e.g. 10k 1M 10M")
+    parser.add_argument("--flavors", nargs="+", choices=FLAVORS, default=list(FLAVORS))
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", type=Path, help="keep the generated GTFs here and reuse them")
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--compare", type=Path, help="results of an earlier run to compare against")
+    parser.add_argument("--max-slowdown", type=float, help="exit with an error if a case is this many times slower")
+    args = parser.parse_args()
+
+    # progress bars are left out of the output of the processes running cases
+    os.environ["TQDM_DISABLE"] = "1"
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or Path(tmp)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for flavor in args.flavors:
+            for n_rows in map(parse_size, args.sizes):
+                filepath = data_dir / f"{flavor}-{n_rows}-{args.seed}.gtf"
+                if not filepath.exists():
+                    print(f"generating {filepath.name}", file=sys.stderr)
+                    write_synthetic_gtf(filepath, flavor, n_rows, seed=args.seed)
+                frame_path = Path(tmp) / "expanded.pkl"
+                if DATAFRAME_CASES & set(args.cases):
+                    _in_new_process(_save_expanded, filepath, frame_path)
+                for case in args.cases:
+                    result = {
+                        "flavor": flavor,
+                        "rows": n_rows,
+                        "file_bytes": filepath.stat().st_size,
+                        **run_case(case, filepath, frame_path, Path(tmp), args.repeats),
+                    }
+                    results.append(result)
+                    memory = "-" if result["peak_memory"] is None else f"{result['peak_memory'] / 2**20:,.0f} MiB"
+                    print(
+                        f"{flavor:<10} {n_rows:>11,} {case:<34} {result['seconds']:>8.3f}s "
+                        f"{result['rows_per_second']:>12,.0f} rows/s {memory:>12}"
+                    )
+
+    args.output.write_text(json.dumps({"environment": environment(), "results": results}, indent=2))
+    print(f"saved results to {args.output}")
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())["results"]
+        if not compare(results, baseline, args.max_slowdown):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Synthetic GTFs shaped like the ones gtfparse is usually given: Ensembl
+releases, NCBI RefSeq annotations and StringTie assemblies. The same seed
+always produces the same file, so benchmark runs on different machines or
+releases read identical input.
+
+    python benchmarks/synthetic_gtf.py ensembl 1000000 ensembl.gtf
+"""
+
+# ruff: noqa: S311
+
+import argparse
+import random
+from collections.abc import Callable
+from pathlib import Path
+
+FLAVORS = ("ensembl", "refseq", "stringtie")
+
+CHROMOSOME_LENGTH = 250_000_000
+
+ENSEMBL_BIOTYPES = ["protein_coding"] * 6 + ["lncRNA", "lncRNA", "processed_pseudogene", "miRNA", "snRNA"]
+ENSEMBL_SOURCES = ["ensembl_havana", "havana", "ensembl"]
+ENSEMBL_TAGS = ["basic", "Ensembl_canonical", "CCDS", "MANE_Select"]
+REFSEQ_SOURCES = ["BestRefSeq", "Gnomon", "BestRefSeq%2CGnomon"]
+
+
+def _seqname(flavor: str, index: int) -> str:
+    if flavor == "ensembl":
+        names = [str(i) for i in range(1, 23)] + ["X", "Y", "MT"]
+        return names[index] if index < len(names) else f"KI{270000 + index}.1"
+    if flavor == "refseq":
+        return f"NC_{index + 1:06d}.11" if index < 24 else f"NW_{18654700 + index:09d}.1"  # noqa: PLR2004
+    return f"chr{index + 1}" if index < 22 else f"chrUn_{index}"  # noqa: PLR2004
+
+
+def _exons(rng: random.Random, start: int) -> list[tuple[int, int]]:
+    """
+    Exons of a transcript starting at `start`: 1 to 12 of them, with introns
+    of a few kilobases between them
+    """
+    exons = []
+    position = start
+    for _ in range(rng.choices(range(1, 13), weights=[6, 3, 3, 3, 2, 2, 2, 1, 1, 1, 1, 1])[0]):
+        end = position + rng.randint(50, 1500)
+        exons.append((position, end))
+        position = end + rng.randint(200, 8000)
+    return exons
+
+
+def _coding(exons: list[tuple[int, int]], strand: str) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    """
+    CDS pieces of a transcript, trimming 5'/3' UTRs from its ends, and the
+    UTR pieces that were trimmed off. As in Ensembl, the stop codon lies
+    just outside the CDS and the 3' UTR starts past it.
+    """
+    first, last = exons[0], exons[-1]
+    cds_start = min(first[0] + (first[1] - first[0]) // 3, last[1] - 1)
+    cds_end = max(last[1] - (last[1] - last[0]) // 3, cds_start + 1)
+    cds = [(max(start, cds_start), min(end, cds_end)) for start, end in exons if end >= cds_start and start <= cds_end]
+    left_end = cds_start - (4 if strand == "-" else 1)
+    right_start = cds_end + (4 if strand == "+" else 1)
+    utrs = [(start, min(end, left_end)) for start, end in exons if start <= left_end]
+    utrs += [(max(start, right_start), end) for start, end in exons if end >= right_start]
+    if strand == "-":
+        cds.reverse()
+    return cds, utrs
+
+
+def _attributes(pairs: list[tuple[str, str]]) -> str:
+    return " ".join(f'{key} "{value}";' for key, value in pairs)
+
+
+def _ensembl_gene(rng: random.Random, gene: int, seqname: str, start: int) -> list[str]:
+    strand = rng.choice("+-")
+    biotype = rng.choice(ENSEMBL_BIOTYPES)
+    source = rng.choice(ENSEMBL_SOURCES)
+    gene_pairs = [
+        ("gene_id", f"ENSG{gene:011d}"),
+        ("gene_version", str(rng.randint(1, 20))),
+        ("gene_name", f"GENE{gene}"),
+        ("gene_source", source),
+        ("gene_biotype", biotype),
+    ]
+    transcripts = []
+    for t in range(rng.randint(1, 4)):
+        exons = _exons(rng, start + rng.randint(0, 2000))
+        transcript_pairs = [
+            *gene_pairs,
+            ("transcript_id", f"ENST{gene:09d}{t:02d}"),
+            ("transcript_version", str(rng.randint(1, 10))),
+            ("transcript_name", f"GENE{gene}-{201 + t}"),
+            ("transcript_source", source),
+            ("transcript_biotype", biotype),
+            *[("tag", tag) for tag in rng.sample(ENSEMBL_TAGS, rng.randint(0, 2))],
+            ("transcript_support_level", str(rng.randint(1, 5))),
+        ]
+        transcripts.append((exons, transcript_pairs))
+    # genes span their transcripts
+    gene_start = min(exons[0][0] for exons, _ in transcripts)
+    gene_end = max(exons[-1][1] for exons, _ in transcripts)
+
+    lines = [f"{seqname}\t{source}\tgene\t{gene_start}\t{gene_end}\t.\t{strand}\t.\t{_attributes(gene_pairs)}"]
+    for t, (exons, transcript_pairs) in enumerate(transcripts):
+        prefix = f"{seqname}\t{source}"
+        transcript_attributes = _attributes(transcript_pairs)
+        lines.append(f"{prefix}\ttranscript\t{exons[0][0]}\t{exons[-1][1]}\t.\t{strand}\t.\t{transcript_attributes}")
+        ordered = exons if strand == "+" else exons[::-1]
+        for number, (exon_start, exon_end) in enumerate(ordered, start=1):
+            exon_attributes = _attributes([("exon_number", str(number)), ("exon_id", f"ENSE{gene:08d}{t}{number:02d}")])
+            lines.append(
+                f"{prefix}\texon\t{exon_start}\t{exon_end}\t.\t{strand}\t.\t{transcript_attributes} {exon_attributes}"
+            )
+        if biotype != "protein_coding":
+            continue
+        cds, utrs = _coding(exons, strand)
+        protein = _attributes([("protein_id", f"ENSP{gene:09d}{t:02d}"), ("protein_version", "1")])
+        for number, (cds_start, cds_end) in enumerate(cds, start=1):
+            lines.append(
+                f"{prefix}\tCDS\t{cds_start}\t{cds_end}\t.\t{strand}\t{number % 3}\t"
+                f'{transcript_attributes} exon_number "{number}"; {protein}'
+            )
+        start_codon = cds[0][0] if strand == "+" else cds[0][1] - 2
+        stop_codon = cds[-1][1] + 1 if strand == "+" else cds[-1][0] - 3
+        lines.append(
+            f"{prefix}\tstart_codon\t{start_codon}\t{start_codon + 2}\t.\t{strand}\t0\t{transcript_attributes}"
+        )
+        lines.append(f"{prefix}\tstop_codon\t{stop_codon}\t{stop_codon + 2}\t.\t{strand}\t0\t{transcript_attributes}")
+        for utr_start, utr_end in utrs:
+            five_prime = (utr_start < cds[0][0]) == (strand == "+")
+            feature = "five_prime_utr" if five_prime else "three_prime_utr"
+            lines.append(f"{prefix}\t{feature}\t{utr_start}\t{utr_end}\t.\t{strand}\t.\t{transcript_attributes}")
+    return lines
+
+
+def _refseq_gene(rng: random.Random, gene: int, seqname: str, start: int) -> list[str]:
+    strand = rng.choice("+-")
+    coding = rng.random() < 0.7  # noqa: PLR2004
+    source = rng.choice(REFSEQ_SOURCES)
+    symbol = f"LOC{100000 + gene}" if source == "Gnomon" else f"GENE{gene}"
+    xrefs = [("db_xref", f"GeneID:{100000 + gene}"), ("db_xref", f"HGNC:HGNC:{gene % 50000}")]
+    description = f"synthetic protein {gene}, member {gene % 7}"
+    transcripts = []
+    for t in range(rng.randint(1, 3)):
+        exons = _exons(rng, start + rng.randint(0, 2000))
+        accession = f"{'NM' if coding else 'NR'}_{gene:06d}.{t + 1}"
+        transcript_pairs = [
+            ("gene_id", symbol),
+            ("transcript_id", accession),
+            *xrefs,
+            ("gbkey", "mRNA" if coding else "ncRNA"),
+            ("gene", symbol),
+            ("product", f"{description}, transcript variant {t + 1}"),
+            ("transcript_biotype", "mRNA" if coding else "lnc_RNA"),
+        ]
+        transcripts.append((exons, accession, transcript_pairs))
+    gene_start = min(exons[0][0] for exons, _, _ in transcripts)
+    gene_end = max(exons[-1][1] for exons, _, _ in transcripts)
+
+    gene_pairs = [
+        ("gene_id", symbol),
+        ("transcript_id", ""),
+        *xrefs,
+        ("description", description),
+        ("gbkey", "Gene"),
+        ("gene", symbol),
+        ("gene_biotype", "protein_coding" if coding else "lncRNA"),
+    ]
+    prefix = f"{seqname}\t{source}"
+    lines = [f"{prefix}\tgene\t{gene_start}\t{gene_end}\t.\t{strand}\t.\t{_attributes(gene_pairs)}"]
+    for exons, accession, transcript_pairs in transcripts:
+        transcript_attributes = _attributes(transcript_pairs)
+        lines.append(f"{prefix}\ttranscript\t{exons[0][0]}\t{exons[-1][1]}\t.\t{strand}\t.\t{transcript_attributes}")
+        ordered = exons if strand == "+" else exons[::-1]
+        for number, (exon_start, exon_end) in enumerate(ordered, start=1):
+            lines.append(
+                f'{prefix}\texon\t{exon_start}\t{exon_end}\t.\t{strand}\t.\t{transcript_attributes} exon_number "{number}";'
+            )
+        if not coding:
+            continue
+        cds, _ = _coding(exons, strand)
+        protein_attributes = _attributes(
+            [
+                ("gene_id", symbol),
+                ("transcript_id", accession),
+                *xrefs,
+                ("gbkey", "CDS"),
+                ("gene", symbol),
+                ("product", description),
+                ("protein_id", f"NP_{gene:06d}.1"),
+            ]
+        )
+        for number, (cds_start, cds_end) in enumerate(cds, start=1):
+            lines.append(
+                f'{prefix}\tCDS\t{cds_start}\t{cds_end}\t.\t{strand}\t{number % 3}\t{protein_attributes} exon_number "{number}";'
+            )
+        start_codon = cds[0][0] if strand == "+" else cds[0][1] - 2
+        stop_codon = cds[-1][1] + 1 if strand == "+" else cds[-1][0] - 3
+        lines.append(f"{prefix}\tstart_codon\t{start_codon}\t{start_codon + 2}\t.\t{strand}\t0\t{protein_attributes}")
+        lines.append(f"{prefix}\tstop_codon\t{stop_codon}\t{stop_codon + 2}\t.\t{strand}\t0\t{protein_attributes}")
+    return lines
+
+
+def _stringtie_gene(rng: random.Random, gene: int, seqname: str, start: int) -> list[str]:
+    # assemblies have transcripts and exons only, no gene rows
+    strand = rng.choice("+-.")
+    lines = []
+    for t in range(rng.randint(1, 5)):
+        exons = _exons(rng, start + rng.randint(0, 2000))
+        coverage = rng.lognormvariate(1, 1.5)
+        fpkm = coverage * rng.uniform(0.2, 0.5)
+        transcript_attributes = _attributes([("gene_id", f"STRG.{gene}"), ("transcript_id", f"STRG.{gene}.{t + 1}")])
+        expression = _attributes([("cov", f"{coverage:.6f}"), ("FPKM", f"{fpkm:.6f}"), ("TPM", f"{fpkm * 1.8:.6f}")])
+        prefix = f"{seqname}\tStringTie"
+        lines.append(
+            f"{prefix}\ttranscript\t{exons[0][0]}\t{exons[-1][1]}\t1000\t{strand}\t.\t{transcript_attributes} {expression}"
+        )
+        for number, (exon_start, exon_end) in enumerate(exons, start=1):
+            lines.append(
+                f"{prefix}\texon\t{exon_start}\t{exon_end}\t1000\t{strand}\t.\t"
+                f'{transcript_attributes} exon_number "{number}"; cov "{coverage * rng.uniform(0.5, 1.5):.6f}";'
+            )
+    return lines
+
+
+GENE_WRITERS: dict[str, Callable[[random.Random, int, str, int], list[str]]] = {
+    "ensembl": _ensembl_gene,
+    "refseq": _refseq_gene,
+    "stringtie": _stringtie_gene,
+}
+
+HEADERS = {
+    "ensembl": ["#!genome-build GRCh38.p14", "#!genome-version GRCh38", "#!genebuild-last-updated 2023-03"],
+    "refseq": ["#gtf-version 2.2", "#!genome-build GRCh38.p14", "#!annotation-source NCBI RefSeq"],
+    "stringtie": ["# stringtie -p 8 -G annotation.gtf -o assembly.gtf sample.bam", "# StringTie version 2.2.1"],
+}
+
+
+def write_synthetic_gtf(filepath: Path, flavor: str, n_rows: int, seed: int = 0) -> None:
+    """
+    Write a GTF of exactly `n_rows` records of one of the `FLAVORS`, sorted
+    by position along a series of sequences
+    """
+    if flavor not in GENE_WRITERS:
+        msg = f"flavor must be one of {FLAVORS}, not {flavor!r}"
+        raise ValueError(msg)
+    write_gene = GENE_WRITERS[flavor]
+    rng = random.Random(seed)
+    position = 1
+    gene = 0
+    written = 0
+    with open(filepath, "w") as gtf:
+        gtf.write("\n".join(HEADERS[flavor]) + "\n")
+        while written < n_rows:
+            gene += 1
+            position += rng.randint(1000, 60_000)
+            seqname = _seqname(flavor, position // CHROMOSOME_LENGTH)
+            lines = write_gene(rng, gene, seqname, position % CHROMOSOME_LENGTH + 1)[: n_rows - written]
+            gtf.write("\n".join(lines) + "\n")
+            written += len(lines)
+            position += 100_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("flavor", choices=FLAVORS)
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_gtf(args.output, args.flavor, args.rows, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,22 +11,79 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from loguru import logger
+import sys
+from importlib import import_module
+from types import ModuleType
 
 # from gtfparse.logging import init_logger
 
-logger.disable(__name__)
+# Everything is imported the first time it's used, so that `import gtfparse`
+# doesn't have to import pandas, numpy, tqdm and loguru
+_EXPORTS = {
+    "create_missing_features": ("gtfparse.create_missing_features", "create_missing_features"),
+    "discover_attribute_keys": ("gtfparse.read_gtf", "discover_attribute_keys"),
+    "iter_gtf": ("gtfparse.read_gtf", "iter_gtf"),
+    "parse_gtf": ("gtfparse.read_gtf", "parse_gtf"),
+    "parse_gtf_and_expand_attributes": ("gtfparse.read_gtf", "parse_gtf_and_expand_attributes"),
+    "parse_frame": ("gtfparse.read_gtf", "parse_frame"),
+    "REQUIRED_COLUMNS": ("gtfparse.required_columns", "REQUIRED_COLUMNS"),
+    "ParsingError": ("gtfparse.parsing_error", "ParsingError"),
+    "read_gtf": ("gtfparse.read_gtf", "read_gtf"),
+    "read_gff3": ("gtfparse.gff3", "read_gff3"),
+    "setup_logging": ("gtfparse.logging", "init_logger"),
+    "df_to_gtf": ("gtfparse.write_gtf", "df_to_gtf"),
+    "logger": ("gtfparse._logger", "logger"),
+}
 
 __all__ = [
-    "create_missing_features",
-    "parse_gtf",
-    "parse_gtf_and_expand_attributes",
-    "parse_frame",
     "REQUIRED_COLUMNS",
     "ParsingError",
+    "create_missing_features",
+    "df_to_gtf",
+    "discover_attribute_keys",
+    "iter_gtf",
+    "parse_frame",
     "parse_gtf",
     "parse_gtf_and_expand_attributes",
+    "read_gff3",
     "read_gtf",
     "setup_logging",
-    "df_to_gtf",
 ]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORTS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(import_module(module_name), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
+
+
+class _Package(ModuleType):
+    """
+    Importing a submodule makes it an attribute of the package. For
+    `read_gtf` and `create_missing_features`, which share their names with
+    their modules, the attribute is bound to the function instead, as the
+    eager `from gtfparse.read_gtf import read_gtf` of earlier versions did,
+    so that the exported names are the functions whatever was imported first.
+    """
+
+    def __setattr__(self, name: str, value: object) -> None:
+        if name in _EXPORTS and isinstance(value, ModuleType) and value.__name__ == _EXPORTS[name][0]:
+            value = getattr(value, _EXPORTS[name][1])
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+if "loguru" in sys.modules:
+    # cheap when loguru is already there, and means logging can be turned on
+    # with `logger.enable("gtfparse")` as soon as gtfparse is imported
+    import_module("gtfparse._logger")
@@ -0,0 +1,16 @@
+"""
+The loguru logger used by gtfparse, with gtfparse's messages turned off
+until they're turned on with `logger.enable("gtfparse")`.
+
+loguru takes longer to import than the rest of `import gtfparse`, so rather
+than when the package is imported, gtfparse's messages are turned off when
+the first of its modules which logs anything is. If loguru was already
+imported by then, the package turns them off as it's imported instead, so
+`logger.enable("gtfparse")` can come right after `import gtfparse`.
+"""
+
+from loguru import logger
+
+logger.disable("gtfparse")
+
+__all__ = ["logger"]
@@ -0,0 +1,408 @@
+"""
+Building the result of `read_gtf` as a Polars DataFrame or a PyArrow Table
+instead of a pandas DataFrame.
+
+The text is split into fields by the same chunked reader as the pandas
+backend, so comments, malformed lines and the row filters behave exactly
+the same, but the columns of each chunk go straight into the native column
+type: the core fields are converted one chunk at a time and each expanded
+attribute column is gathered directly from the key/value pairs found by
+`expand_attributes.tokenize_attributes`, never passing through a pandas
+frame of attributes. Chunks are then concatenated natively.
+
+Rows in which an attribute key doesn't occur are null rather than "", and
+attribute columns whose values are all numbers become (nullable) float64,
+or int64 when every value is a whole number.
+"""
+
+from collections.abc import Iterable
+from importlib.util import find_spec
+from io import StringIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+import numpy as np
+import pandas as pd
+
+from gtfparse import expand_attributes
+from gtfparse._logger import logger
+from gtfparse.categorical import CATEGORICAL_COLUMNS, MAX_UNIQUE_FRACTION
+from gtfparse.required_columns import REQUIRED_COLUMNS
+from gtfparse.stats import ParseStats
+
+if TYPE_CHECKING:
+    import polars as pl
+    import pyarrow as pa
+
+# backend name -> the module it needs
+BACKENDS = {"pandas": "pandas", "polars": "polars", "arrow": "pyarrow"}
+
+STRING_COLUMNS = ["seqname", "source", "feature", "score"]
+
+
+def check_backend(backend: str) -> None:
+    """
+    Raise ValueError for an unknown backend, or ImportError if the library
+    it needs isn't installed
+    """
+    if backend not in BACKENDS:
+        msg = f"backend must be one of {tuple(BACKENDS)}, not {backend!r}"
+        raise ValueError(msg)
+    if find_spec(BACKENDS[backend]) is None:
+        msg = f"backend={backend!r} needs {BACKENDS[backend]}, which can be installed with `pip install {BACKENDS[backend]}`"
+        raise ImportError(msg)
+
+
+def _null_positions(positions: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    Indices which take value i to row positions[i], with -1 (null) in every
+    other row
+    """
+    indices = np.full(n_rows, -1, dtype=np.int64)
+    indices[positions] = np.arange(len(positions))
+    return indices
+
+
+class ArrowColumns:
+    """
+    Building PyArrow Tables
+    """
+
+    def __init__(self) -> None:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        self.pa = pa
+        self.pc = pc
+
+    def strings(self, values: np.ndarray) -> Any:
+        return self.pa.array(values, type=self.pa.string(), from_pandas=True)
+
+    def integers(self, values: np.ndarray) -> Any:
+        return self.pa.array(values, type=self.pa.int64())
+
+    def take(self, values: np.ndarray, indices: np.ndarray) -> Any:
+        """
+        values[indices] as strings, null where an index is -1
+        """
+        return self.strings(values).take(self.pa.array(indices, mask=indices < 0))
+
+    def table(self, columns: dict[str, Any]) -> Any:
+        return self.pa.table(columns)
+
+    def concat(self, tables: list[Any]) -> Any:
+        # columns missing from some of the tables are filled with nulls
+        return self.pa.concat_tables(tables, promote_options="default").combine_chunks()
+
+    def column_names(self, table: Any) -> list[str]:
+        return table.column_names
+
+    def n_rows(self, table: Any) -> int:
+        return table.num_rows
+
+    def set_column(self, table: Any, name: str, column: Any) -> Any:
+        if name in table.column_names:
+            return table.set_column(table.column_names.index(name), name, column)
+        return table.append_column(name, column)
+
+    def select(self, table: Any, names: list[str]) -> Any:
+        return table.select(names)
+
+    def is_string(self, table: Any, name: str) -> bool:
+        return self.pa.types.is_string(table.schema.field(name).type)
+
+    def n_unique(self, table: Any, name: str) -> int:
+        return len(self.pc.unique(table[name].drop_null()))
+
+    def contains(self, table: Any, name: str, value: str) -> bool:
+        return self.pc.any(self.pc.equal(table[name], value)).as_py() or False
+
+    def to_numeric(self, table: Any, name: str) -> Any:
+        try:
+            floats = self.pc.cast(table[name], self.pa.float64())
+        except (self.pa.ArrowInvalid, self.pa.ArrowNotImplementedError):
+            return table
+        try:
+            # a safe cast fails on any value with a fractional part
+            return self.set_column(table, name, self.pc.cast(floats, self.pa.int64()))
+        except self.pa.ArrowInvalid:
+            return self.set_column(table, name, floats)
+
+    def to_categorical(self, table: Any, name: str) -> Any:
+        return self.set_column(table, name, self.pc.dictionary_encode(table[name]))
+
+
+class PolarsColumns:
+    """
+    Building Polars DataFrames
+    """
+
+    def __init__(self) -> None:
+        import polars as pl
+
+        self.pl = pl
+
+    def strings(self, values: np.ndarray) -> Any:
+        return self.pl.Series(values=values, dtype=self.pl.String)
+
+    def integers(self, values: np.ndarray) -> Any:
+        return self.pl.Series(values=values, dtype=self.pl.Int64)
+
+    def take(self, values: np.ndarray, indices: np.ndarray) -> Any:
+        """
+        values[indices] as strings, null where an index is -1
+        """
+        return self.strings(values).gather(self.pl.Series(values=indices).replace(-1, None))
+
+    def table(self, columns: dict[str, Any]) -> Any:
+        return self.pl.DataFrame([column.alias(name) for name, column in columns.items()])
+
+    def concat(self, tables: list[Any]) -> Any:
+        # columns missing from some of the frames are filled with nulls
+        return self.pl.concat(tables, how="diagonal", rechunk=True)
+
+    def column_names(self, table: Any) -> list[str]:
+        return table.columns
+
+    def n_rows(self, table: Any) -> int:
+        return table.height
+
+    def set_column(self, table: Any, name: str, column: Any) -> Any:
+        return table.with_columns(column.alias(name))
+
+    def select(self, table: Any, names: list[str]) -> Any:
+        return table.select(names)
+
+    def is_string(self, table: Any, name: str) -> bool:
+        return table.schema[name] == self.pl.String
+
+    def n_unique(self, table: Any, name: str) -> int:
+        return table[name].drop_nulls().n_unique()
+
+    def contains(self, table: Any, name: str, value: str) -> bool:
+        return bool((table[name] == value).any())
+
+    def to_numeric(self, table: Any, name: str) -> Any:
+        column = table[name]
+        floats = column.cast(self.pl.Float64, strict=False)
+        if floats.null_count() != column.null_count():
+            return table
+        present = floats.drop_nulls()
+        if present.is_finite().all() and (present == present.floor()).all():
+            integers = floats.cast(self.pl.Int64, strict=False)
+            if integers.null_count() == floats.null_count():
+                return self.set_column(table, name, integers)
+        return self.set_column(table, name, floats)
+
+    def to_categorical(self, table: Any, name: str) -> Any:
+        return self.set_column(table, name, table[name].cast(self.pl.Categorical))
+
+
+def _columns(backend: str) -> ArrowColumns | PolarsColumns:
+    check_backend(backend)
+    return ArrowColumns() if backend == "arrow" else PolarsColumns()
+
+
+def _chunk_table(
+    builder: ArrowColumns | PolarsColumns,
+    chunk: pd.DataFrame,
+    expand_attribute_column: bool,
+    restrict_attribute_columns: list[str] | None,
+    attribute_pattern: Any,
+    stats: ParseStats,
+) -> Any:
+    """
+    One repaired chunk of `_iter_chunks` as a native table, with its
+    attributes expanded into columns if asked to
+    """
+    n_rows = len(chunk)
+    with stats.stage("build_columns") as stage:
+        stage.rows_in += n_rows
+        stage.rows_out += n_rows
+        columns = {name: builder.strings(chunk[name].to_numpy(dtype=object)) for name in STRING_COLUMNS}
+        columns["start"] = builder.integers(chunk["start"].to_numpy())
+        columns["end"] = builder.integers(chunk["end"].to_numpy())
+        strand = chunk["strand"].cat
+        columns["strand"] = builder.take(
+            strand.categories.to_numpy(dtype=object), strand.codes.to_numpy().astype(np.int64)
+        )
+        columns["frame"] = builder.integers(chunk["frame"].to_numpy())
+        columns = {name: columns[name] for name in REQUIRED_COLUMNS[:-1]}
+        attributes = chunk["attribute"].fillna("").to_numpy(dtype=object)
+        if not expand_attribute_column:
+            columns["attribute"] = builder.strings(attributes)
+            return builder.table(columns)
+
+    with stats.stage("expand_attributes") as stage:
+        stage.rows_in += n_rows
+        stage.rows_out += n_rows
+        rows, codes, key_names, values = expand_attributes.tokenize_attributes(attributes, attribute_pattern)
+        if restrict_attribute_columns is None:
+            column_names = key_names
+        else:
+            column_names = [k for k in restrict_attribute_columns if k in key_names]
+            folded = ~np.isin(codes, [key_names.index(k) for k in column_names])
+            folded_attributes = expand_attributes.fold_attribute_pairs(
+                rows[folded], codes[folded], key_names, values[folded], n_rows
+            )
+            columns["attribute"] = builder.strings(folded_attributes)
+
+        # the pairs of each key are contiguous once sorted by key, and still
+        # in row order
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.searchsorted(codes[order], np.arange(len(key_names) + 1))
+        for name in column_names:
+            code = key_names.index(name)
+            pairs = order[boundaries[code] : boundaries[code + 1]]
+            columns[name] = builder.take(values[pairs], _null_positions(rows[pairs], n_rows))
+        return builder.table(columns)
+
+
+def parse_gtf_native(
+    filepath_or_buffer: str | TextIO | Path,
+    backend: str,
+    chunksize: int = 1024 * 1024,
+    expand_attribute_column: bool = True,
+    restrict_attribute_columns: list[str] | None = None,
+    attribute_keys: Iterable[str] | None = None,
+    features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    stats: ParseStats | None = None,
+) -> "pl.DataFrame | pa.Table":
+    """
+    Parse a GTF into a Polars DataFrame (backend="polars") or a PyArrow
+    Table (backend="arrow"), expanding the 'attribute' column as
+    `parse_gtf_and_expand_attributes` does
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or buffer object
+
+    backend : str
+        "polars" or "arrow"
+
+    chunksize : int
+
+    expand_attribute_column : bool
+
+    restrict_attribute_columns : list of str or None
+        Only expand these keys, folding every other key/value pair back into
+        an 'attribute' column
+
+    attribute_keys : iterable of str or None
+        Only expand these keys, skipping every other key/value pair
+
+    features : set or None
+
+    seqnames : set or None
+
+    interval : tuple of (int, int) or None
+
+    stats : ParseStats or None
+    """
+    from gtfparse.read_gtf import _iter_chunks, _repair_columns
+
+    builder = _columns(backend)
+    stats = ParseStats() if stats is None else stats
+    attribute_pattern = None if attribute_keys is None else expand_attributes.attribute_pattern(attribute_keys)
+
+    tables = []
+    for chunk in _iter_chunks(
+        filepath_or_buffer, chunksize, features=features, seqnames=seqnames, interval=interval, stats=stats
+    ):
+        with stats.stage("repair") as stage:
+            stage.rows_in += len(chunk)
+            stage.rows_out += len(chunk)
+            chunk = _repair_columns(chunk)  # noqa: PLW2901
+        tables.append(
+            _chunk_table(builder, chunk, expand_attribute_column, restrict_attribute_columns, attribute_pattern, stats)
+        )
+
+    with stats.stage("concat") as stage:
+        table = builder.concat(tables)
+        stage.rows_in = stage.rows_out = builder.n_rows(table)
+        if expand_attribute_column:
+            for name in builder.column_names(table):
+                if name not in REQUIRED_COLUMNS:
+                    table = builder.to_numeric(table, name)
+    return table
+
+
+def read_gtf_native(
+    filepath_or_buffer: str | TextIO | Path,
+    backend: str,
+    expand_attribute_column: bool = True,
+    infer_biotype_column: bool = False,
+    usecols: list[str] | None = None,
+    restrict_attribute_columns: list[str] | None = None,
+    attribute_keys: list[str] | None = None,
+    features: set[str] | None = None,
+    chunksize: int = 1024 * 1024,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    categorical: bool | Iterable[str] = False,
+    region: str | None = None,
+    stats: ParseStats | None = None,
+) -> "pl.DataFrame | pa.Table":
+    """
+    The non-pandas half of `read_gtf`, whose options (already checked and
+    resolved into `restrict_attribute_columns`/`attribute_keys` from
+    `usecols`) it takes
+    """
+    builder = _columns(backend)
+    stats = ParseStats() if stats is None else stats
+
+    source = filepath_or_buffer
+    if region is not None:
+        from gtfparse import tabix
+
+        logger.info(f"Reading {region} from {filepath_or_buffer}")
+        with stats.stage("region_fetch") as stage:
+            lines = list(tabix.fetch_region(filepath_or_buffer, region))
+            stage.rows_out = len(lines)
+        source = StringIO("".join(lines))
+
+    table = parse_gtf_native(
+        source,
+        backend,
+        chunksize=chunksize,
+        expand_attribute_column=expand_attribute_column,
+        restrict_attribute_columns=restrict_attribute_columns,
+        attribute_keys=attribute_keys,
+        features=features,
+        seqnames=seqnames,
+        interval=interval,
+        stats=stats,
+    )
+
+    with stats.stage("finish") as stage:
+        stage.rows_in = stage.rows_out = builder.n_rows(table)
+        # see `read_gtf`
+        if infer_biotype_column and builder.contains(table, "source", "protein_coding"):
+            column_names = builder.column_names(table)
+            for name in ("gene_biotype", "transcript_biotype"):
+                if name not in column_names:
+                    logger.info(f"Using column 'source' to replace missing '{name}'")
+                    table = builder.set_column(table, name, table["source"])
+
+        if categorical:
+            if categorical is True:
+                max_unique = MAX_UNIQUE_FRACTION * builder.n_rows(table)
+                columns = [
+                    name
+                    for name in builder.column_names(table)
+                    if builder.is_string(table, name)
+                    and (name in CATEGORICAL_COLUMNS or builder.n_unique(table, name) <= max_unique)
+                ]
+            else:
+                column_names = builder.column_names(table)
+                columns = [name for name in categorical if name in column_names and builder.is_string(table, name)]
+            for name in columns:
+                table = builder.to_categorical(table, name)
+
+        if usecols is not None:
+            column_names = builder.column_names(table)
+            table = builder.select(table, [c for c in usecols if c in column_names])
+
+    return table
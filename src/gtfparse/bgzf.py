@@ -0,0 +1,245 @@
+"""
+BGZF ("blocked gzip") is the compression used by bgzip, tabix and samtools:
+a series of gzip members, each holding at most 64 KiB of data and recording
+its own compressed size in a 'BC' extra field, followed by an empty member
+that marks the end of the file. Any gzip reader can read it, and because
+every block can be found and inflated on its own it can be indexed and read
+from the middle.
+"""
+
+import struct
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+# uncompressed bytes per block; the same as bgzip, which leaves room for the
+# header and for data which doesn't compress
+BGZF_BLOCK_SIZE = 0xFF00
+
+# the header up to and including the 'BC' subfield id and length, which is
+# followed by the block size minus one
+_BLOCK_HEADER = struct.pack("<4BI2BH2BH", 0x1F, 0x8B, 8, 4, 0, 0, 0xFF, 6, ord("B"), ord("C"), 2)
+BGZF_EOF = _BLOCK_HEADER + bytes.fromhex("1b0003000000000000000000")
+
+# the fixed part of a gzip member header, up to and including XLEN
+_GZIP_HEADER_SIZE = 12
+_GZIP_FOOTER_SIZE = 8
+
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """
+    Compress at most `BGZF_BLOCK_SIZE` bytes into a single BGZF block
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    block_size = len(_BLOCK_HEADER) + 2 + len(deflated) + 8
+    return b"".join(
+        [
+            _BLOCK_HEADER,
+            struct.pack("<H", block_size - 1),
+            deflated,
+            struct.pack("<2I", zlib.crc32(data), len(data)),
+        ]
+    )
+
+
+class BgzfWriter:
+    """
+    Binary file-like object which BGZF-compresses whatever is written to it
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or Path or binary file object
+        Where the compressed data goes. Files opened here are closed along
+        with the writer; buffers that were passed in are only flushed.
+
+    level : int
+        zlib compression level
+    """
+
+    def __init__(self, filepath_or_buffer: str | Path | BinaryIO, level: int = 6) -> None:
+        if isinstance(filepath_or_buffer, str | Path):
+            self._handle = open(filepath_or_buffer, "wb")
+            self._owns_handle = True
+        else:
+            self._handle = filepath_or_buffer
+            self._owns_handle = False
+        self._level = level
+        self._buffer = bytearray()
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        if len(self._buffer) >= BGZF_BLOCK_SIZE:
+            n_full = len(self._buffer) // BGZF_BLOCK_SIZE * BGZF_BLOCK_SIZE
+            self._write_blocks(bytes(self._buffer[:n_full]))
+            del self._buffer[:n_full]
+        return len(data)
+
+    def _write_blocks(self, data: bytes) -> None:
+        for offset in range(0, len(data), BGZF_BLOCK_SIZE):
+            self._handle.write(compress_block(data[offset : offset + BGZF_BLOCK_SIZE], self._level))
+
+    def flush(self) -> None:
+        """
+        Compress whatever is buffered into a (possibly short) block
+        """
+        if self._buffer:
+            self._write_blocks(bytes(self._buffer))
+            self._buffer.clear()
+        self._handle.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.flush()
+        self._handle.write(BGZF_EOF)
+        if self._owns_handle:
+            self._handle.close()
+        else:
+            self._handle.flush()
+        self.closed = True
+
+    def __enter__(self) -> "BgzfWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def read_raw_block(handle: BinaryIO) -> tuple[bytes, int] | None:
+    """
+    Read the BGZF block at the current position of `handle` without
+    inflating it
+
+    Returns
+    -------
+    The raw deflate data of the block and the size of the whole block in
+    the file, or None at the end of the file
+    """
+    header = handle.read(_GZIP_HEADER_SIZE)
+    if not header:
+        return None
+    if len(header) < _GZIP_HEADER_SIZE or header[:4] != _BLOCK_HEADER[:4]:
+        msg = "Not a BGZF file: expected a gzip member with an extra field"
+        raise ValueError(msg)
+    (extra_size,) = struct.unpack("<H", header[10:12])
+    extra = handle.read(extra_size)
+    block_size = None
+    position = 0
+    while position + 4 <= extra_size:
+        (subfield_size,) = struct.unpack("<H", extra[position + 2 : position + 4])
+        if extra[position : position + 2] == b"BC":
+            (block_size,) = struct.unpack("<H", extra[position + 4 : position + 6])
+            block_size += 1
+        position += 4 + subfield_size
+    if block_size is None:
+        msg = "Not a BGZF file: gzip member without a 'BC' block size"
+        raise ValueError(msg)
+    deflated = handle.read(block_size - _GZIP_HEADER_SIZE - extra_size - _GZIP_FOOTER_SIZE)
+    handle.read(_GZIP_FOOTER_SIZE)
+    return deflated, block_size
+
+
+def inflate_block(deflated: bytes) -> bytes:
+    return zlib.decompress(deflated, -15)
+
+
+class BgzfReader:
+    """
+    Binary file-like object reading a BGZF file one block at a time, which
+    can seek to the virtual offsets kept in tabix indexes: the offset of a
+    block in the file shifted left by 16 bits, plus an offset into the block
+    once it's inflated.
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or Path or binary file object
+        File to read. Files opened here are closed along with the reader.
+    """
+
+    def __init__(self, filepath_or_buffer: str | Path | BinaryIO) -> None:
+        if isinstance(filepath_or_buffer, str | Path):
+            self._handle = open(filepath_or_buffer, "rb")
+            self._owns_handle = True
+        else:
+            self._handle = filepath_or_buffer
+            self._owns_handle = False
+        self.closed = False
+        self._load_block(self._handle.tell())
+
+    def _load_block(self, address: int) -> None:
+        self._handle.seek(address)
+        block = read_raw_block(self._handle)
+        self._address = address
+        self._offset = 0
+        if block is None:
+            self._data = b""
+            self._next_address = address
+        else:
+            deflated, block_size = block
+            self._data = inflate_block(deflated)
+            self._next_address = address + block_size
+
+    def _next_block(self) -> bool:
+        """
+        Move on to the next block, returning False at the end of the file
+        """
+        if self._next_address == self._address:
+            return False
+        self._load_block(self._next_address)
+        return True
+
+    def seek(self, virtual_offset: int) -> None:
+        self._load_block(virtual_offset >> 16)
+        self._offset = virtual_offset & 0xFFFF
+
+    def tell(self) -> int:
+        """
+        Virtual offset of the next byte to be read
+        """
+        if self._offset >= len(self._data):
+            # like htslib, the end of a block is the start of the next one
+            return self._next_address << 16
+        return (self._address << 16) | self._offset
+
+    def read(self, size: int = -1) -> bytes:
+        pieces = []
+        while size != 0:
+            piece = self._data[self._offset :] if size < 0 else self._data[self._offset : self._offset + size]
+            pieces.append(piece)
+            self._offset += len(piece)
+            size -= len(piece) if size > 0 else 0
+            if size != 0 and self._offset >= len(self._data) and not self._next_block():
+                break
+        return b"".join(pieces)
+
+    def readline(self) -> bytes:
+        pieces = []
+        while True:
+            end = self._data.find(b"\n", self._offset)
+            if end >= 0:
+                pieces.append(self._data[self._offset : end + 1])
+                self._offset = end + 1
+                break
+            pieces.append(self._data[self._offset :])
+            self._offset = len(self._data)
+            if not self._next_block():
+                break
+        return b"".join(pieces)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while line := self.readline():
+            yield line
+
+    def close(self) -> None:
+        if not self.closed and self._owns_handle:
+            self._handle.close()
+        self.closed = True
+
+    def __enter__(self) -> "BgzfReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from itertools import pairwise
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from gtfparse._logger import logger
+
+# bump whenever the layout of a cache entry or the output of the parser changes
+CACHE_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024**3
+
+# A cache entry is a directory holding a 'meta.json' describing the columns and
+# one or more .npy files per column:
+#   numeric columns     -> {i}.npy
+#   nullable numeric columns (Int64, Float64, boolean) -> {i}.npy holding the
+#                          values and {i}.mask.npy marking the missing ones
+#   string/categorical  -> {i}.codes.npy, plus the dictionary of distinct values
+#                          as UTF-8 bytes ({i}.blob.npy) and the offsets at
+#                          which each one ends ({i}.offsets.npy)
+#   object columns mixing strings and numbers (e.g. an attribute with numbers
+#   in some rows and "" in the rest) -> {i}.codes.npy plus the distinct values
+#                          as JSON ({i}.values.json)
+# Plain .npy files need nothing beyond numpy to read and can be memory-mapped.
+META_FILE = "meta.json"
+
+# pandas' nullable arrays, stored as their values and a mask
+MASKED_ARRAYS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+_content_hashes: dict[tuple[str, int, int], str] = {}
+
+
+def content_hash(filepath: Path, block_size: int = 1 << 20) -> str:
+    """
+    BLAKE2b digest of a file's contents, remembered for as long as its path,
+    size and modification time stay the same
+    """
+    stat = filepath.stat()
+    fingerprint = (str(filepath.resolve()), stat.st_size, stat.st_mtime_ns)
+    if fingerprint not in _content_hashes:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(filepath, "rb") as f:
+            while block := f.read(block_size):
+                digest.update(block)
+        _content_hashes[fingerprint] = digest.hexdigest()
+    return _content_hashes[fingerprint]
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, set | frozenset):
+        return sorted(value)
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def cache_entry_path(cache_dir: str | Path, filepath: Path, options: dict[str, Any]) -> Path:
+    """
+    Directory in `cache_dir` for the result of parsing `filepath` with the
+    given options. The key covers the file's path, size, modification time
+    and contents as well as every option that changes the parsed result.
+    """
+    stat = filepath.stat()
+    key = {
+        "version": CACHE_FORMAT_VERSION,
+        "path": str(filepath.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content": content_hash(filepath),
+        "options": {name: _jsonable(value) for name, value in options.items()},
+    }
+    digest = hashlib.blake2b(json.dumps(key, sort_keys=True).encode(), digest_size=16).hexdigest()
+    return Path(cache_dir) / digest
+
+
+def _encode_strings(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def _decode_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    data = blob.tobytes()
+    bounds = [0, *offsets.tolist()]
+    return [data[start:end].decode("utf-8") for start, end in pairwise(bounds)]
+
+
+def save_cached_gtf(df: pd.DataFrame, entry: Path) -> None:
+    """
+    Write a parsed GTF to a cache entry directory. The entry is assembled
+    next to its final location and renamed into place, so readers never see
+    a partial entry.
+
+    Raises
+    ------
+    TypeError
+        If a column holds something other than numbers, booleans or strings
+    """
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{entry.name}.", dir=entry.parent))
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            column = df[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                codes = column.cat.codes.to_numpy()
+                categories = column.cat.categories.to_numpy(dtype=object)
+                kind = "category"
+            elif column.dtype == object:
+                codes, categories = pd.factorize(column.to_numpy(), use_na_sentinel=True)
+                kind = "string"
+            elif isinstance(column.array, MASKED_ARRAYS):
+                # nullable integers and floats, as values and a mask of which are missing
+                np.save(staging / f"{i}.npy", column.to_numpy(dtype=column.dtype.numpy_dtype, na_value=0))
+                np.save(staging / f"{i}.mask.npy", column.isna().to_numpy())
+                columns.append({"name": name, "kind": "masked", "dtype": str(column.dtype)})
+                continue
+            else:
+                np.save(staging / f"{i}.npy", column.to_numpy())
+                columns.append({"name": name, "kind": "numeric"})
+                continue
+            # store the codes with the dtype pandas picks for this many categories,
+            # so they can be memory-mapped without being converted
+            codes = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object)).codes
+            np.save(staging / f"{i}.codes.npy", codes)
+            if all(isinstance(value, str) for value in categories):
+                blob, offsets = _encode_strings(categories)
+                np.save(staging / f"{i}.blob.npy", blob)
+                np.save(staging / f"{i}.offsets.npy", offsets)
+            elif all(isinstance(value, str | int | float | np.number) for value in categories):
+                (staging / f"{i}.values.json").write_text(json.dumps([_jsonable(value) for value in categories]))
+            else:
+                msg = f"Column '{name}' holds values which aren't strings or numbers and can't be cached"
+                raise TypeError(msg)
+            columns.append({"name": name, "kind": kind, "ordered": kind == "category" and column.cat.ordered})
+
+        index = None
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            index = "index.npy"
+            np.save(staging / index, df.index.to_numpy())
+
+        meta = {"version": CACHE_FORMAT_VERSION, "n_rows": len(df), "index": index, "columns": columns}
+        (staging / META_FILE).write_text(json.dumps(meta))
+        try:
+            staging.rename(entry)
+        except OSError:
+            # another process got there first
+            shutil.rmtree(staging, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def load_cached_gtf(entry: Path, memory_map: bool = False) -> pd.DataFrame | None:
+    """
+    Read a parsed GTF back from a cache entry directory, or return None if
+    there's no (complete, current) entry there.
+
+    Parameters
+    ----------
+    entry : Path
+
+    memory_map : bool
+        Memory-map the column files instead of reading them. Numeric columns
+        (and the index) are then read-only views of the files and string
+        columns are returned as categoricals whose codes are too; only the
+        dictionaries of distinct strings are decoded into memory. Every
+        process that maps the same entry shares one copy of it through the
+        page cache.
+    """
+    mmap_mode = "r" if memory_map else None
+    try:
+        meta = json.loads((entry / META_FILE).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if meta.get("version") != CACHE_FORMAT_VERSION:
+        return None
+
+    data = {}
+    for i, column in enumerate(meta["columns"]):
+        if column["kind"] == "numeric":
+            data[column["name"]] = np.load(entry / f"{i}.npy", mmap_mode=mmap_mode)
+            continue
+        if column["kind"] == "masked":
+            array_type = pd.api.types.pandas_dtype(column["dtype"]).construct_array_type()
+            data[column["name"]] = array_type(
+                np.load(entry / f"{i}.npy", mmap_mode=mmap_mode), np.load(entry / f"{i}.mask.npy", mmap_mode=mmap_mode)
+            )
+            continue
+        values_file = entry / f"{i}.values.json"
+        if values_file.exists():
+            categories = json.loads(values_file.read_text())
+        else:
+            categories = _decode_strings(np.load(entry / f"{i}.blob.npy"), np.load(entry / f"{i}.offsets.npy"))
+        values = pd.Categorical.from_codes(
+            np.load(entry / f"{i}.codes.npy", mmap_mode=mmap_mode),
+            categories=pd.Index(categories, dtype=object),
+            ordered=column["ordered"],
+        )
+        if column["kind"] == "string" and not memory_map:
+            values = values.to_numpy(dtype=object)
+        data[column["name"]] = values
+
+    index = None if meta["index"] is None else np.load(entry / meta["index"], mmap_mode=mmap_mode)
+    # copy=False keeps pandas from consolidating (and so copying) the columns
+    df = pd.DataFrame(data, index=index, columns=[column["name"] for column in meta["columns"]], copy=False)
+
+    # entries are evicted least recently used first
+    os.utime(entry / META_FILE)
+    return df
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+
+def evict_cache(cache_dir: str | Path, max_bytes: int, keep: Path | None = None) -> list[Path]:
+    """
+    Delete the least recently used entries in `cache_dir` until the entries
+    take up no more than `max_bytes`.
+
+    Parameters
+    ----------
+    cache_dir : str or Path
+
+    max_bytes : int
+
+    keep : Path or None
+        Entry which is never evicted, e.g. the one that was just written
+
+    Returns
+    -------
+    The entries which were deleted
+    """
+    entries = []
+    for entry in Path(cache_dir).iterdir():
+        meta = entry / META_FILE
+        if entry.is_dir() and meta.exists():
+            entries.append((meta.stat().st_mtime_ns, _entry_size(entry), entry))
+
+    total = sum(size for _, size, _ in entries)
+    evicted = []
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and entry == keep:
+            continue
+        logger.info(f"Evicting {entry} from the GTF cache")
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        evicted.append(entry)
+    return evicted
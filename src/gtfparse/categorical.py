@@ -0,0 +1,59 @@
+from collections.abc import Iterable
+
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+# core columns which only ever take a handful of values
+CATEGORICAL_COLUMNS = ["seqname", "source", "feature", "strand"]
+
+# other string columns are made categorical when they have at most this many
+# distinct values per row
+MAX_UNIQUE_FRACTION = 0.5
+
+
+def low_cardinality_columns(df: pd.DataFrame, max_unique_fraction: float = MAX_UNIQUE_FRACTION) -> list[str]:
+    """
+    Names of the string columns of `df` which are among `CATEGORICAL_COLUMNS`
+    or have no more than `max_unique_fraction` distinct values per row
+    """
+    max_unique = max_unique_fraction * len(df)
+    return [
+        name
+        for name in df.columns
+        if df[name].dtype == object
+        and infer_dtype(df[name], skipna=True) in {"string", "empty"}
+        and (name in CATEGORICAL_COLUMNS or df[name].nunique() <= max_unique)
+    ]
+
+
+def to_categorical(
+    df: pd.DataFrame,
+    columns: Iterable[str] | None = None,
+    max_unique_fraction: float = MAX_UNIQUE_FRACTION,
+) -> pd.DataFrame:
+    """
+    Convert string columns to pandas Categoricals, which store each distinct
+    value once and an integer code per row.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+
+    columns : iterable of str or None
+        Columns to convert. If None, every column picked out by
+        `low_cardinality_columns` is converted.
+
+    max_unique_fraction : float
+        See `low_cardinality_columns`
+
+    Returns
+    -------
+    :class:~pd.DataFrame with the same columns and index as `df`
+    """
+    if columns is None:
+        columns = low_cardinality_columns(df, max_unique_fraction)
+    df = df.copy(deep=False)
+    for name in columns:
+        if name in df.columns and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = pd.Categorical(df[name])
+    return df
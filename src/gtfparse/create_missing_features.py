@@ -15,8 +15,10 @@
 from collections import OrderedDict
 from typing import Any
 
+import numpy as np
 import pandas as pd
-from loguru import logger
+
+from gtfparse._logger import logger
 
 
 def create_missing_features(
@@ -68,53 +70,56 @@ def create_missing_features(
             logger.info(f"Creating rows for missing feature '{feature_name}'")
 
             # don't include rows where the groupby key was missing
-            empty_key_values = dataframe[groupby_key].map(lambda x: x == "" or x is None)
-            row_groups = dataframe[~empty_key_values].groupby(groupby_key)
+            keys = dataframe[groupby_key]
+            empty_key_values = (keys.isna() | (keys == "")).to_numpy()
+            rows = dataframe[~empty_key_values]
 
             # Each group corresponds to a unique feature entry for which the
             # other columns may or may not be uniquely defined. Start off by
             # assuming the values for every column are missing and fill them in
             # where possible.
+            group_codes, feature_ids = pd.factorize(rows[groupby_key], sort=True)
+            n_groups = len(feature_ids)
+            row_groups = rows.groupby(group_codes, sort=True)
             feature_values = OrderedDict(
-                [(column_name, [missing_value] * row_groups.ngroups) for column_name in dataframe.columns]
+                [(column_name, [missing_value] * n_groups) for column_name in dataframe.columns]
             )
 
-            # User specifies which non-required columns should we try to infer
-            # values for
-            if extra_columns is not None:
-                feature_columns = list(extra_columns.get(feature_name, []))
-
-            for i, (feature_id, group) in enumerate(row_groups):
-                # fill in the required columns by assuming that this feature
-                # is the union of all intervals of other features that were
-                # tagged with its unique ID (e.g. union of exons which had a
-                # particular gene_id).
-                feature_values["feature"][i] = feature_name
-                feature_values[groupby_key][i] = feature_id
-                # set the source to 'gtfparse' to indicate that we made this
-                # entry up from other data
-                feature_values["source"][i] = "gtfparse"
-                feature_values["start"][i] = group["start"].min()
-                feature_values["end"][i] = group["end"].max()
-
-                # assume that seqname and strand are the same for all other
-                # entries in the GTF which shared this unique ID
-                feature_values["seqname"][i] = group["seqname"].iat[0]
-                feature_values["strand"][i] = group["strand"].iat[0]
-
-                # there's probably no rigorous way to set the values of
-                # 'score' or 'frame' columns so leave them empty
-                if extra_columns is not None:
-                    for column_name in feature_columns:
-                        if column_name not in existing_columns:
-                            msg = f"Column '{column_name}' does not exist in GTF, columns = {existing_columns}"
-                            raise ValueError(msg)
-
-                        # expect that all entries related to a reconstructed feature
-                        # are related and are thus within the same interval of
-                        # positions on the same chromosome
-                        unique_values = group[column_name].dropna().unique()
-                        if len(unique_values) == 1:
-                            feature_values[column_name][i] = unique_values[0]
+            # fill in the required columns by assuming that this feature
+            # is the union of all intervals of other features that were
+            # tagged with its unique ID (e.g. union of exons which had a
+            # particular gene_id).
+            feature_values["feature"] = [feature_name] * n_groups
+            feature_values[groupby_key] = list(feature_ids)
+            # set the source to 'gtfparse' to indicate that we made this
+            # entry up from other data
+            feature_values["source"] = ["gtfparse"] * n_groups
+            feature_values["start"] = row_groups["start"].min().tolist()
+            feature_values["end"] = row_groups["end"].max().tolist()
+
+            # assume that seqname and strand are the same for all other
+            # entries in the GTF which shared this unique ID
+            _, first_rows = np.unique(group_codes, return_index=True)
+            feature_values["seqname"] = list(rows["seqname"].to_numpy(dtype=object)[first_rows])
+            feature_values["strand"] = list(rows["strand"].to_numpy(dtype=object)[first_rows])
+
+            # there's probably no rigorous way to set the values of
+            # 'score' or 'frame' columns so leave them empty
+            if extra_columns is not None and n_groups:
+                for column_name in extra_columns.get(feature_name, []):
+                    if column_name not in existing_columns:
+                        msg = f"Column '{column_name}' does not exist in GTF, columns = {existing_columns}"
+                        raise ValueError(msg)
+
+                    # expect that all entries related to a reconstructed feature
+                    # are related and are thus within the same interval of
+                    # positions on the same chromosome, so a value is only
+                    # filled in when it's the only one in its group
+                    unique_value = (row_groups[column_name].nunique(dropna=True) == 1).to_numpy()
+                    first_values = row_groups[column_name].first().to_numpy()
+                    feature_values[column_name] = [
+                        value if unique else missing_value
+                        for unique, value in zip(unique_value, first_values, strict=True)
+                    ]
             extra_dataframes.append(pd.DataFrame(feature_values))
     return pd.concat([dataframe, *extra_dataframes], ignore_index=True)
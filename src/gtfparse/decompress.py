@@ -0,0 +1,162 @@
+"""
+Decompression of gzip and bgzip-compressed GTFs alongside parsing.
+
+BGZF files are a series of independently compressed blocks, so batches of
+blocks are inflated side by side in a thread pool (zlib releases the GIL
+while it works). Ordinary gzip files can only be inflated from start to end,
+which happens in a background thread. Either way the decompressed data is
+handed to the parser through a bounded queue, so that decompression and
+parsing overlap without the whole file being held in memory.
+"""
+
+import gzip
+import io
+import os
+import queue
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from gtfparse.bgzf import inflate_block, read_raw_block
+
+# BGZF blocks inflated per task, about 4 MiB of text
+BLOCKS_PER_BATCH = 64
+
+# pieces of decompressed data waiting to be parsed, per thread
+MAX_QUEUED = 4
+
+# size of the pieces read from a gzip file
+GZIP_READ_SIZE = 4 << 20
+
+GZIP_SUFFIXES = {".gz", ".bgz"}
+
+# every compression pandas infers from a suffix; the ones which aren't gzip
+# are decompressed by pandas itself
+COMPRESSED_SUFFIXES = GZIP_SUFFIXES | {".bz2", ".xz", ".zip", ".zst"}
+
+
+def is_bgzf(filepath: Path) -> bool:
+    """
+    Whether a file starts with a BGZF block, as written by bgzip
+    """
+    with open(filepath, "rb") as compressed:
+        header = compressed.read(18)
+    return header[:4] == b"\x1f\x8b\x08\x04" and header[12:14] == b"BC"
+
+
+def _inflate_batch(batch: list[bytes]) -> bytes:
+    return b"".join([inflate_block(deflated) for deflated in batch])
+
+
+def iter_bgzf(filepath: Path, n_threads: int | None = None) -> Iterator[bytes]:
+    """
+    Decompressed contents of a BGZF file, in order, a batch of blocks at a
+    time, with up to `MAX_QUEUED` batches per thread being inflated ahead of
+    whatever is reading them
+    """
+    n_threads = n_threads or os.cpu_count() or 1
+    with open(filepath, "rb") as compressed, ThreadPoolExecutor(max_workers=n_threads) as executor:
+        pending: deque[Future[bytes]] = deque()
+        while True:
+            batch = []
+            while len(batch) < BLOCKS_PER_BATCH and (block := read_raw_block(compressed)) is not None:
+                batch.append(block[0])
+            if batch:
+                pending.append(executor.submit(_inflate_batch, batch))
+            if pending and (not batch or len(pending) >= MAX_QUEUED * n_threads):
+                yield pending.popleft().result()
+            elif not batch:
+                return
+
+
+def iter_gzip(filepath: Path) -> Iterator[bytes]:
+    """
+    Decompressed contents of a gzip file, inflated by a background thread
+    which stays at most `MAX_QUEUED` pieces ahead of whatever is reading them
+    """
+    pieces: queue.Queue = queue.Queue(maxsize=MAX_QUEUED)
+    done = threading.Event()
+
+    def put(item: object) -> None:
+        while not done.is_set():
+            try:
+                pieces.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return
+
+    def inflate() -> None:
+        try:
+            with gzip.open(filepath, "rb") as decompressed:
+                while not done.is_set() and (piece := decompressed.read(GZIP_READ_SIZE)):
+                    put(piece)
+            put(None)
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=inflate, name=f"gunzip {filepath.name}", daemon=True)
+    thread.start()
+    try:
+        while (piece := pieces.get()) is not None:
+            if isinstance(piece, Exception):
+                raise piece
+            yield piece
+    finally:
+        # let the thread finish if we stopped reading early
+        done.set()
+        thread.join()
+
+
+class _IterReader(io.RawIOBase):
+    """
+    Binary file object reading the pieces of bytes that an iterator yields
+    """
+
+    def __init__(self, pieces: Iterator[bytes]) -> None:
+        self._pieces = pieces
+        self._piece = memoryview(b"")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer: memoryview) -> int:
+        while not self._piece:
+            piece = next(self._pieces, None)
+            if piece is None:
+                return 0
+            self._piece = memoryview(piece)
+        n_bytes = min(len(buffer), len(self._piece))
+        buffer[:n_bytes] = self._piece[:n_bytes]
+        self._piece = self._piece[n_bytes:]
+        self._position += n_bytes
+        return n_bytes
+
+    def close(self) -> None:
+        if not self.closed:
+            close = getattr(self._pieces, "close", None)
+            if close is not None:
+                close()
+        super().close()
+
+
+def open_decompressed(filepath: Path, n_threads: int | None = None) -> io.BufferedReader:
+    """
+    Open a gzip or bgzip-compressed file for reading its decompressed
+    contents, which are inflated in other threads while they're read
+
+    Parameters
+    ----------
+    filepath : Path
+
+    n_threads : int or None
+        Threads inflating the blocks of BGZF files, by default one per CPU.
+        Ordinary gzip files are always inflated by a single thread.
+    """
+    pieces = iter_bgzf(filepath, n_threads) if is_bgzf(filepath) else iter_gzip(filepath)
+    return io.BufferedReader(_IterReader(pieces), buffer_size=1 << 20)
@@ -0,0 +1,353 @@
+import re
+from collections.abc import Callable, Iterable
+from itertools import pairwise
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# number of attribute strings joined together and handed to a single regex scan
+ATTRIBUTE_BLOCK_ROWS = 1 << 16
+
+# The attribute column is tokenized in blocks: the attribute strings of a block
+# are joined with newlines and scanned once. Every newline or ';' produces a
+# match, so the row of each key/value pair can be recovered with a cumulative
+# sum over the newlines.
+#
+# Within a row, the attribute string is split on ';' (and any whitespace that
+# follows it) and only tokens containing exactly one whitespace or '=' separator
+# are kept. The key is everything before the first run of whitespace, '=' or ','
+# and the value is the next piece with surrounding double quotes removed, so
+# 'gene_id "ENSG01"' and 'gene_id=ENSG01' both become ("gene_id", "ENSG01").
+# Checking the separator count inside the regex is slow, so the separator and
+# whatever follows the value are captured and checked afterwards instead.
+_SPACE = r"[^\S\n]"
+_TOKEN_START = rf"([\n;])(?:(?<=;){_SPACE}*(?!{_SPACE})|(?<=\n))"
+_ANY_KEY = r"[^\s=,;]*"
+_SEPARATOR = rf"({_SPACE}+|=+|,+)"
+_VALUE = r'"*([^\s=,;"]*(?:"+[^\s=,;"]+)*)"*'
+_REST_OF_TOKEN = r"([^;\n]*)"
+_SEPARATOR_CHARACTER = re.compile(r"[\s=]")
+
+
+def attribute_pattern(keys: Iterable[str] | None = None) -> re.Pattern:
+    """
+    Compile the regular expression used to tokenize a block of attribute
+    strings. Each match is a (boundary, key, separator, value, rest) tuple,
+    with everything but the boundary left empty when the token following it
+    isn't a key/value pair.
+
+    Parameters
+    ----------
+    keys : iterable of str or None
+        If given, only pairs whose key is one of these are matched; all
+        others are skipped by the regex engine without being materialized.
+    """
+    if keys is None:
+        key = _ANY_KEY
+    else:
+        # longest first so that a key is never shadowed by one of its prefixes
+        key = "|".join(re.escape(k) for k in sorted(set(keys), key=len, reverse=True) if k)
+        if not key:
+            key = "(?!)"
+    return re.compile(rf"{_TOKEN_START}(?:({key}){_SEPARATOR}{_VALUE}{_REST_OF_TOKEN})?")
+
+
+def _single_separator(separators: np.ndarray, rests: np.ndarray) -> np.ndarray:
+    """
+    Which of the matched tokens contain exactly one whitespace or '=' character
+    """
+    # nearly every separator is a lone space or '=' with nothing left over
+    # after the value, so only the oddballs are counted character by character
+    separator_codes, unique_separators = pd.factorize(separators)
+    lone = np.array([len(sep) == 1 and sep != "," for sep in unique_separators], dtype=bool)
+    has_rest = rests != ""
+    valid = lone[separator_codes] & ~has_rest
+    for i in np.flatnonzero(has_rest | ~lone[separator_codes]):
+        valid[i] = len(_SEPARATOR_CHARACTER.findall(separators[i] + rests[i])) == 1
+    return valid
+
+
+def tokenize_attributes(
+    attributes: np.ndarray,
+    pattern: re.Pattern | None = None,
+) -> tuple[np.ndarray, np.ndarray, list[str], np.ndarray]:
+    """
+    Split every attribute string into key/value pairs.
+
+    Parameters
+    ----------
+    attributes : numpy.ndarray
+        Object array of attribute strings, one per GTF row
+
+    pattern : re.Pattern or None
+        Compiled pattern from `attribute_pattern`
+
+    Returns
+    -------
+    Tuple of (row positions, key codes, key names, values) with one entry
+    per key/value pair. Key codes index into the list of key names, which are
+    ordered by first appearance. Values for keys repeated within a row are
+    joined with a comma.
+    """
+    if pattern is None:
+        pattern = attribute_pattern()
+
+    def select_pairs(tokens: np.ndarray) -> np.ndarray:
+        pairs = tokens[:, 2] != ""
+        pairs[pairs] = _single_separator(tokens[pairs, 2], tokens[pairs, 4])
+        return pairs
+
+    return tokenize_blocks(attributes, pattern, select_pairs, value_group=3)
+
+
+def join_groups(strings: np.ndarray, groups: np.ndarray, separator: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Join the strings of each group with `separator`, keeping their order
+    within the group. The strings are sorted by group once and every run of
+    them is joined in a single pass, rather than through pandas' per-group
+    aggregation. Returns the distinct groups, in sorted order, and the joined
+    string of each.
+    """
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[len(sorted_groups) > 0, sorted_groups[1:] != sorted_groups[:-1]])
+    sorted_strings = strings[order].tolist()
+    bounds = np.r_[starts, len(sorted_strings)].tolist()
+    joined = np.empty(len(starts), dtype=object)
+    joined[:] = [separator.join(sorted_strings[start:end]) for start, end in pairwise(bounds)]
+    return sorted_groups[starts], joined
+
+
+def tokenize_blocks(
+    attributes: np.ndarray,
+    pattern: re.Pattern,
+    select_pairs: Callable[[np.ndarray], np.ndarray],
+    value_group: int,
+) -> tuple[np.ndarray, np.ndarray, list[str], np.ndarray]:
+    """
+    The block-by-block scan behind `tokenize_attributes`, for any `pattern`
+    whose first group is the boundary (a newline or ';') and second the key.
+    `select_pairs` picks out which matches (rows of the array of groups) are
+    key/value pairs, and `value_group` is the group holding the value.
+    """
+    row_blocks = []
+    code_blocks = []
+    value_blocks = []
+    key_names: list[str] = []
+    key_codes: dict[str, int] = {}
+
+    for offset in range(0, len(attributes), ATTRIBUTE_BLOCK_ROWS):
+        block = attributes[offset : offset + ATTRIBUTE_BLOCK_ROWS]
+        tokens = np.array(pattern.findall("\n" + "\n".join(block)), dtype=object)
+        newlines = tokens[:, 0] == "\n"
+        pairs = select_pairs(tokens)
+        if not pairs.any():
+            continue
+        row_blocks.append(np.cumsum(newlines)[pairs] - 1 + offset)
+
+        # only the handful of distinct keys of a block outlive it
+        block_codes, block_keys = pd.factorize(tokens[pairs, 1])
+        for key in block_keys:
+            if key not in key_codes:
+                key_codes[key] = len(key_names)
+                key_names.append(key)
+        code_blocks.append(np.array([key_codes[k] for k in block_keys], dtype=np.int64)[block_codes])
+        value_blocks.append(tokens[pairs, value_group])
+
+    if not row_blocks:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, key_names, np.array([], dtype=object)
+
+    rows = np.concatenate(row_blocks)
+    codes = np.concatenate(code_blocks)
+    values = np.concatenate(value_blocks)
+
+    # this would be simple if attribute keys weren't ever duplicated
+    # but the GTF/GFF3 specs don't forbid it so...
+    pair_ids = rows * len(key_names) + codes
+    repeated = pd.Series(pair_ids).duplicated(keep=False).to_numpy()
+    if repeated.any():
+        first = ~pd.Series(pair_ids).duplicated(keep="first").to_numpy()
+        _, joined = join_groups(values[repeated], pair_ids[repeated], ",")
+        # the first occurrences of the repeated pairs, in order of their ID
+        first_rows = np.flatnonzero(repeated & first)
+        values[first_rows[np.argsort(pair_ids[first_rows], kind="stable")]] = joined
+        rows, codes, values = rows[first], codes[first], values[first]
+
+    return rows, codes, key_names, values
+
+
+def coerce_attribute_values(values: pd.Series) -> pd.Series:
+    """
+    Convert a column of attribute strings to float64, or int64 when no value
+    is missing and all of them are whole numbers, leaving it untouched if any
+    value isn't numeric.
+    """
+    try:
+        values = values.astype("float64")
+    except (TypeError, ValueError):
+        return values
+    try:
+        integers = values.astype("int64")
+    except (TypeError, ValueError, OverflowError):
+        return values
+    if (integers == values).all():
+        return integers
+    return values
+
+
+def infer_attribute_type(values: pd.Series) -> pd.Series:
+    """
+    Convert a column of attribute strings, with NaN where a key didn't occur,
+    to a nullable Int64 column when every value present is a whole number or
+    a Float64 column when every value present is a number, with pd.NA where a
+    key didn't occur. Columns holding anything else are left untouched.
+    """
+    present = values.notna().to_numpy()
+    if not present.any():
+        return values
+    present_values = values.to_numpy(dtype=object)[present]
+    try:
+        # parsed as integers first so that long ones don't lose precision
+        numbers = present_values.astype(np.int64)
+    except (TypeError, ValueError, OverflowError):
+        try:
+            numbers = present_values.astype(np.float64)
+        except (TypeError, ValueError):
+            return values
+        whole = np.isfinite(numbers) & (numbers == np.round(numbers)) & (np.abs(numbers) < 2.0**63)
+        if whole.all():
+            numbers = numbers.astype(np.int64)
+
+    data = np.zeros(len(values), dtype=numbers.dtype)
+    data[present] = numbers
+    array_type = pd.arrays.IntegerArray if numbers.dtype == np.int64 else pd.arrays.FloatingArray
+    return pd.Series(array_type(data, ~present), index=values.index, name=values.name)
+
+
+def fill_attribute_values(
+    attribute_values: pd.DataFrame,
+    missing_value: Any = "",
+    coerce_numeric: bool = True,
+    infer_types: bool = False,
+) -> pd.DataFrame:
+    """
+    Convert numeric columns of expanded attributes and fill in the rows in
+    which a key didn't occur (NaN). This is the last step of
+    `expand_attribute_column`; pieces of a GTF that were expanded with a NaN
+    `missing_value` and without `coerce_numeric` can be concatenated first
+    and passed through here, so that each column is typed as a whole.
+    With `infer_types`, numeric columns go through `infer_attribute_type`
+    instead and keep pd.NA for their missing values.
+    """
+    attribute_columns = attribute_values.columns.drop("attribute", errors="ignore")
+    if infer_types:
+        inferred = []
+        for column_name in attribute_columns:
+            attribute_values[column_name] = infer_attribute_type(attribute_values[column_name])
+            if attribute_values[column_name].dtype != object:
+                inferred.append(column_name)
+        filled = attribute_values.columns.drop(inferred)
+        attribute_values[filled] = attribute_values[filled].replace(to_replace=np.nan, value=missing_value)
+        return attribute_values
+    if coerce_numeric:
+        for column_name in attribute_columns:
+            attribute_values[column_name] = coerce_attribute_values(attribute_values[column_name])
+    return attribute_values.replace(to_replace=np.nan, value=missing_value)
+
+
+def expand_attribute_column(
+    attributes: pd.Series,
+    restrict_attribute_columns: list[str] | None = None,
+    attribute_keys: Iterable[str] | None = None,
+    missing_value: Any = "",
+    coerce_numeric: bool = True,
+    infer_types: bool = False,
+) -> pd.DataFrame:
+    """
+    Expand a column of semi-colon separated key-value strings into one column
+    per distinct key, in the order in which keys first appear.
+
+    Parameters
+    ----------
+    attributes : pandas.Series
+        The 'attribute' column of a GTF
+
+    restrict_attribute_columns : list of str or None
+        If given, only these keys get their own column and every other pair
+        of a row is folded back into an 'attribute' column as "key=value"
+        strings joined with ';'.
+
+    attribute_keys : iterable of str or None
+        If given, pairs whose key isn't one of these are skipped while
+        tokenizing, so no strings or columns are ever built for them.
+
+    missing_value : any
+        Value used for rows in which a key didn't occur.
+
+    coerce_numeric : bool
+        Convert columns in which every value is a number to float64 (or
+        int64, see `coerce_attribute_values`) instead of leaving them as
+        strings.
+
+    infer_types : bool
+        Convert columns in which every value present is a number to pandas'
+        nullable Int64 or Float64, with pd.NA rather than `missing_value` in
+        rows without the key (see `infer_attribute_type`). Takes the place
+        of `coerce_numeric`.
+
+    Returns
+    -------
+    :class:~pd.DataFrame sharing the index of `attributes`
+    """
+    pattern = None if attribute_keys is None else attribute_pattern(attribute_keys)
+    rows, codes, key_names, values = tokenize_attributes(attributes.fillna("").to_numpy(dtype=object), pattern)
+    n_rows = len(attributes)
+
+    if restrict_attribute_columns is None:
+        column_names = key_names
+        expanded_codes = np.arange(len(key_names))
+    else:
+        column_names = [k for k in restrict_attribute_columns if k in key_names]
+        expanded_codes = np.array([key_names.index(k) for k in column_names], dtype=np.int64)
+
+    column_of_code = np.full(len(key_names), -1, dtype=np.int64)
+    column_of_code[expanded_codes] = np.arange(len(column_names))
+    pair_columns = column_of_code[codes]
+    expanded = pair_columns >= 0
+
+    table = np.full((len(column_names), n_rows), np.nan, dtype=object)
+    table[pair_columns[expanded], rows[expanded]] = values[expanded]
+    attribute_values = pd.DataFrame(table.T, index=attributes.index, columns=column_names, copy=False)
+
+    attribute_values = fill_attribute_values(
+        attribute_values, missing_value, coerce_numeric=coerce_numeric, infer_types=infer_types
+    )
+
+    if restrict_attribute_columns is not None:
+        folded = ~expanded
+        attribute_values.insert(
+            0, "attribute", fold_attribute_pairs(rows[folded], codes[folded], key_names, values[folded], n_rows)
+        )
+
+    return attribute_values
+
+
+def fold_attribute_pairs(
+    rows: np.ndarray,
+    codes: np.ndarray,
+    key_names: list[str],
+    values: np.ndarray,
+    n_rows: int,
+) -> np.ndarray:
+    """
+    Join key/value pairs from `tokenize_attributes` back into one
+    "key=value;key=value" string per row, with "" for rows without any
+    """
+    attribute_column = np.full(n_rows, "", dtype=object)
+    if len(rows):
+        pairs = np.array(key_names, dtype=object)[codes] + "=" + values
+        joined_rows, joined = join_groups(pairs, rows, ";")
+        attribute_column[joined_rows] = joined
+    return attribute_column
@@ -0,0 +1,379 @@
+"""
+Reading GFF3 files, whose attributes are `key=value` pairs separated by ';'
+with commas separating the values of multi-valued keys such as 'Parent',
+and with reserved characters percent-encoded ('%3B' for ';' and so on).
+
+The attribute column is scanned with the same block-at-a-time tokenizer as
+GTF attributes (`expand_attributes.tokenize_blocks`) but split the way GFF3
+requires: on ';' and the first '=' only, keeping spaces within values. Values
+are split on commas before they're percent-decoded, so that an encoded comma
+stays part of its value.
+
+`Gff3Index` indexes the ID and Parent attributes of the result as integer
+arrays, so that walking from a gene to its transcripts and their exons costs
+the number of rows visited rather than a pass over the whole frame per step.
+"""
+
+import io
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TextIO
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from gtfparse import expand_attributes
+from gtfparse._logger import logger
+from gtfparse.stats import ParseStats
+
+# keys which the GFF3 specification allows more than one value for
+MULTI_VALUED_ATTRIBUTES = ("Parent", "Alias", "Note", "Dbxref", "Ontology_term")
+
+# core columns which may hold percent-encoded characters
+ENCODED_COLUMNS = ["seqname", "source", "feature"]
+
+# (boundary, key, value) for every newline or ';' of a block of attribute
+# strings, with the key and value left empty when what follows the boundary
+# isn't a key=value pair. Spaces around the key and at the end of the value
+# are dropped, but spaces within the value are kept.
+GFF3_ATTRIBUTE_PATTERN = re.compile(r"([\n;])[^\S\n]*(?:([^=;\s][^=;\n]*?)[^\S\n]*=([^;\n]*[^;\s]|))?")
+
+
+# the directive after which the rest of a GFF3 is sequences
+FASTA_DIRECTIVE = re.compile(r"^##FASTA", re.MULTILINE)
+
+
+class _UntilFasta(io.TextIOBase):
+    """
+    The text of a GFF3 up to its '##FASTA' directive, if it has one, read a
+    block of whole lines at a time
+    """
+
+    def __init__(self, source: TextIO) -> None:
+        self._source = source
+        self._pending = ""
+        self._done = False
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        """
+        Characters read so far, which is only the number of bytes read for
+        ASCII text; it's used for progress and byte statistics
+        """
+        return self._position
+
+    def read(self, size: int | None = -1) -> str:
+        while not self._done:
+            block = self._source.read(size if size is not None and size > 0 else -1)
+            text = self._pending + block
+            if block:
+                # a partial last line waits for the rest of it, so that the
+                # directive is always seen at the start of a line
+                cut = text.rfind("\n") + 1
+                text, self._pending = text[:cut], text[cut:]
+            else:
+                self._pending = ""
+                self._done = True
+            fasta = FASTA_DIRECTIVE.search(text)
+            if fasta is not None:
+                text = text[: fasta.start()]
+                self._done = True
+            if text:
+                self._position += len(text)
+                return text
+        return ""
+
+
+def tokenize_gff3_attributes(attributes: np.ndarray) -> tuple[np.ndarray, np.ndarray, list[str], np.ndarray]:
+    """
+    Split every GFF3 attribute string into key/value pairs
+
+    Parameters
+    ----------
+    attributes : numpy.ndarray
+        Object array of attribute strings, one per row
+
+    Returns
+    -------
+    Tuple of (row positions, key codes, key names, values) as returned by
+    `expand_attributes.tokenize_attributes`. Values are still percent-encoded
+    and those of keys repeated within a row are joined with a comma.
+    """
+    return expand_attributes.tokenize_blocks(
+        attributes,
+        GFF3_ATTRIBUTE_PATTERN,
+        lambda tokens: tokens[:, 1] != "",
+        value_group=2,
+    )
+
+
+def percent_decode(values: np.ndarray) -> np.ndarray:
+    """
+    Replace '%XX' escapes with the characters they stand for, only touching
+    the values which contain a '%'
+    """
+    values = np.asarray(values, dtype=object)
+    if "%" not in "".join(values):
+        return values
+    encoded = np.fromiter(("%" in value for value in values), dtype=bool, count=len(values))
+    decoded = values.copy()
+    decoded[encoded] = [unquote(value) for value in values[encoded]]
+    return decoded
+
+
+def split_values(values: np.ndarray) -> np.ndarray:
+    """
+    Object array holding the list of comma-separated, percent-decoded values
+    of each string
+    """
+    split = np.empty(len(values), dtype=object)
+    split[:] = [
+        [unquote(piece) for piece in value.split(",")] if "%" in value else value.split(",") for value in values
+    ]
+    return split
+
+
+def expand_gff3_attributes(
+    attributes: pd.Series,
+    multi_valued: Iterable[str] = MULTI_VALUED_ATTRIBUTES,
+) -> pd.DataFrame:
+    """
+    Expand a column of GFF3 attribute strings into one column per key
+
+    Parameters
+    ----------
+    attributes : pandas.Series
+        GFF3 attribute strings
+
+    multi_valued : iterable of str
+        Keys whose values are split on commas into lists. Values of every
+        other key are strings, any commas in them included.
+
+    Returns
+    -------
+    :class:~pd.DataFrame sharing the index of `attributes`, with a column per
+    key in order of first appearance and None where a key doesn't occur
+    """
+    multi_valued = set(multi_valued)
+    rows, codes, key_names, values = tokenize_gff3_attributes(attributes.fillna("").to_numpy(dtype=object))
+    n_rows = len(attributes)
+
+    columns = {}
+    order = np.argsort(codes, kind="stable")
+    boundaries = np.searchsorted(codes[order], np.arange(len(key_names) + 1))
+    for code, key in enumerate(key_names):
+        pairs = order[boundaries[code] : boundaries[code + 1]]
+        column = np.full(n_rows, None, dtype=object)
+        column[rows[pairs]] = split_values(values[pairs]) if key in multi_valued else percent_decode(values[pairs])
+        columns[key] = column
+    return pd.DataFrame(columns, index=attributes.index, columns=key_names)
+
+
+def read_gff3(
+    filepath_or_buffer: str | TextIO | Path,
+    chunksize: int = 1024 * 1024,
+    features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    multi_valued: Iterable[str] = MULTI_VALUED_ATTRIBUTES,
+    explode: str | None = None,
+    stats: ParseStats | None = None,
+) -> pd.DataFrame:
+    """
+    Parse a GFF3 into a DataFrame with a column per attribute key. Any
+    sequences after a '##FASTA' directive are left unread.
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or buffer object
+        Path to GFF3 file (may be gzip compressed) or buffer object
+        such as StringIO
+
+    chunksize : int
+
+    features : set of str or None
+        Drop rows which aren't one of the features in the supplied set
+
+    seqnames : set of str or None
+        Drop rows which aren't on one of the chromosomes/scaffolds in the
+        supplied set
+
+    interval : tuple of (int, int) or None
+        Drop rows which don't overlap this range of (1-based, inclusive)
+        positions
+
+    multi_valued : iterable of str
+        Attribute keys whose comma-separated values become lists, by default
+        those the specification allows several values for
+
+    explode : str or None
+        A multi-valued key to give a row per value of, e.g. "Parent" for a
+        row per parent of every feature. The index is reset afterwards.
+
+    stats : ParseStats or None
+        Filled in with the bytes read and the row counts and timings of each
+        stage
+
+    Returns
+    -------
+    :class:~pd.DataFrame with the same core columns as `read_gtf` (the phase
+    in 'frame') and None where an attribute key doesn't occur. Percent-encoded
+    characters are decoded in attribute values and in 'seqname', 'source' and
+    'feature'.
+    """
+    from gtfparse.read_gtf import _iter_chunks, _open_text, concat_chunks
+
+    stats = ParseStats() if stats is None else stats
+    multi_valued = list(multi_valued)
+    if explode is not None and explode not in multi_valued:
+        msg = f"explode must be one of the multi_valued attributes {multi_valued}, not {explode!r}"
+        raise ValueError(msg)
+
+    with _open_text(filepath_or_buffer) as text:
+        chunks = list(
+            _iter_chunks(
+                _UntilFasta(text), chunksize, features=features, seqnames=seqnames, interval=interval, stats=stats
+            )
+        )
+    with stats.stage("concat") as stage:
+        stage.rows_in = stage.rows_out = sum(len(chunk) for chunk in chunks)
+        df = concat_chunks(chunks, ignore_index=True)
+        del chunks
+
+    logger.info("Expanding GFF3 attributes")
+    with stats.stage("expand_attributes") as stage:
+        stage.rows_in = stage.rows_out = len(df)
+        for name in ENCODED_COLUMNS:
+            df[name] = percent_decode(df[name].to_numpy(dtype=object))
+        attribute_values = expand_gff3_attributes(df["attribute"], multi_valued=multi_valued)
+        df = pd.concat([df.drop(columns="attribute"), attribute_values], axis=1)
+
+    if explode is not None and explode in df.columns:
+        with stats.stage("explode") as stage:
+            stage.rows_in = len(df)
+            df = df.explode(explode, ignore_index=True)
+            stage.rows_out = len(df)
+    return df
+
+
+def _gather(values: np.ndarray, offsets: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """
+    values[offsets[g] : offsets[g + 1]] for every g in `groups`, concatenated
+    """
+    starts = offsets[groups]
+    lengths = offsets[groups + 1] - starts
+    return values[np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)]
+
+
+class Gff3Index:
+    """
+    The feature hierarchy of a GFF3: which rows carry each ID and which rows
+    name it as a Parent, held as arrays of row positions grouped by ID (for
+    use with `df.iloc`). IDs which are never defined but do appear as a
+    Parent are indexed too, and looking up an unknown ID gives no rows.
+
+    Parameters
+    ----------
+    ids : array-like
+        ID of every row, None (or NaN) for rows without one
+
+    parents : array-like
+        Parent of every row: a list of IDs, a single ID or None
+    """
+
+    def __init__(self, ids: Iterable[str | None], parents: Iterable[list[str] | str | None]) -> None:
+        ids = pd.Series(np.asarray(ids, dtype=object), dtype=object)
+        parents = pd.Series(np.asarray(parents, dtype=object), dtype=object)
+        if len(ids) != len(parents):
+            msg = "ids and parents must have the same length"
+            raise ValueError(msg)
+        self._n_rows = len(ids)
+
+        # every row's parents, one (row, parent) pair per entry in row order
+        parent_pairs = parents.explode().dropna()
+        child_rows = parent_pairs.index.to_numpy(dtype=np.int64)
+        codes, uniques = pd.factorize(pd.concat([ids, parent_pairs], ignore_index=True))
+        self._ids = pd.Index(uniques)
+        self._row_codes = codes[: self._n_rows]
+        parent_codes = codes[self._n_rows :]
+
+        # rows carrying each ID, and the rows naming each ID as their parent
+        self._rows, self._row_offsets = self._group(self._row_codes, np.arange(self._n_rows))
+        self._children, self._child_offsets = self._group(parent_codes, child_rows)
+        # the parent codes of each row
+        self._parents = parent_codes
+        self._parent_offsets = np.searchsorted(child_rows, np.arange(self._n_rows + 1))
+
+    def _group(self, codes: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        present = codes >= 0
+        codes, rows = codes[present], rows[present]
+        order = np.argsort(codes, kind="stable")
+        return rows[order], np.searchsorted(codes[order], np.arange(len(self._ids) + 1))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "Gff3Index":
+        """
+        Index the 'ID' and 'Parent' columns of a DataFrame returned by
+        `read_gff3`, either of which may be missing
+        """
+        empty = np.full(len(df), None, dtype=object)
+        return cls(
+            df["ID"].to_numpy(dtype=object) if "ID" in df.columns else empty,
+            df["Parent"].to_numpy(dtype=object) if "Parent" in df.columns else empty,
+        )
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def __contains__(self, feature_id: object) -> bool:
+        return len(self._codes(feature_id)) > 0
+
+    def _codes(self, feature_id: object) -> np.ndarray:
+        codes = self._ids.get_indexer([feature_id])
+        return codes[codes >= 0]
+
+    def rows(self, feature_id: str) -> np.ndarray:
+        """
+        Row positions with this ID, several for features split over many
+        lines such as a CDS
+        """
+        return _gather(self._rows, self._row_offsets, self._codes(feature_id))
+
+    def children(self, feature_id: str) -> np.ndarray:
+        """
+        Row positions whose Parent includes this ID, in file order
+        """
+        return _gather(self._children, self._child_offsets, self._codes(feature_id))
+
+    def parent_ids(self, row: int) -> list[str]:
+        """
+        IDs named as Parent by a row
+        """
+        return self._ids[_gather(self._parents, self._parent_offsets, np.array([row]))].tolist()
+
+    def parents(self, feature_id: str) -> np.ndarray:
+        """
+        Row positions of the parents of the rows with this ID
+        """
+        codes = np.unique(_gather(self._parents, self._parent_offsets, self.rows(feature_id)))
+        return np.sort(_gather(self._rows, self._row_offsets, codes))
+
+    def descendants(self, feature_id: str) -> np.ndarray:
+        """
+        Row positions of everything below this ID in the hierarchy (children,
+        their children and so on), in increasing order
+        """
+        visited = np.zeros(self._n_rows, dtype=bool)
+        frontier = self.children(feature_id)
+        while len(frontier):
+            frontier = np.unique(frontier[~visited[frontier]])
+            visited[frontier] = True
+            codes = np.unique(self._row_codes[frontier])
+            codes = codes[codes >= 0]
+            frontier = _gather(self._children, self._child_offsets, codes)
+        return np.flatnonzero(visited)
@@ -0,0 +1,188 @@
+"""
+Overlap queries over the intervals of a parsed GTF.
+
+The intervals of each seqname are sorted by start and end and split into
+layers in which no interval lies strictly inside an earlier one, so that both
+starts and ends are sorted within a layer. Whatever overlaps a query in a
+layer is then one contiguous slice, found with two binary searches. Nested
+features (exons in transcripts in genes) only add a layer per level of
+nesting, so a query costs a few binary searches plus the size of its answer.
+"""
+
+from collections.abc import Iterable, Iterator
+from itertools import pairwise
+
+import numpy as np
+import pandas as pd
+
+
+def _layers(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Order of the intervals, layer by layer, and the offset of each layer in
+    it. Every pass takes the intervals which end at or after every interval
+    before them, which leaves both starts and ends sorted within the layer.
+    """
+    remaining = np.lexsort((ends, starts))
+    order, offsets = [], [0]
+    while len(remaining):
+        remaining_ends = ends[remaining]
+        top = remaining_ends >= np.maximum.accumulate(remaining_ends)
+        order.append(remaining[top])
+        offsets.append(offsets[-1] + int(top.sum()))
+        remaining = remaining[~top]
+    return (np.concatenate(order) if order else np.empty(0, dtype=np.intp)), np.asarray(offsets)
+
+
+class GtfIndex:
+    """
+    Index of the intervals of a GTF for point, range and batch overlap
+    queries. Coordinates are 1-based and inclusive, as in the GTF, and
+    queries answer with row positions into the frame the index was built
+    from (for use with `df.iloc`).
+
+    Parameters
+    ----------
+    seqnames, starts, ends : array-like
+        Chromosome, start and end of every interval
+
+    strands : array-like or None
+        Strand of every interval, needed to filter queries on strand
+    """
+
+    def __init__(
+        self,
+        seqnames: Iterable[str],
+        starts: Iterable[int],
+        ends: Iterable[int],
+        strands: Iterable[str] | None = None,
+    ) -> None:
+        seqnames = np.asarray(seqnames, dtype=object)
+        self._starts = np.asarray(starts, dtype=np.int64)
+        self._ends = np.asarray(ends, dtype=np.int64)
+        if not len(seqnames) == len(self._starts) == len(self._ends):
+            msg = "seqnames, starts and ends must all have the same length"
+            raise ValueError(msg)
+        self._strands = None if strands is None else np.asarray(strands, dtype=object)
+
+        # per seqname: row positions layer by layer, with their starts and ends
+        self._seqnames: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+        codes, uniques = pd.factorize(seqnames)
+        rows_by_code = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[rows_by_code], np.arange(len(uniques) + 1))
+        for code, seqname in enumerate(uniques):
+            rows = rows_by_code[bounds[code] : bounds[code + 1]]
+            order, offsets = _layers(self._starts[rows], self._ends[rows])
+            rows = rows[order]
+            self._seqnames[seqname] = (rows, self._starts[rows], self._ends[rows], offsets)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "GtfIndex":
+        """
+        Index the 'seqname', 'start', 'end' and (if there is one) 'strand'
+        columns of a DataFrame returned by `read_gtf` or `parse_gtf`
+        """
+        return cls(
+            df["seqname"].to_numpy(dtype=object),
+            df["start"].to_numpy(),
+            df["end"].to_numpy(),
+            df["strand"].to_numpy(dtype=object) if "strand" in df.columns else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @property
+    def seqnames(self) -> list[str]:
+        return list(self._seqnames)
+
+    def query(self, seqname: str, start: int, end: int | None = None, strand: str | None = None) -> np.ndarray:
+        """
+        Row positions of the intervals overlapping `seqname:start-end` (or the
+        single position `start` when `end` is None), in increasing order
+        """
+        _, rows = self.query_batch([seqname], [start], None if end is None else [end], strand=strand)
+        return np.sort(rows)
+
+    def _slices(
+        self, seqname: str, query_starts: np.ndarray, query_ends: np.ndarray
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        For each layer of `seqname`, where the intervals overlapping each
+        query begin in the layer and how many there are
+        """
+        _, layer_starts, layer_ends, offsets = self._seqnames[seqname]
+        for layer_start, layer_end in pairwise(offsets):
+            first = layer_start + np.searchsorted(layer_ends[layer_start:layer_end], query_starts, side="left")
+            last = layer_start + np.searchsorted(layer_starts[layer_start:layer_end], query_ends, side="right")
+            yield first, np.maximum(last - first, 0)
+
+    def query_batch(
+        self,
+        seqnames: Iterable[str],
+        starts: Iterable[int],
+        ends: Iterable[int] | None = None,
+        strand: str | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Overlaps of many queries at once, without a Python loop per query
+
+        Parameters
+        ----------
+        seqnames, starts : array-like
+            Chromosome and start of every query
+
+        ends : array-like or None
+            End of every query, or None for queries of single positions
+
+        strand : str or None
+            Only return intervals on this strand
+
+        Returns
+        -------
+        Two arrays of the same length: the position of a query among those
+        passed in, and the row position of an interval it overlaps. The
+        overlaps are grouped by query, in the order the queries were given.
+        """
+        seqnames = np.asarray(seqnames, dtype=object)
+        query_starts = np.asarray(starts, dtype=np.int64)
+        query_ends = query_starts if ends is None else np.asarray(ends, dtype=np.int64)
+        if strand is not None and self._strands is None:
+            msg = "This index was built without strands"
+            raise ValueError(msg)
+
+        # the queries of each seqname in order of position, so that the binary
+        # searches walk through the arrays rather than jumping around them
+        codes, uniques = pd.factorize(seqnames)
+        by_position = np.lexsort((query_starts, codes))
+        bounds = np.searchsorted(codes[by_position], np.arange(len(uniques) + 1))
+        queries_of = {
+            seqname: by_position[bounds[code] : bounds[code + 1]]
+            for code, seqname in enumerate(uniques)
+            if seqname in self._seqnames
+        }
+
+        # count the overlaps of every query first, so that each one can be
+        # written straight to its place in the output
+        n_overlaps = np.zeros(len(seqnames), dtype=np.int64)
+        for seqname, queries in queries_of.items():
+            for _, counts in self._slices(seqname, query_starts[queries], query_ends[queries]):
+                n_overlaps[queries] += counts
+        filled = np.cumsum(n_overlaps) - n_overlaps
+
+        row_positions = np.empty(int(n_overlaps.sum()), dtype=np.intp)
+        for seqname, queries in queries_of.items():
+            rows = self._seqnames[seqname][0]
+            for first, counts in self._slices(seqname, query_starts[queries], query_ends[queries]):
+                total = int(counts.sum())
+                if not total:
+                    continue
+                # slice i of the answer is first[i] .. first[i] + counts[i]
+                steps = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                row_positions[np.repeat(filled[queries], counts) + steps] = rows[np.repeat(first, counts) + steps]
+                filled[queries] += counts
+
+        query_indices = np.repeat(np.arange(len(seqnames)), n_overlaps)
+        if strand is not None:
+            on_strand = self._strands[row_positions] == strand
+            query_indices, row_positions = query_indices[on_strand], row_positions[on_strand]
+        return query_indices, row_positions
@@ -0,0 +1,213 @@
+"""
+Sidecar index of an uncompressed GTF, recording where the records of each
+seqname lie in the file and how many rows of each feature type it has.
+
+The index is a small JSON file next to the GTF ('{name}.gtfidx'), built once
+with `build_line_index`. `parse_gtf` picks it up on its own: asked for some
+seqnames it reads only their byte ranges instead of the whole file, and it
+knows exactly how many rows it's going to read. The index records the size
+and modification time of the GTF and is ignored once either changes.
+"""
+
+import io
+import json
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from gtfparse._logger import logger
+from gtfparse.decompress import COMPRESSED_SUFFIXES
+from gtfparse.required_columns import REQUIRED_COLUMNS
+
+LINE_INDEX_SUFFIX = ".gtfidx"
+LINE_INDEX_VERSION = 2
+
+
+def line_index_path(filepath: Path) -> Path:
+    return filepath.with_name(filepath.name + LINE_INDEX_SUFFIX)
+
+
+class LineIndex:
+    """
+    Where the records of each seqname are in a GTF
+
+    Parameters
+    ----------
+    runs : list of (str, int, int, int)
+        Seqname, first byte, end byte and number of rows of every stretch of
+        consecutive records on the same seqname, in file order. A file sorted
+        by seqname has one run per seqname.
+
+    feature_counts : dict
+        Number of rows of each feature type on each seqname
+    """
+
+    def __init__(self, runs: list[tuple[str, int, int, int]], feature_counts: dict[str, dict[str, int]]) -> None:
+        self.runs = [tuple(run) for run in runs]
+        self.feature_counts = feature_counts
+
+    @property
+    def seqnames(self) -> list[str]:
+        return list(self.feature_counts)
+
+    def byte_ranges(self, seqnames: Iterable[str] | None = None) -> list[tuple[int, int]]:
+        """
+        Byte ranges holding all records on `seqnames` (or every record), in
+        file order
+        """
+        seqnames = None if seqnames is None else set(seqnames)
+        return [(start, end) for seqname, start, end, _ in self.runs if seqnames is None or seqname in seqnames]
+
+    def row_numbers(self, seqnames: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        For every run on `seqnames`: the position of its first row among the
+        rows read from `byte_ranges(seqnames)`, and the row number of that
+        row in the whole file
+        """
+        seqnames = set(seqnames)
+        n_rows = np.array([run[3] for run in self.runs], dtype=np.int64)
+        selected = np.array([run[0] in seqnames for run in self.runs], dtype=bool)
+        file_starts = np.cumsum(n_rows) - n_rows
+        read_starts = np.cumsum(n_rows[selected]) - n_rows[selected]
+        return read_starts, file_starts[selected]
+
+    def n_rows(self, seqnames: Iterable[str] | None = None, features: Iterable[str] | None = None) -> int:
+        """
+        Number of rows on `seqnames` which are one of `features` (None for
+        any seqname or feature)
+        """
+        seqnames = self.seqnames if seqnames is None else [s for s in seqnames if s in self.feature_counts]
+        return sum(
+            count
+            for seqname in seqnames
+            for feature, count in self.feature_counts[seqname].items()
+            if features is None or feature in features
+        )
+
+
+def build_line_index(filepath: str | Path) -> Path:
+    """
+    Scan an uncompressed GTF and write its `LineIndex` next to it
+
+    Returns
+    -------
+    Path of the index
+    """
+    filepath = Path(filepath)
+    if filepath.suffix in COMPRESSED_SUFFIXES:
+        msg = f"Line indexes are for uncompressed files, use a tabix index for {filepath}"
+        raise ValueError(msg)
+
+    stat = filepath.stat()
+    runs: list[list] = []
+    feature_counts: Counter[tuple[bytes, bytes]] = Counter()
+    offset = 0
+    with open(filepath, "rb") as gtf:
+        for line in gtf:
+            line_start = offset
+            offset += len(line)
+            # rows are counted the way the parser counts them: text after a
+            # '#' is a comment, and lines with more than the nine GTF fields
+            # are skipped
+            record = line.split(b"#", 1)[0]
+            if not record.strip() or record.count(b"\t") >= len(REQUIRED_COLUMNS):
+                continue
+            fields = record.split(b"\t", 3)
+            if len(fields) < 4:  # noqa: PLR2004
+                continue
+            seqname = fields[0]
+            feature_counts[seqname, fields[2]] += 1
+            if runs and runs[-1][0] == seqname:
+                # comments between records of the same seqname are left in the run
+                runs[-1][2] = offset
+                runs[-1][3] += 1
+            else:
+                runs.append([seqname, line_start, offset, 1])
+
+    counts: dict[str, dict[str, int]] = {}
+    for (seqname, feature), count in feature_counts.items():
+        counts.setdefault(seqname.decode(), {})[feature.decode()] = count
+    index_path = line_index_path(filepath)
+    index_path.write_text(
+        json.dumps(
+            {
+                "version": LINE_INDEX_VERSION,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "runs": [[seqname.decode(), start, end, n_rows] for seqname, start, end, n_rows in runs],
+                "feature_counts": counts,
+            }
+        )
+    )
+    logger.info(f"Indexed {sum(run[3] for run in runs)} rows of {filepath} in {index_path}")
+    return index_path
+
+
+def load_line_index(filepath: Path) -> LineIndex | None:
+    """
+    The `LineIndex` next to `filepath`, or None if there isn't one or the
+    file has changed since it was built
+    """
+    index_path = line_index_path(filepath)
+    if not index_path.exists():
+        return None
+    try:
+        contents = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        logger.warning(f"Ignoring unreadable line index {index_path}")
+        return None
+    stat = filepath.stat()
+    if (contents.get("version"), contents.get("size"), contents.get("mtime_ns")) != (
+        LINE_INDEX_VERSION,
+        stat.st_size,
+        stat.st_mtime_ns,
+    ):
+        logger.info(f"Ignoring line index {index_path}, {filepath} has changed since it was built")
+        return None
+    return LineIndex(contents["runs"], contents["feature_counts"])
+
+
+class _ByteRangesReader(io.RawIOBase):
+    """
+    Read the given byte ranges of a file one after another, as if nothing
+    else was in it
+    """
+
+    def __init__(self, filepath: Path, byte_ranges: list[tuple[int, int]]) -> None:
+        self._file = open(filepath, "rb")
+        self._ranges = list(byte_ranges)
+        self._position = self._ranges[0][0] if self._ranges else 0
+        self._n_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        # bytes read so far, rather than a position in the file
+        return self._n_read
+
+    def readinto(self, buffer: memoryview) -> int:
+        while self._ranges:
+            start, end = self._ranges[0]
+            self._position = max(self._position, start)
+            if self._position < end:
+                self._file.seek(self._position)
+                n_bytes = self._file.readinto(memoryview(buffer)[: min(len(buffer), end - self._position)])
+                self._position += n_bytes
+                self._n_read += n_bytes
+                return n_bytes
+            self._ranges.pop(0)
+        return 0
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def open_byte_ranges(filepath: Path, byte_ranges: list[tuple[int, int]]) -> io.BufferedReader:
+    """
+    A binary file object reading only `byte_ranges` of `filepath`
+    """
+    return io.BufferedReader(_ByteRangesReader(filepath, byte_ranges), buffer_size=1 << 20)
@@ -1,10 +1,17 @@
 import datetime
+import warnings
 from sys import stderr
 
 from loguru import logger
 
 
-def init_logger(verbose: int, save_log: bool = True, msg_format: str | None = None) -> None:
+def init_logger(
+    verbose: int, save: bool = True, msg_format: str | None = None, save_log: bool | None = None
+) -> None:
+    if save_log is not None:
+        # the name `save` had before
+        warnings.warn("init_logger's save_log is deprecated, use save instead", DeprecationWarning, stacklevel=2)
+        save = save_log
     logger.enable("{{MODULE}}")
     timezone = datetime.datetime.now(datetime.timezone.utc).astimezone().tzinfo
 
@@ -37,7 +44,7 @@ def init_logger(verbose: int, save_log: bool = True, msg_format: str | None = No
         ]
     }
 
-    if save_log:
+    if save:
         config["handlers"].append(
             {
                 "sink": f"{{MODULE}}_{datetime.datetime.now(tz=timezone).strftime('%Y-%d-%m--%H-%M-%S')}.log",
@@ -0,0 +1,115 @@
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from gtfparse.interval_index import GtfIndex
+
+STRAND_OPTIONS = ("+", "-", "same")
+
+POSITION_COLUMNS = ["seqname", "position"]
+INTERVAL_COLUMNS = ["seqname", "start", "end"]
+
+
+def _queries_frame(queries: pd.DataFrame | Sequence[tuple]) -> pd.DataFrame:
+    """
+    Queries as a DataFrame with 'seqname' and either 'position' or 'start'
+    and 'end' columns; tuples are (seqname, position) or (seqname, start, end)
+    """
+    if isinstance(queries, pd.DataFrame):
+        return queries
+    queries = list(queries)
+    if queries and len(queries[0]) == len(INTERVAL_COLUMNS):
+        return pd.DataFrame(queries, columns=INTERVAL_COLUMNS)
+    return pd.DataFrame(queries, columns=POSITION_COLUMNS)
+
+
+def overlap_join(
+    queries: pd.DataFrame | Sequence[tuple],
+    gtf: pd.DataFrame,
+    features: Iterable[str] | None = None,
+    strand: str | None = None,
+    columns: Iterable[str] | None = None,
+    suffix: str = "_gtf",
+    index: GtfIndex | None = None,
+) -> pd.DataFrame:
+    """
+    Join positions or intervals, such as variants, to the GTF features they
+    overlap. All queries are looked up at once with the binary searches of
+    `GtfIndex.query_batch`, so millions of them take seconds.
+
+    Parameters
+    ----------
+    queries : pandas.DataFrame or sequence of tuples
+        A DataFrame with a 'seqname' column and either a 'position' column
+        or 'start' and 'end' columns (1-based, inclusive), or tuples of
+        (seqname, position) or (seqname, start, end)
+
+    gtf : pandas.DataFrame
+        Features to join to, as returned by `read_gtf`
+
+    features : iterable of str or None
+        Only join to features of these types (e.g. {"exon", "CDS"})
+
+    strand : str or None
+        Only join to features on the "+" or "-" strand, or on the same
+        strand as the query ("same", which needs a 'strand' column in
+        `queries`)
+
+    columns : iterable of str or None
+        Columns of `gtf` to include, by default all of them
+
+    suffix : str
+        Added to the names of `gtf` columns which `queries` also has, other
+        than 'seqname', which is the same on both sides
+
+    index : GtfIndex or None
+        An index already built from all rows of `gtf` (with
+        `GtfIndex.from_dataframe`), to reuse between calls
+
+    Returns
+    -------
+    :class:~pd.DataFrame with a row for every pair of a query and a feature
+    overlapping it, grouped by query in the order given. The columns of
+    `queries` come first and its index labels are kept, so that the result
+    can be aligned back to it; queries which overlap nothing are left out.
+    """
+    queries = _queries_frame(queries)
+    if strand is not None and strand not in STRAND_OPTIONS:
+        msg = f"strand must be one of {STRAND_OPTIONS} or None, not {strand!r}"
+        raise ValueError(msg)
+    if strand == "same" and "strand" not in queries.columns:
+        msg = "strand='same' needs a 'strand' column in queries"
+        raise ValueError(msg)
+    if "position" in queries.columns:
+        starts = ends = queries["position"].to_numpy()
+    else:
+        starts, ends = queries["start"].to_numpy(), queries["end"].to_numpy()
+
+    is_feature = None if features is None else gtf["feature"].isin(list(features)).to_numpy()
+    candidates = None
+    if index is None:
+        # index only the features that can match, so that the others don't
+        # cost anything to look through
+        if is_feature is not None:
+            candidates = np.flatnonzero(is_feature)
+        index = GtfIndex.from_dataframe(gtf if candidates is None else gtf.iloc[candidates])
+
+    query_positions, rows = index.query_batch(
+        queries["seqname"].to_numpy(dtype=object), starts, ends, strand=strand if strand in {"+", "-"} else None
+    )
+    if candidates is not None:
+        rows = candidates[rows]
+    elif is_feature is not None:
+        query_positions, rows = query_positions[is_feature[rows]], rows[is_feature[rows]]
+    if strand == "same":
+        same = gtf["strand"].to_numpy(dtype=object)[rows] == queries["strand"].to_numpy(dtype=object)[query_positions]
+        query_positions, rows = query_positions[same], rows[same]
+
+    gtf_columns = [name for name in (gtf.columns if columns is None else columns) if name != "seqname"]
+    left = queries.iloc[query_positions]
+    right = gtf.iloc[rows, gtf.columns.get_indexer(gtf_columns)].rename(
+        columns={name: f"{name}{suffix}" for name in gtf_columns if name in queries.columns}
+    )
+    right.index = left.index
+    return pd.concat([left, right], axis=1)
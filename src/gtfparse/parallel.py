@@ -0,0 +1,159 @@
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+from itertools import pairwise
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from gtfparse import expand_attributes
+from gtfparse._logger import logger
+from gtfparse.decompress import COMPRESSED_SUFFIXES
+from gtfparse.read_gtf import concat_chunks, parse_gtf
+from gtfparse.required_columns import REQUIRED_COLUMNS
+from gtfparse.stats import ParseStats
+
+
+def can_shard(filepath_or_buffer: object) -> bool:
+    """
+    Only uncompressed files on disk can be split into byte ranges
+    """
+    return isinstance(filepath_or_buffer, Path) and filepath_or_buffer.suffix not in COMPRESSED_SUFFIXES
+
+
+def byte_ranges(filepath: Path, n_ranges: int) -> list[tuple[int, int]]:
+    """
+    Split a file into (at most) `n_ranges` contiguous byte ranges of roughly
+    equal size, each of which starts at the beginning of a line and ends just
+    after a newline (or at the end of the file).
+    """
+    file_size = filepath.stat().st_size
+    boundaries = [0]
+    with open(filepath, "rb") as gtf:
+        for i in range(1, n_ranges):
+            # step back one byte so that a boundary which already falls on the
+            # start of a line stays there
+            gtf.seek(max(file_size * i // n_ranges - 1, boundaries[-1]))
+            gtf.readline()
+            boundaries.append(min(gtf.tell(), file_size))
+    boundaries.append(file_size)
+    return [(start, end) for start, end in pairwise(boundaries) if start < end]
+
+
+def _parse_byte_range(
+    byte_range: tuple[int, int],
+    filepath: Path,
+    chunksize: int,
+    expand_attribute_column: bool,
+    restrict_attribute_columns: list[str] | None,
+    attribute_keys: list[str] | None,
+    features: set[str] | None,
+    seqnames: set[str] | None,
+    interval: tuple[int, int] | None,
+) -> tuple[pd.DataFrame, int]:
+    """
+    Parse one byte range of a GTF, returning its rows (labelled with their
+    row number within the range) and how many rows it had before filtering
+    """
+    start, end = byte_range
+    with open(filepath, "rb") as gtf:
+        gtf.seek(start)
+        data = BytesIO(gtf.read(end - start))
+
+    stats = ParseStats()
+    df = parse_gtf(data, chunksize=chunksize, features=features, seqnames=seqnames, interval=interval, stats=stats)
+    n_rows = stats.stages["read"].rows_in if "read" in stats.stages else 0
+    if not expand_attribute_column:
+        return df, n_rows
+
+    # leave numeric coercion and filling missing values until the ranges have
+    # been put back together, otherwise column dtypes could differ between them
+    attribute_values = expand_attributes.expand_attribute_column(
+        df["attribute"],
+        restrict_attribute_columns=restrict_attribute_columns,
+        attribute_keys=attribute_keys,
+        missing_value=np.nan,
+        coerce_numeric=False,
+    )
+    return pd.concat([df.drop(columns="attribute"), attribute_values], axis=1), n_rows
+
+
+def parse_gtf_in_parallel(
+    filepath: Path,
+    n_jobs: int,
+    chunksize: int = 1024 * 1024,
+    expand_attribute_column: bool = True,
+    restrict_attribute_columns: list[str] | None = None,
+    attribute_keys: Iterable[str] | None = None,
+    features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    infer_types: bool = False,
+) -> pd.DataFrame:
+    """
+    Parse an uncompressed GTF by splitting it into newline-aligned byte
+    ranges, each of which is parsed (and has its attributes expanded) in
+    its own worker process.
+
+    The pieces are concatenated in file order, so rows come out in the same
+    order, and with the same row labels, as with a single process. Columns are the union of the columns of
+    every piece, in order of first appearance, and numeric attribute columns
+    are converted once everything has been put back together.
+
+    Parameters
+    ----------
+    filepath : Path
+        Path to an uncompressed GTF file
+
+    n_jobs : int
+        Number of worker processes. Values below 1 mean one per CPU.
+
+    The other parameters are the same as for `parse_gtf_and_expand_attributes`
+    (or `parse_gtf` when `expand_attribute_column` is False).
+    """
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    ranges = byte_ranges(filepath, n_jobs)
+    if attribute_keys is not None:
+        attribute_keys = list(attribute_keys)
+
+    logger.info(f"Parsing {len(ranges)} byte ranges of {filepath} in {n_jobs} processes")
+    with ProcessPoolExecutor(max_workers=min(n_jobs, max(len(ranges), 1))) as executor:
+        results = list(
+            executor.map(
+                partial(
+                    _parse_byte_range,
+                    filepath=filepath,
+                    chunksize=chunksize,
+                    expand_attribute_column=expand_attribute_column,
+                    restrict_attribute_columns=restrict_attribute_columns,
+                    attribute_keys=attribute_keys,
+                    features=features,
+                    seqnames=seqnames,
+                    interval=interval,
+                ),
+                ranges,
+            )
+        )
+
+    if not results:
+        return parse_gtf(BytesIO(b""), chunksize=chunksize)
+
+    # rows are labelled with their row number in the whole file, as they are
+    # when it's parsed by a single process
+    pieces = []
+    offset = 0
+    for piece, n_rows in results:
+        piece.index += offset
+        pieces.append(piece)
+        offset += n_rows
+    df = concat_chunks(pieces)
+    if not expand_attribute_column:
+        return df
+
+    attribute_columns = df.columns.drop(REQUIRED_COLUMNS[:-1])
+    attribute_values = expand_attributes.fill_attribute_values(df[attribute_columns].copy(), infer_types=infer_types)
+    return pd.concat([df.drop(columns=attribute_columns), attribute_values], axis=1)
@@ -12,21 +12,54 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import re
-from collections.abc import Callable
+import io
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from functools import cache
 from importlib.util import find_spec
 from io import StringIO
+from itertools import islice
 from math import ceil
 from pathlib import Path
-from sys import intern
-from typing import TextIO
+from typing import TYPE_CHECKING, TextIO
 
 import numpy as np
 import pandas as pd
-from loguru import logger
-from tqdm.auto import tqdm
+from pandas.api.types import union_categoricals
 
+from gtfparse import decompress, expand_attributes
+from gtfparse._logger import logger
 from gtfparse.parsing_error import ParsingError
+from gtfparse.required_columns import REQUIRED_COLUMNS
+from gtfparse.stats import ParseStats
+
+if TYPE_CHECKING:
+    import polars as pl
+    import pyarrow as pa
+
+# strings read as missing values: "." plus pandas' default NA strings
+NA_VALUES = [
+    ".",
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
 
 
 # @logger.catch
@@ -34,6 +67,9 @@ def parse_gtf(
     filepath_or_buffer: str | TextIO | Path,
     chunksize: int = 1024 * 1024,
     features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    stats: ParseStats | None = None,
 ) -> pd.DataFrame:
     """
     Parameters
@@ -46,14 +82,61 @@ def parse_gtf(
     features : set or None
         Drop entries which aren't one of these features
 
+    seqnames : set or None
+        Drop entries which aren't on one of these chromosomes/scaffolds
+
+    interval : tuple of (int, int) or None
+        Drop entries which don't overlap this range of (1-based, inclusive)
+        positions
+
+    stats : ParseStats or None
+        Filled in with the bytes read and the row counts and timings of each
+        stage
+
     Returns
     -------
 
     :class:~pd.DataFrame
     """
+    stats = ParseStats() if stats is None else stats
+    chunks = list(
+        _iter_chunks(
+            filepath_or_buffer, chunksize, features=features, seqnames=seqnames, interval=interval, stats=stats
+        )
+    )
+    with stats.stage("concat") as stage:
+        stage.rows_in = stage.rows_out = sum(len(chunk) for chunk in chunks)
+        df = concat_chunks(chunks)
+    with stats.stage("repair") as stage:
+        stage.rows_in = stage.rows_out = len(df)
+        return _repair_columns(df)
+
+
+def concat_chunks(chunks: list[pd.DataFrame], ignore_index: bool = False) -> pd.DataFrame:
+    """
+    Concatenate pieces of a GTF, keeping 'strand' categorical even when the
+    pieces didn't all see the same strands
+    """
+    df = pd.concat(chunks, ignore_index=ignore_index)
+    if all(isinstance(chunk["strand"].dtype, pd.CategoricalDtype) for chunk in chunks):
+        df["strand"] = union_categoricals([chunk["strand"] for chunk in chunks], sort_categories=True)
+    return df
 
-    dataframes = []
 
+def _iter_chunks(
+    filepath_or_buffer: str | TextIO | Path,
+    chunksize: int,
+    features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    stats: ParseStats | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a GTF one chunk at a time, dropping the rows of each chunk which
+    don't match the `parse_gtf` predicates. Only the time spent reading and
+    filtering is counted in the 'read' stage of `stats`, not the time the
+    caller spends on each chunk.
+    """
     # GTF columns:
     # 1) seqname: str ("1", "X", "chrX", etc...)
     # 2) source : str
@@ -80,10 +163,39 @@ def parse_gtf(
 
     # tqdm.pandas(tqdm, leave=True)
     logger.info("Reading in data in chunks")
-    mmap = not isinstance(filepath_or_buffer, StringIO)
+    stats = ParseStats() if stats is None else stats
+    source = filepath_or_buffer
+    n_rows = None
+    n_bytes = None
+    row_numbers = None
+    if isinstance(filepath_or_buffer, Path) and filepath_or_buffer.suffix in decompress.GZIP_SUFFIXES:
+        # inflated in other threads while the chunks are parsed
+        source = decompress.open_decompressed(filepath_or_buffer)
+    elif isinstance(filepath_or_buffer, Path) and filepath_or_buffer.suffix not in decompress.COMPRESSED_SUFFIXES:
+        # other compressed paths are handed to pandas, which infers their
+        # compression from the suffix
+        from gtfparse import line_index
+
+        index = line_index.load_line_index(filepath_or_buffer)
+        if index is not None:
+            # with a line index, only the seqnames asked for are read, and we
+            # know exactly how many rows that is
+            n_rows = index.n_rows(seqnames)
+            if seqnames:
+                logger.info(f"Reading the records on {seqnames} using the line index")
+                source = line_index.open_byte_ranges(filepath_or_buffer, index.byte_ranges(seqnames))
+                row_numbers = index.row_numbers(seqnames)
+        if source is filepath_or_buffer:
+            n_bytes = filepath_or_buffer.stat().st_size
+            source = open(filepath_or_buffer, "rb")
+    elif isinstance(filepath_or_buffer, StringIO):
+        n_bytes = len(filepath_or_buffer.getvalue()) - filepath_or_buffer.tell()
+    position = _position_function(source)
+    # pandas starts reading as soon as the reader is made
+    start_position = last_position = position() if position is not None else 0
 
     chunk_iterator = pd.read_csv(
-        filepath_or_buffer,
+        source,
         sep="\t",
         comment="#",
         names=[
@@ -102,43 +214,102 @@ def parse_gtf(
         on_bad_lines="warn",
         chunksize=chunksize,
         engine="c",
-        na_values=".",
-        converters={
-            "frame": parse_frame,
-            "seqname": intern,
-            "source": intern,
-            "feature": intern,
-            "score": intern,
+        # seqname, source, feature, score and frame are kept as the text in the
+        # file, "." included, so only the other columns get missing values
+        keep_default_na=False,
+        na_values=dict.fromkeys(["start", "end", "strand", "attribute"], NA_VALUES),
+        dtype={
+            "seqname": str,
+            "source": str,
+            "feature": str,
+            "start": np.int64,
+            "end": np.int64,
+            "score": str,
+            "strand": "category",
+            "frame": str,
         },
-        dtype={"start": np.int64, "end": np.int64, "exon_number": np.int64, "strand": "category"},
-        memory_map=mmap,
         low_memory=False,
     )
 
-    if isinstance(filepath_or_buffer, StringIO):
-        file_size = len(filepath_or_buffer.getvalue())
-    elif isinstance(filepath_or_buffer, Path):
-        file_size = filepath_or_buffer.stat().st_size
+    if features:
+        logger.info(f"Filtering for entries that have a feature in {features}")
+    if seqnames:
+        logger.info(f"Filtering for entries on {seqnames}")
+    if interval:
+        logger.info(f"Filtering for entries overlapping positions {interval[0]}-{interval[1]}")
+
+    # progress is shown in chunks when we know how many there are going to
+    # be, otherwise in bytes of text read
+    from tqdm.auto import tqdm
 
+    if n_rows is not None:
+        progress = tqdm(desc="loading file", total=ceil(n_rows / chunksize), unit="chunks", leave=True)
+    elif position is not None:
+        progress = tqdm(desc="loading file", total=n_bytes, unit="B", unit_scale=True, unit_divisor=1024, leave=True)
+    else:
+        progress = tqdm(desc="loading file", unit="chunks", leave=True)
+
+    chunks = iter(chunk_iterator)
     try:
-        for df in tqdm(
-            chunk_iterator,
-            desc="loading file",
-            total=ceil(file_size / (chunksize * 425)),
-            unit="chunks",
-            leave=True,
-        ):
-            dataframes.append(df)
+        while True:
+            with stats.stage("read") as stage:
+                df = next(chunks, None)
+                if df is None:
+                    break
+                df["frame"] = parse_frames(df["frame"])
+                if row_numbers is not None:
+                    # rows are labelled with their row number in the whole file,
+                    # as they would be without the index
+                    read_starts, file_starts = row_numbers
+                    runs = np.searchsorted(read_starts, df.index, side="right") - 1
+                    df.index = df.index + (file_starts - read_starts)[runs]
+                filtered = _filter_chunk(df, features=features, seqnames=seqnames, interval=interval)
+                stage.rows_in += len(df)
+                stage.rows_out += len(filtered)
+                if position is not None:
+                    current_position = position()
+                    stats.bytes_read += current_position - last_position
+                    if n_rows is None:
+                        progress.update(current_position - last_position)
+                    last_position = current_position
+                if n_rows is not None or position is None:
+                    progress.update(1)
+            yield filtered
     except Exception as e:
         msg = f"There was an error in parsing the gtf: {e}"
         raise ParsingError(msg) from e
+    finally:
+        progress.close()
+        if source is not filepath_or_buffer:
+            source.close()
+    if position is not None:
+        logger.info(f"Read {last_position - start_position} bytes in {stats.stages['read'].wall_time:.2f}s")
+
+
+def _position_function(source: object) -> Callable[[], int] | None:
+    """
+    How far into `source` reading has got, or None if it can't tell
+    """
+    try:
+        source.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+    return source.tell
 
-    df = pd.concat(dataframes)
-    if features:
-        logger.info(f"Filtering for entries that have a feature in {features}")
-        df = df[df["feature"].isin(features)]
 
-    if find_spec("swifter"):
+@cache
+def _swifter_available() -> bool:
+    """
+    Whether swifter is installed, looked up once rather than on every parse
+    """
+    return find_spec("swifter") is not None
+
+
+def _repair_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fix up non-standard 'attribute' strings and missing 'start'/'end' values
+    """
+    if _swifter_available():
         import swifter  # noqa: F401
 
         logger.info("swifter found, processing in parallel")
@@ -151,15 +322,35 @@ def parse_gtf(
         df["end"] = df["end"].swifter.progress_bar(True).apply(np.nan_to_num).astype(np.int64)
     else:
         logger.info("Repairing non-standard 'attributes'")
-        df["attribute"] = df["attribute"].apply(fix_attribute_column)
+        df["attribute"] = fix_attribute_strings(df["attribute"])
         logger.info("Converting non-integer 'start' values to 0")
-        df["start"] = df["start"].apply(np.nan_to_num).astype(np.int64)
+        df["start"] = np.nan_to_num(df["start"].to_numpy()).astype(np.int64)
         logger.info("Converting non-integer 'end' values to 0")
-        df["end"] = df["end"].apply(np.nan_to_num).astype(np.int64)
+        df["end"] = np.nan_to_num(df["end"].to_numpy()).astype(np.int64)
 
     return df
 
 
+def _filter_chunk(
+    df: pd.DataFrame,
+    features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+) -> pd.DataFrame:
+    """
+    Apply the row predicates of `parse_gtf` to a single chunk so that rows
+    which will be dropped never reach the concatenation or attribute parsing.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if features:
+        mask &= df["feature"].isin(features).to_numpy()
+    if seqnames:
+        mask &= df["seqname"].isin(seqnames).to_numpy()
+    if interval:
+        mask &= ((df["start"] <= interval[1]) & (df["end"] >= interval[0])).to_numpy()
+    return df if mask.all() else df.take(np.flatnonzero(mask))
+
+
 def parse_frame(s: str) -> int:
     if s == ".":
         s_parsed = 0
@@ -171,15 +362,48 @@ def parse_frame(s: str) -> int:
     return s_parsed
 
 
+FRAMES = {".": 0, "0": 0, "1": 1, "2": 2}
+
+
+def parse_frames(frames: pd.Series) -> pd.Series:
+    """
+    `parse_frame` applied to a whole column at once
+    """
+    parsed = frames.map(FRAMES)
+    if parsed.isna().any():
+        msg = "Cannot parse annotation frame"
+        raise ValueError(msg)
+    return parsed.astype(np.int64)
+
+
 def fix_attribute_column(attribute: str) -> str:
     return attribute.replace(';"', '"').replace(";-", "-").replace("; ", ";")
 
 
+def fix_attribute_strings(attributes: pd.Series) -> pd.Series:
+    """
+    `fix_attribute_column` applied to a whole column at once. None of the
+    replaced sequences contain a newline, so they can be replaced in all of
+    the attribute strings joined by newlines in one go.
+    """
+    if attributes.empty:
+        return attributes
+    if attributes.isna().any():
+        return attributes.apply(fix_attribute_column)
+    fixed = fix_attribute_column("\n".join(attributes.to_numpy(dtype=object))).split("\n")
+    return pd.Series(fixed, index=attributes.index, dtype=object, name=attributes.name)
+
+
 def parse_gtf_and_expand_attributes(
     filepath_or_buffer: str | TextIO | Path,
     chunksize: int = 1024 * 1024,
     restrict_attribute_columns: list[str] | None = None,
     features: set[str] | None = None,
+    attribute_keys: Iterable[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    stats: ParseStats | None = None,
+    infer_types: bool = False,
 ) -> pd.DataFrame:
     """
     Parse lines into column->values dictionary and then expand
@@ -199,74 +423,321 @@ def parse_gtf_and_expand_attributes(
 
     features : set or None
         Ignore entries which don't correspond to one of the supplied features
-    """
-    df = parse_gtf(filepath_or_buffer, chunksize=chunksize, features=features)
 
-    logger.info("Expanding attributes")
+    attribute_keys : iterable of str or None
+        If given, only these attribute keys are extracted and every other
+        key/value pair is skipped without being materialized.
 
-    def attribute_to_dict(attributes: str) -> dict[str, str]:
-        attributes = attributes.rstrip(";")
-
-        # this would be simple if attribute keys weren't ever duplicated
-        # but the GTF/GFF3 specs don't forbid it so...
-        # return dict(
-        #     re.split("\s+|=+|,+", _)
-        #     for _ in re.split(";\s*", x)
-        #     if len(re.split("\s|=", _)) == 2
-        # )
-
-        attr_dict: dict[str, str] = {}
-        keys = [
-            re.split(r"\s+|=+|,+", _)[0]
-            for _ in re.split(r";\s*", attributes)
-            if len(re.split(r"\s|=", _)) == 2  # noqa: PLR2004
-        ]
-        values = [
-            re.split(r"\s+|=+|,+", _)[1]
-            for _ in re.split(r";\s*", attributes)
-            if len(re.split(r"\s|=", _)) == 2  # noqa: PLR2004
-        ]
-        for i, j in zip(keys, values, strict=True):
-            _j = j.strip('"')
-            attr_dict[i] = ",".join([attr_dict[i], _j]) if i in attr_dict else _j
-        return attr_dict
-
-    if find_spec("swifter"):
-        import swifter  # noqa: F401
+    seqnames : set or None
+        Ignore entries which aren't on one of the supplied chromosomes/scaffolds
 
-        logger.info("Converting 'attribute' column to dictionaries, then to json")
-        attribute_values = pd.read_json(
-            StringIO(df["attribute"].swifter.progress_bar(True).apply(attribute_to_dict).to_json(orient="records"))
-        ).replace(to_replace=np.nan, value="")
-    else:
-        logger.info("Converting 'attribute' column to dictionaries, then to json")
-        attribute_values = pd.read_json(
-            StringIO(df["attribute"].apply(attribute_to_dict).to_json(orient="records"))
-        ).replace(to_replace=np.nan, value="")
-
-    if restrict_attribute_columns is not None:
-        logger.info("Combining 'attribute' values not selected for expansion")
-        fold_columns = attribute_values.columns[~attribute_values.columns.isin(restrict_attribute_columns)]
-        attribute_column = attribute_values[fold_columns].apply(
-            lambda x: ";".join(f"{k}={v}" for k, v in x.items() if not pd.isnull(v)),
-            axis=1,
-        )
-        logger.info("Concatenating columns")
-        expanded_df = pd.concat(
-            [
-                df.loc[:, df.columns.drop("attribute")],
-                attribute_column,
-                attribute_values[restrict_attribute_columns],
-            ],
-            axis=1,
+    interval : tuple of (int, int) or None
+        Ignore entries which don't overlap this range of positions
+
+    stats : ParseStats or None
+        Filled in with the bytes read and the row counts and timings of each
+        stage
+
+    infer_types : bool
+        Give attribute columns whose values are all numbers pandas' nullable
+        Int64 or Float64 dtype, with pd.NA where a key didn't occur (see
+        `expand_attributes.infer_attribute_type`)
+    """
+    stats = ParseStats() if stats is None else stats
+    df = parse_gtf(
+        filepath_or_buffer,
+        chunksize=chunksize,
+        features=features,
+        seqnames=seqnames,
+        interval=interval,
+        stats=stats,
+    )
+
+    logger.info("Expanding attributes")
+    with stats.stage("expand_attributes") as stage:
+        stage.rows_in = stage.rows_out = len(df)
+        attribute_values = expand_attributes.expand_attribute_column(
+            df["attribute"],
+            restrict_attribute_columns=restrict_attribute_columns,
+            attribute_keys=attribute_keys,
+            infer_types=infer_types,
         )
-    else:
-        logger.info("Concatenating columns")
+
+    logger.info("Concatenating columns")
+    with stats.stage("concat_attributes") as stage:
+        stage.rows_in = stage.rows_out = len(df)
         expanded_df = pd.concat([df.loc[:, df.columns.drop("attribute")], attribute_values], axis=1)
 
     return expanded_df
 
 
+@contextmanager
+def _open_text(filepath_or_buffer: str | TextIO | Path) -> Iterator[TextIO]:
+    """
+    Open a (possibly compressed) GTF for reading lines of text. Buffers are
+    rewound to where they were on exit so that they can be parsed again.
+    """
+    if isinstance(filepath_or_buffer, str | Path):
+        path = Path(filepath_or_buffer)
+        if path.suffix in decompress.GZIP_SUFFIXES:
+            with io.TextIOWrapper(decompress.open_decompressed(path)) as lines:
+                yield lines
+        elif path.suffix in decompress.COMPRESSED_SUFFIXES:
+            # the other compressions are opened the same way read_csv opens them
+            from pandas.io.common import get_handle
+
+            with get_handle(path, "r", compression="infer") as handles:
+                yield handles.handle
+        else:
+            with open(path) as lines:
+                yield lines
+    else:
+        start = filepath_or_buffer.tell()
+        try:
+            yield filepath_or_buffer
+        finally:
+            filepath_or_buffer.seek(start)
+
+
+def _iter_attribute_strings(
+    lines: Iterable[str],
+    features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+) -> Iterator[str]:
+    """
+    Yield the repaired 'attribute' field of every line that `parse_gtf`
+    would keep, skipping comments, blank lines, malformed lines and lines
+    which don't match the `parse_gtf` predicates.
+    """
+    for line in lines:
+        fields = [field.lstrip() for field in line.split("#", 1)[0].rstrip("\r\n").split("\t")]
+        if len(fields) != len(REQUIRED_COLUMNS):
+            continue
+        if features and fields[2] not in features:
+            continue
+        if seqnames and fields[0] not in seqnames:
+            continue
+        if interval and not (int(fields[3]) <= interval[1] and int(fields[4]) >= interval[0]):
+            continue
+        yield fix_attribute_column(fields[-1])
+
+
+def discover_attribute_keys(
+    filepath_or_buffer: str | TextIO | Path,
+    sample_rows: int | None = None,
+    features: set[str] | None = None,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+) -> list[str]:
+    """
+    Find which keys occur in the 'attribute' column of a GTF without building
+    a DataFrame.
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or buffer object
+        Path to GTF file (may be gzip compressed) or buffer object
+        such as StringIO
+
+    sample_rows : int or None
+        Only look at this many rows from the top of the file. If None, then
+        scan the whole file.
+
+    features : set or None
+        Only look at entries which are one of these features
+
+    seqnames : set or None
+        Only look at entries on one of these chromosomes/scaffolds
+
+    interval : tuple of (int, int) or None
+        Only look at entries which overlap this range of positions
+
+    Returns
+    -------
+    List of attribute keys in the order in which they first appear
+    """
+    attribute_keys: list[str] = []
+    with _open_text(filepath_or_buffer) as lines:
+        attributes = _iter_attribute_strings(lines, features=features, seqnames=seqnames, interval=interval)
+        if sample_rows is not None:
+            attributes = islice(attributes, sample_rows)
+        while block := list(islice(attributes, expand_attributes.ATTRIBUTE_BLOCK_ROWS)):
+            _, _, block_keys, _ = expand_attributes.tokenize_attributes(np.array(block, dtype=object))
+            attribute_keys.extend(k for k in block_keys if k not in attribute_keys)
+    return attribute_keys
+
+
+def iter_gtf(
+    filepath_or_buffer: str | TextIO | Path,
+    chunksize: int = 1024 * 1024,
+    features: set[str] | None = None,
+    usecols: list[str] | None = None,
+    expand_attribute_column: bool = True,
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    stats: ParseStats | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Parse a GTF one chunk at a time, so that only a single chunk is ever held
+    in memory.
+
+    Every chunk has the same columns: when attributes are expanded, the
+    attribute keys are either taken from `usecols` or found by a first pass
+    over the file with `discover_attribute_keys`, and keys that don't occur
+    in a chunk are filled in with empty strings. Expanded attribute columns
+    are always left as strings and 'strand' always has both '+' and '-' as
+    categories so that dtypes don't vary from one chunk to the next.
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or buffer object
+        Path to GTF file (may be gzip compressed) or buffer object
+        such as StringIO
+
+    chunksize : int
+        Number of rows read at a time. Chunks can be smaller than this when
+        rows are dropped by `features`, `seqnames` or `interval`.
+
+    features : set of str or None
+        Drop rows which aren't one of the features in the supplied set
+
+    usecols : list of str or None
+        Restrict which columns are returned to the given set. If None, then
+        return all columns.
+
+    expand_attribute_column : bool
+        Replace strings of semi-colon separated key-value values in the
+        'attribute' column with one column per distinct key.
+
+    seqnames : set of str or None
+        Drop rows which aren't on one of the chromosomes/scaffolds in the
+        supplied set
+
+    interval : tuple of (int, int) or None
+        Drop rows which don't overlap this range of (1-based, inclusive)
+        positions
+
+    stats : ParseStats or None
+        Filled in with the bytes read and the row counts and timings of each
+        stage as chunks are parsed, the time spent in the code consuming the
+        chunks excluded
+
+    Yields
+    ------
+    :class:~pd.DataFrame
+    """
+    stats = ParseStats() if stats is None else stats
+    if isinstance(filepath_or_buffer, str):
+        filepath_or_buffer = Path(filepath_or_buffer)
+
+    restrict_attribute_columns = None
+    attribute_keys = None
+    if expand_attribute_column:
+        if usecols is None:
+            logger.info("Finding attribute keys")
+            attribute_keys = discover_attribute_keys(
+                filepath_or_buffer, features=features, seqnames=seqnames, interval=interval
+            )
+            attribute_columns = attribute_keys
+        else:
+            wanted_keys = [c for c in usecols if c not in REQUIRED_COLUMNS]
+            if "attribute" in usecols:
+                restrict_attribute_columns = wanted_keys
+                attribute_columns = ["attribute", *wanted_keys]
+            else:
+                attribute_keys = wanted_keys
+                attribute_columns = wanted_keys
+
+    for chunk in _iter_chunks(
+        filepath_or_buffer, chunksize, features=features, seqnames=seqnames, interval=interval, stats=stats
+    ):
+        with stats.stage("repair") as stage:
+            stage.rows_in += len(chunk)
+            stage.rows_out += len(chunk)
+            df = _repair_columns(chunk)
+            # a chunk may only contain one of the strands
+            df["strand"] = df["strand"].cat.set_categories(pd.Index(["+", "-"]).union(df["strand"].cat.categories))
+        if expand_attribute_column:
+            with stats.stage("expand_attributes") as stage:
+                stage.rows_in += len(df)
+                stage.rows_out += len(df)
+                attribute_values = expand_attributes.expand_attribute_column(
+                    df["attribute"],
+                    restrict_attribute_columns=restrict_attribute_columns,
+                    attribute_keys=attribute_keys,
+                    coerce_numeric=False,
+                ).reindex(columns=attribute_columns, fill_value="")
+                df = pd.concat([df.drop(columns="attribute"), attribute_values], axis=1)
+        if usecols is not None:
+            df = df[[c for c in usecols if c in df.columns]]
+        yield df
+
+
+def _parse_file(
+    filepath_or_buffer: str | TextIO | Path,
+    chunksize: int,
+    n_jobs: int,
+    expand_attribute_column: bool,
+    restrict_attribute_columns: list[str] | None,
+    attribute_keys: list[str] | None,
+    features: set[str] | None,
+    seqnames: set[str] | None,
+    interval: tuple[int, int] | None,
+    stats: ParseStats,
+    infer_types: bool = False,
+) -> pd.DataFrame:
+    """
+    Parse a GTF with whichever of the parsers fits the options of `read_gtf`
+    """
+    if n_jobs != 1:
+        from gtfparse import parallel
+
+        if not parallel.can_shard(filepath_or_buffer):
+            logger.warning("Only uncompressed files on disk can be parsed in parallel, using a single process")
+            n_jobs = 1
+
+    if n_jobs != 1:
+        # the stages run in the worker processes, so only the whole parse is
+        # timed here
+        with stats.stage("parallel_parse") as stage:
+            df = parallel.parse_gtf_in_parallel(
+                filepath_or_buffer,
+                n_jobs=n_jobs,
+                chunksize=chunksize,
+                expand_attribute_column=expand_attribute_column,
+                restrict_attribute_columns=restrict_attribute_columns,
+                attribute_keys=attribute_keys,
+                features=features,
+                seqnames=seqnames,
+                interval=interval,
+                infer_types=infer_types,
+            )
+            stage.rows_out = len(df)
+        stats.bytes_read += Path(filepath_or_buffer).stat().st_size
+        return df
+    if expand_attribute_column:
+        return parse_gtf_and_expand_attributes(
+            filepath_or_buffer,
+            chunksize=chunksize,
+            restrict_attribute_columns=restrict_attribute_columns,
+            features=features,
+            attribute_keys=attribute_keys,
+            seqnames=seqnames,
+            interval=interval,
+            stats=stats,
+            infer_types=infer_types,
+        )
+    return parse_gtf(
+        filepath_or_buffer,
+        chunksize=chunksize,
+        features=features,
+        seqnames=seqnames,
+        interval=interval,
+        stats=stats,
+    )
+
+
 def read_gtf(
     filepath_or_buffer: str | TextIO | Path,
     expand_attribute_column: bool = True,
@@ -275,7 +746,18 @@ def read_gtf(
     usecols: list[str] | None = None,
     features: set[str] | None = None,
     chunksize: int = 1024 * 1024,
-) -> pd.DataFrame:
+    seqnames: set[str] | None = None,
+    interval: tuple[int, int] | None = None,
+    n_jobs: int = 1,
+    cache_dir: str | Path | None = None,
+    cache_max_bytes: int | None = None,
+    memory_map: bool = False,
+    categorical: bool | Iterable[str] = False,
+    region: str | None = None,
+    stats: ParseStats | None = None,
+    backend: str = "pandas",
+    infer_types: bool = False,
+) -> "pd.DataFrame | pl.DataFrame | pa.Table":
     """
     Parse a GTF into a dictionary mapping column names to sequences of values.
 
@@ -302,13 +784,100 @@ def read_gtf(
 
     usecols : list of str or None
         Restrict which columns are loaded to the give set. If None, then
-        load all columns.
+        load all columns. Attribute keys which aren't listed are never
+        extracted from the 'attribute' column.
 
     features : set of str or None
         Drop rows which aren't one of the features in the supplied set
 
     chunksize : int
+
+    seqnames : set of str or None
+        Drop rows which aren't on one of the chromosomes/scaffolds in the
+        supplied set
+
+    interval : tuple of (int, int) or None
+        Drop rows which don't overlap this range of (1-based, inclusive)
+        positions
+
+    n_jobs : int
+        Number of processes used to parse the file. Anything other than 1
+        splits an uncompressed file on disk into newline-aligned byte ranges
+        which are parsed side by side; values below 1 use one process per
+        CPU. Compressed files and buffers are always read by a single
+        process.
+
+    cache_dir : str or Path or None
+        If given, the parsed (and expanded) GTF is kept in this directory in
+        a binary columnar form and later reads of the same, unchanged file
+        with the same options load it from there instead of parsing the text
+        again. Only files on disk are cached.
+
+    cache_max_bytes : int or None
+        Once the cache grows beyond this size, the least recently used
+        entries are deleted. Defaults to `gtfparse.cache.DEFAULT_CACHE_MAX_BYTES`.
+
+    memory_map : bool
+        Return the cached GTF memory-mapped from `cache_dir` (parsing and
+        caching it first if need be) instead of read into memory. Numeric
+        columns are read-only views of the cache files and string columns
+        are categoricals with memory-mapped codes, so processes reading the
+        same annotation share a single copy of it. Requires `cache_dir`.
+
+    categorical : bool or iterable of str
+        Return string columns as pandas Categoricals. If True, 'seqname',
+        'source', 'feature' and 'strand' are converted along with any other
+        string column with few distinct values (see
+        `gtfparse.categorical.low_cardinality_columns`), such as
+        'gene_biotype' or 'tag'. Column names convert exactly those columns.
+
+    region : str or None
+        Only read the rows overlapping a region such as "chr1:1-5000000" (or
+        a whole sequence, "chr1") of a bgzip-compressed GTF sorted by
+        seqname and start, using the tabix index (.tbi or .csi) next to it to
+        decompress just the blocks of the file which hold them. Indexes can
+        be built with `gtfparse.tabix.build_tabix_index` or `tabix -p gff`.
+
+    stats : ParseStats or None
+        Filled in with the number of bytes read and, for each stage of the
+        parse, the rows going in and out, wall-clock and CPU time and peak
+        memory (see `gtfparse.stats.ParseStats`)
+
+    backend : str
+        "pandas" returns a pandas DataFrame. "polars" returns a Polars
+        DataFrame and "arrow" a PyArrow Table, built column by column as the
+        file is parsed rather than converted from a pandas DataFrame (see
+        `gtfparse.backends`); in these, keys missing from a row are null
+        rather than "". They need polars or pyarrow to be installed, don't
+        take `column_converters`, `cache_dir` or `memory_map`, and always
+        parse in a single process.
+
+    infer_types : bool
+        Give expanded attribute columns in which every value present is a
+        number (such as 'exon_number', 'level' or StringTie's 'FPKM') pandas'
+        nullable Int64 or Float64 dtype, with pd.NA rather than "" where a
+        key didn't occur. Without it, such columns are only converted when
+        every row has the key. The polars and arrow backends always do this.
+
+    Returns
+    -------
+    pandas.DataFrame, or a polars.DataFrame with backend="polars" and a
+    pyarrow.Table with backend="arrow"
+
+    Rows are filtered on `features`, `seqnames` and `interval` one chunk at
+    a time as the file is read, before any attribute parsing.
     """
+    stats = ParseStats() if stats is None else stats
+    if backend != "pandas":
+        from gtfparse import backends
+
+        backends.check_backend(backend)
+        if column_converters or cache_dir is not None or memory_map:
+            msg = "column_converters, cache_dir and memory_map can only be used with backend='pandas'"
+            raise ValueError(msg)
+        if n_jobs != 1:
+            logger.warning(f"backend={backend!r} parses in a single process, ignoring n_jobs={n_jobs}")
+
     if isinstance(filepath_or_buffer, str):
         filepath_or_buffer = Path(filepath_or_buffer)
 
@@ -316,38 +885,143 @@ def read_gtf(
         logger.exception(f"GTF file does not exist: {filepath_or_buffer}")
         raise FileNotFoundError
 
-    if expand_attribute_column:
-        result_df = parse_gtf_and_expand_attributes(
-            filepath_or_buffer, chunksize=chunksize, restrict_attribute_columns=usecols
+    restrict_attribute_columns = None
+    attribute_keys = None
+    if expand_attribute_column and usecols is not None:
+        # only extract the attribute keys that were asked for, unless the
+        # 'attribute' column is wanted too, in which case everything else
+        # gets folded into it
+        wanted_keys = [c for c in usecols if c not in REQUIRED_COLUMNS]
+        if "attribute" in usecols:
+            restrict_attribute_columns = wanted_keys
+        else:
+            attribute_keys = wanted_keys
+
+    if region is not None and not isinstance(filepath_or_buffer, Path):
+        msg = "region can only be read from a bgzip-compressed file on disk"
+        raise ValueError(msg)
+
+    if memory_map and cache_dir is None:
+        msg = "memory_map requires a cache_dir to map the parsed GTF from"
+        raise ValueError(msg)
+
+    if backend != "pandas":
+        return backends.read_gtf_native(
+            filepath_or_buffer,
+            backend,
+            expand_attribute_column=expand_attribute_column,
+            infer_biotype_column=infer_biotype_column,
+            usecols=usecols,
+            restrict_attribute_columns=restrict_attribute_columns,
+            attribute_keys=attribute_keys,
+            features=features,
+            chunksize=chunksize,
+            seqnames=seqnames,
+            interval=interval,
+            categorical=categorical,
+            region=region,
+            stats=stats,
         )
-    else:
-        result_df = parse_gtf(filepath_or_buffer, chunksize=chunksize, features=features)
-
-    if column_converters:
-        for column_name in column_converters:
-            result_df[column_name] = result_df[column_name].astype(column_converters[column_name], errors="ignore")
-
-    # Hackishly infer whether the values in the 'source' column of this GTF
-    # are actually representing a biotype by checking for the most common
-    # gene_biotype and transcript_biotype value 'protein_coding'
-    if infer_biotype_column:
-        unique_source_values = result_df["source"].unique()
-        if "protein_coding" in unique_source_values:
+
+    result_df = None
+    cache_entry = None
+    if cache_dir is not None:
+        from gtfparse import cache
+
+        if isinstance(filepath_or_buffer, Path):
+            cache_entry = cache.cache_entry_path(
+                cache_dir,
+                filepath_or_buffer,
+                options={
+                    "expand_attribute_column": expand_attribute_column,
+                    "restrict_attribute_columns": restrict_attribute_columns,
+                    "attribute_keys": attribute_keys,
+                    "features": features,
+                    "seqnames": seqnames,
+                    "interval": interval,
+                    "region": region,
+                    "infer_types": infer_types,
+                    "n_jobs": n_jobs,
+                },
+            )
+            with stats.stage("cache_load") as stage:
+                result_df = cache.load_cached_gtf(cache_entry, memory_map=memory_map)
+                stage.rows_out = 0 if result_df is None else len(result_df)
+            if result_df is not None:
+                logger.info(f"Loaded {filepath_or_buffer} from the cache at {cache_entry}")
+        else:
+            logger.warning("Only files on disk can be cached")
+
+    if result_df is None:
+        source = filepath_or_buffer
+        if region is not None:
+            from gtfparse import tabix
+
+            logger.info(f"Reading {region} from {filepath_or_buffer}")
+            with stats.stage("region_fetch") as stage:
+                lines = list(tabix.fetch_region(filepath_or_buffer, region))
+                stage.rows_out = len(lines)
+            source = StringIO("".join(lines))
+            n_jobs = 1
+        result_df = _parse_file(
+            source,
+            chunksize=chunksize,
+            n_jobs=n_jobs,
+            expand_attribute_column=expand_attribute_column,
+            restrict_attribute_columns=restrict_attribute_columns,
+            attribute_keys=attribute_keys,
+            features=features,
+            seqnames=seqnames,
+            interval=interval,
+            stats=stats,
+            infer_types=infer_types,
+        )
+        if cache_entry is not None:
+            with stats.stage("cache_save") as stage:
+                stage.rows_in = stage.rows_out = len(result_df)
+                try:
+                    cache.save_cached_gtf(result_df, cache_entry)
+                except TypeError as e:
+                    logger.warning(f"Not caching {filepath_or_buffer}: {e}")
+                else:
+                    max_bytes = cache.DEFAULT_CACHE_MAX_BYTES if cache_max_bytes is None else cache_max_bytes
+                    cache.evict_cache(cache_dir, max_bytes, keep=cache_entry)
+                    mapped_df = cache.load_cached_gtf(cache_entry, memory_map=True) if memory_map else None
+                    if mapped_df is not None:
+                        result_df = mapped_df
+
+    with stats.stage("finish") as stage:
+        stage.rows_in = stage.rows_out = len(result_df)
+        if column_converters:
+            for column_name in column_converters:
+                result_df[column_name] = result_df[column_name].astype(column_converters[column_name], errors="ignore")
+
+        # Hackishly infer whether the values in the 'source' column of this GTF
+        # are actually representing a biotype by checking for the most common
+        # gene_biotype and transcript_biotype value 'protein_coding'
+        if infer_biotype_column:
+            unique_source_values = result_df["source"].unique()
+            if "protein_coding" in unique_source_values:
+                column_names = result_df.columns.unique()
+                # Disambiguate between the two biotypes by checking if
+                # gene_biotype is already present in another column. If it is,
+                # the 2nd column is the transcript_biotype (otherwise, it's the
+                # gene_biotype)
+                if "gene_biotype" not in column_names:
+                    logger.info("Using column 'source' to replace missing 'gene_biotype'")
+                    result_df["gene_biotype"] = result_df["source"]
+                if "transcript_biotype" not in column_names:
+                    logger.info("Using column 'source' to replace missing 'transcript_biotype'")
+                    result_df["transcript_biotype"] = result_df["source"]
+
+        if categorical:
+            from gtfparse.categorical import to_categorical
+
+            result_df = to_categorical(result_df, columns=None if categorical is True else categorical)
+
+        if usecols is not None:
             column_names = result_df.columns.unique()
-            # Disambiguate between the two biotypes by checking if
-            # gene_biotype is already present in another column. If it is,
-            # the 2nd column is the transcript_biotype (otherwise, it's the
-            # gene_biotype)
-            if "gene_biotype" not in column_names:
-                logger.info("Using column 'source' to replace missing 'gene_biotype'")
-                result_df["gene_biotype"] = result_df["source"]
-            if "transcript_biotype" not in column_names:
-                logger.info("Using column 'source' to replace missing 'transcript_biotype'")
-                result_df["transcript_biotype"] = result_df["source"]
-
-    if usecols is not None:
-        column_names = result_df.columns.unique()
-        valid_columns = [c for c in usecols if c in column_names]
-        result_df = result_df[valid_columns]
+            valid_columns = [c for c in usecols if c in column_names]
+            result_df = result_df[valid_columns]
 
     return result_df
@@ -0,0 +1,164 @@
+"""
+Timings and row counts of the stages of parsing a GTF.
+
+Pass a `ParseStats` to `read_gtf` (or `parse_gtf`, `iter_gtf`, ...) and it is
+filled in as the file is parsed: how many bytes of text were read and, for
+each stage, how many rows went in and came out, the wall-clock and CPU time
+spent in it and the peak resident memory of the process by the time it ended.
+A callback given to `ParseStats` is called whenever a stage has done some
+work, so that parse performance can be reported while it's happening.
+"""
+
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from time import perf_counter, process_time
+
+
+def peak_rss() -> int | None:
+    """
+    Largest resident set size of this process so far in bytes, or None where
+    it can't be measured
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class StageStats:
+    """
+    Running totals of one stage of parsing
+
+    Attributes
+    ----------
+    name : str
+
+    rows_in : int
+        Rows handed to the stage
+
+    rows_out : int
+        Rows the stage produced, fewer than `rows_in` when rows were filtered
+
+    wall_time : float
+        Seconds spent in the stage
+
+    cpu_time : float
+        CPU seconds used by all threads of the process while in the stage.
+        Time spent in other processes (`n_jobs` > 1) isn't counted.
+
+    peak_rss : int or None
+        Peak resident memory of the process in bytes when the stage last
+        ended. It only ever grows, so the stage that raised it is the one
+        after which it jumps.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.rows_in = 0
+        self.rows_out = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_rss: int | None = None
+
+    @property
+    def rows_per_second(self) -> float | None:
+        return self.rows_in / self.wall_time if self.wall_time > 0 else None
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "name": self.name,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"StageStats({self.name!r}, rows_in={self.rows_in}, rows_out={self.rows_out}, "
+            f"wall_time={self.wall_time:.3f}, cpu_time={self.cpu_time:.3f})"
+        )
+
+
+class ParseStats:
+    """
+    Instrumentation of a parse, filled in by the parser
+
+    Parameters
+    ----------
+    callback : callable or None
+        Called with this `ParseStats` and the `StageStats` of a stage every
+        time the stage finishes a piece of work, e.g. after every chunk read.
+
+    Attributes
+    ----------
+    bytes_read : int
+        Bytes of GTF text read, after decompression
+
+    stages : dict
+        `StageStats` of every stage that ran, by name and in the order they
+        first ran: 'read' (reading chunks of text, with rows filtered on
+        `features`, `seqnames` and `interval`), 'concat', 'repair' (fixing
+        attribute strings and missing positions), 'expand_attributes',
+        'concat_attributes', and depending on the options 'cache_load',
+        'region_fetch', 'parallel_parse', 'cache_save' and 'finish'
+        (converters, biotypes, categoricals and column selection).
+    """
+
+    def __init__(self, callback: Callable[["ParseStats", StageStats], None] | None = None) -> None:
+        self.callback = callback
+        self.bytes_read = 0
+        self.stages: dict[str, StageStats] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """
+        Time the block of code in the `with` statement as (part of) stage
+        `name`, which the block can record its row counts in
+        """
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageStats(name)
+        wall_start, cpu_start = perf_counter(), process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall_time += perf_counter() - wall_start
+            stage.cpu_time += process_time() - cpu_start
+            stage.peak_rss = peak_rss()
+            if self.callback is not None:
+                self.callback(self, stage)
+
+    @property
+    def wall_time(self) -> float:
+        return sum(stage.wall_time for stage in self.stages.values())
+
+    @property
+    def cpu_time(self) -> float:
+        return sum(stage.cpu_time for stage in self.stages.values())
+
+    @property
+    def peak_rss(self) -> int | None:
+        peaks = [stage.peak_rss for stage in self.stages.values() if stage.peak_rss is not None]
+        return max(peaks) if peaks else None
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Everything recorded, as plain values that can be serialized to JSON
+        """
+        return {
+            "bytes_read": self.bytes_read,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+            "stages": [stage.to_dict() for stage in self.stages.values()],
+        }
+
+    def __repr__(self) -> str:
+        stages = ", ".join(repr(stage) for stage in self.stages.values())
+        return f"ParseStats(bytes_read={self.bytes_read}, stages=[{stages}])"
@@ -0,0 +1,311 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from gtfparse._logger import logger
+
+# features which mark the coding part of a transcript
+CODING_FEATURES = {"CDS", "start_codon", "stop_codon"}
+
+
+class _Groups:
+    """
+    Rows of a GTF grouped by the value of a key column, such as the exons of
+    each transcript. Groups are numbered in sorted order of their key and
+    rows without a key belong to no group (-1).
+    """
+
+    def __init__(self, keys: pd.Series) -> None:
+        keys = keys.to_numpy(dtype=object)
+        missing = pd.isna(keys) | (keys == "")
+        self.codes = np.full(len(keys), -1, dtype=np.int64)
+        self.codes[~missing], self.keys = pd.factorize(keys[~missing], sort=True)
+        self.keys = np.asarray(self.keys, dtype=object)
+
+        # a single stable sort puts the rows of each group next to each other,
+        # so per-group reductions can run over contiguous slices
+        self.order = np.flatnonzero(~missing)[np.argsort(self.codes[~missing], kind="stable")]
+        sorted_codes = self.codes[self.order]
+        self.boundaries = np.flatnonzero(np.r_[len(sorted_codes) > 0, sorted_codes[1:] != sorted_codes[:-1]])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def first(self, values: np.ndarray) -> np.ndarray:
+        """
+        Value from the first row (in file order) of every group
+        """
+        return values[self.order[self.boundaries]]
+
+    def min(self, values: np.ndarray) -> np.ndarray:
+        return np.minimum.reduceat(values[self.order], self.boundaries) if len(self) else values[:0]
+
+    def max(self, values: np.ndarray) -> np.ndarray:
+        return np.maximum.reduceat(values[self.order], self.boundaries) if len(self) else values[:0]
+
+    def unique_values(self, column: pd.Series, missing_value: Any) -> np.ndarray:
+        """
+        The one non-null value of `column` in every group, or `missing_value`
+        for groups in which it takes more (or fewer) than one value
+        """
+        grouped = column.iloc[self.order].groupby(self.codes[self.order], sort=True)
+        values = grouped.first().to_numpy(dtype=object)
+        values[(grouped.nunique(dropna=True) != 1).to_numpy()] = missing_value
+        return values
+
+
+def _feature_rows(
+    dataframe: pd.DataFrame,
+    feature_name: str,
+    seqname: np.ndarray,
+    strand: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+    keys: dict[str, np.ndarray],
+    missing_value: Any,
+) -> pd.DataFrame:
+    """
+    New rows with the columns of `dataframe`, filled with `missing_value`
+    apart from the core columns and the given keys
+    """
+    n_rows = len(start)
+    columns = {column_name: np.full(n_rows, missing_value, dtype=object) for column_name in dataframe.columns}
+    columns.update(
+        {
+            "seqname": seqname,
+            # set the source to 'gtfparse' to indicate that we made this
+            # entry up from other data
+            "source": np.full(n_rows, "gtfparse", dtype=object),
+            "feature": np.full(n_rows, feature_name, dtype=object),
+            "start": start.astype(np.int64),
+            "end": end.astype(np.int64),
+            "strand": strand,
+        }
+    )
+    columns.update(keys)
+    return pd.DataFrame(columns, columns=dataframe.columns)
+
+
+def synthesize_features(
+    dataframe: pd.DataFrame,
+    transcript_key: str = "transcript_id",
+    gene_key: str = "gene_id",
+    introns: bool = False,
+    utrs: bool = False,
+    extra_columns: dict[str, set[str]] | None = None,
+    missing_value: Any | None = None,
+) -> pd.DataFrame:
+    """
+    Build the feature hierarchy of a GTF which only has some of its levels,
+    e.g. exons and CDS but no transcripts or genes: transcripts are the span
+    of the rows sharing a transcript ID, genes the span of their transcripts.
+    Optionally also derive the introns between the exons of each transcript
+    and its 5' and 3' UTRs, the parts of its exons outside the span of its
+    CDS, start and stop codons.
+
+    Unlike calling `create_missing_features` once per level, the rows are
+    grouped and sorted once per key and every interval is computed with
+    array operations, so this scales to whole-genome annotations.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Should contain at least the core GTF columns and the key columns
+
+    transcript_key : str
+        Column identifying the transcript a row belongs to
+
+    gene_key : str
+        Column identifying the gene a row belongs to
+
+    introns : bool
+        Add an 'intron' row for every gap between consecutive exons of a
+        transcript
+
+    utrs : bool
+        Add 'five_prime_utr' and 'three_prime_utr' rows for the parts of the
+        exons of coding transcripts which lie before or after their coding
+        span, taking strand into account
+
+    extra_columns : dict
+        Mapping from the name of a synthesized feature to other columns
+        whose values should be carried over. A value is only filled in when
+        it's the same for all rows the feature was built from (the rows of
+        its transcript, for introns and UTRs).
+
+    missing_value : any
+        Which value to fill in for columns that we don't infer values for.
+
+    Returns original dataframe along with all extra rows created. Levels
+    which already exist (e.g. a GTF with transcript rows) aren't created
+    again, but are used to build the levels above them.
+    """
+    if missing_value is None:
+        missing_value = ""
+    extra_columns = extra_columns or {}
+    for feature_name, column_names in extra_columns.items():
+        for column_name in column_names:
+            if column_name not in dataframe.columns:
+                msg = (
+                    f"Column '{column_name}' for '{feature_name}' does not exist in GTF, columns = {dataframe.columns}"
+                )
+                raise ValueError(msg)
+
+    existing_features = set(dataframe["feature"].unique())
+    seqnames = dataframe["seqname"].to_numpy(dtype=object)
+    strands = dataframe["strand"].to_numpy(dtype=object)
+    starts = dataframe["start"].to_numpy(dtype=np.int64)
+    ends = dataframe["end"].to_numpy(dtype=np.int64)
+    features = dataframe["feature"].to_numpy(dtype=object)
+    new_rows = []
+
+    def extra_values(feature_name: str, groups: _Groups, group_indices: np.ndarray | None = None) -> dict:
+        values = {}
+        for column_name in extra_columns.get(feature_name, []):
+            unique_values = groups.unique_values(dataframe[column_name], missing_value)
+            values[column_name] = unique_values if group_indices is None else unique_values[group_indices]
+        return values
+
+    # transcripts are the union of the intervals of the rows tagged with their
+    # ID, unless the GTF already has them
+    transcripts = _Groups(dataframe[transcript_key])
+    transcript_genes = transcripts.first(dataframe[gene_key].to_numpy(dtype=object))
+    if "transcript" in existing_features:
+        logger.info("Feature 'transcript' already exists in GTF data")
+        is_transcript = features == "transcript"
+        transcript_rows = pd.DataFrame(
+            {
+                "seqname": seqnames[is_transcript],
+                "strand": strands[is_transcript],
+                "start": starts[is_transcript],
+                "end": ends[is_transcript],
+                gene_key: dataframe.loc[is_transcript, gene_key].to_numpy(dtype=object),
+            }
+        )
+    else:
+        logger.info("Creating rows for missing feature 'transcript'")
+        transcript_rows = pd.DataFrame(
+            {
+                "seqname": transcripts.first(seqnames),
+                "strand": transcripts.first(strands),
+                "start": transcripts.min(starts),
+                "end": transcripts.max(ends),
+                gene_key: transcript_genes,
+            }
+        )
+        new_rows.append(
+            _feature_rows(
+                dataframe,
+                "transcript",
+                transcript_rows["seqname"].to_numpy(),
+                transcript_rows["strand"].to_numpy(),
+                transcript_rows["start"].to_numpy(),
+                transcript_rows["end"].to_numpy(),
+                {transcript_key: transcripts.keys, gene_key: transcript_genes}
+                | extra_values("transcript", transcripts),
+                missing_value,
+            )
+        )
+
+    # genes are the union of their transcripts and of any rows which belong
+    # to a gene but to no transcript
+    if "gene" in existing_features:
+        logger.info("Feature 'gene' already exists in GTF data")
+    else:
+        logger.info("Creating rows for missing feature 'gene'")
+        gene_ids = dataframe[gene_key].to_numpy(dtype=object)
+        no_transcript = (transcripts.codes < 0) & ~pd.isna(gene_ids) & (gene_ids != "") & (features != "transcript")
+        members = pd.concat(
+            [
+                transcript_rows,
+                pd.DataFrame(
+                    {
+                        "seqname": seqnames[no_transcript],
+                        "strand": strands[no_transcript],
+                        "start": starts[no_transcript],
+                        "end": ends[no_transcript],
+                        gene_key: gene_ids[no_transcript],
+                    }
+                ),
+            ],
+            ignore_index=True,
+        )
+        genes = _Groups(members[gene_key])
+        # extra values come from every row of a gene, as in create_missing_features
+        all_genes = _Groups(dataframe[gene_key])
+        new_rows.append(
+            _feature_rows(
+                dataframe,
+                "gene",
+                genes.first(members["seqname"].to_numpy()),
+                genes.first(members["strand"].to_numpy()),
+                genes.min(members["start"].to_numpy()),
+                genes.max(members["end"].to_numpy()),
+                {gene_key: genes.keys} | extra_values("gene", all_genes, np.searchsorted(all_genes.keys, genes.keys)),
+                missing_value,
+            )
+        )
+
+    # exons in order of transcript and position
+    is_exon = (features == "exon") & (transcripts.codes >= 0)
+    exon_rows = np.flatnonzero(is_exon)
+    exon_rows = exon_rows[np.lexsort((starts[exon_rows], transcripts.codes[exon_rows]))]
+    exon_transcripts = transcripts.codes[exon_rows]
+
+    def transcript_rows_for(feature_name: str, rows: np.ndarray, start: np.ndarray, end: np.ndarray) -> None:
+        codes = transcripts.codes[rows]
+        new_rows.append(
+            _feature_rows(
+                dataframe,
+                feature_name,
+                seqnames[rows],
+                strands[rows],
+                start,
+                end,
+                {transcript_key: transcripts.keys[codes], gene_key: transcript_genes[codes]}
+                | extra_values(feature_name, transcripts, codes),
+                missing_value,
+            )
+        )
+
+    if introns and "intron" not in existing_features:
+        logger.info("Creating rows for introns")
+        # the furthest any earlier exon of the same transcript reaches, so that
+        # overlapping exons don't produce introns
+        reach = pd.Series(ends[exon_rows]).groupby(exon_transcripts).cummax().to_numpy()
+        gap = (exon_transcripts[1:] == exon_transcripts[:-1]) & (starts[exon_rows[1:]] > reach[:-1] + 1)
+        transcript_rows_for("intron", exon_rows[1:][gap], reach[:-1][gap] + 1, starts[exon_rows[1:]][gap] - 1)
+
+    if utrs and not existing_features & {"five_prime_utr", "three_prime_utr"}:
+        logger.info("Creating rows for 5' and 3' UTRs")
+        coding = np.flatnonzero(np.isin(features, list(CODING_FEATURES)) & (transcripts.codes >= 0))
+        coding_start = np.full(len(transcripts), np.iinfo(np.int64).max)
+        coding_end = np.full(len(transcripts), np.iinfo(np.int64).min)
+        np.minimum.at(coding_start, transcripts.codes[coding], starts[coding])
+        np.maximum.at(coding_end, transcripts.codes[coding], ends[coding])
+
+        exon_start = starts[exon_rows]
+        exon_end = ends[exon_rows]
+        is_coding = coding_end[exon_transcripts] >= coding_start[exon_transcripts]
+        # parts of exons left and right of the coding span
+        left = is_coding & (exon_start < coding_start[exon_transcripts])
+        left_end = np.minimum(exon_end, coding_start[exon_transcripts] - 1)
+        right = is_coding & (exon_end > coding_end[exon_transcripts])
+        right_start = np.maximum(exon_start, coding_end[exon_transcripts] + 1)
+
+        minus = strands[exon_rows] == "-"
+        for feature_name, left_side in [("five_prime_utr", ~minus), ("three_prime_utr", minus)]:
+            on_left = left & left_side
+            on_right = right & ~left_side
+            transcript_rows_for(
+                feature_name,
+                np.r_[exon_rows[on_left], exon_rows[on_right]],
+                np.r_[exon_start[on_left], right_start[on_right]],
+                np.r_[left_end[on_left], exon_end[on_right]],
+            )
+
+    new_rows = [rows for rows in new_rows if len(rows)]
+    if not new_rows:
+        return dataframe.copy()
+    return pd.concat([dataframe, *new_rows], ignore_index=True)
@@ -0,0 +1,451 @@
+"""
+Tabix indexes of bgzip-compressed, coordinate-sorted GTFs, for reading the
+records in a region without decompressing the rest of the file.
+
+An index divides each sequence into a hierarchy of bins (the UCSC binning
+scheme) and lists, for every bin, the chunks of the file (as BGZF virtual
+offsets) holding the records which fall in it. A .tbi index also keeps the
+offset of the first record overlapping every 16 kbp window, which rules out
+most chunks of the large bins near the top of the hierarchy; .csi indexes
+keep one such offset per bin instead. Indexes are written in the .tbi format
+used by `tabix -p gff`, so either tool can read the other's indexes.
+"""
+
+import re
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+
+from gtfparse.bgzf import BgzfReader, BgzfWriter
+from gtfparse.parsing_error import ParsingError
+
+TBI_MAGIC = b"TBI\x01"
+CSI_MAGIC = b"CSI\x01"
+
+# .tbi indexes always use 16 kbp windows and 6 levels of bins
+TABIX_MIN_SHIFT = 14
+TABIX_DEPTH = 5
+
+# the 'format' field of the header: generic tab-separated text with 1-based
+# coordinates, unless TBX_UCSC says they're 0-based
+TBX_GENERIC = 0
+TBX_UCSC = 0x10000
+
+# what `tabix -p gff` records: sequence, start and end in columns 1, 4 and 5
+# (counting from 1) and comment lines starting with '#'
+GFF_COLUMNS = (1, 4, 5)
+GFF_META_CHAR = "#"
+
+REGION_PATTERN = re.compile(r"^(?P<seqname>.+?)(?::(?P<start>[\d,]+)?(?:-(?P<end>[\d,]+)?)?)?$")
+
+
+def parse_region(region: str) -> tuple[str, int, int | None]:
+    """
+    Split a region such as "chr1:1,000,000-2,000,000" into its sequence name,
+    start and end (1-based and inclusive). "chr1" and "chr1:1000000" run to
+    the end of the sequence, for which the end is None.
+    """
+    match = REGION_PATTERN.match(region.strip())
+    if match is None:
+        msg = f"Cannot parse region {region!r}, expected e.g. 'chr1:1-5000000'"
+        raise ValueError(msg)
+    start = int(match["start"].replace(",", "")) if match["start"] else 1
+    end = int(match["end"].replace(",", "")) if match["end"] else None
+    if start < 1 or (end is not None and end < start):
+        msg = f"Region {region!r} is empty or starts before position 1"
+        raise ValueError(msg)
+    return match["seqname"], start, end
+
+
+def reg2bin(beg: int, end: int, min_shift: int = TABIX_MIN_SHIFT, depth: int = TABIX_DEPTH) -> int:
+    """
+    The smallest bin wholly containing the 0-based, half-open range [beg, end)
+    """
+    end -= 1
+    shift = min_shift
+    offset = ((1 << (depth * 3)) - 1) // 7
+    for level in range(depth, 0, -1):
+        if beg >> shift == end >> shift:
+            return offset + (beg >> shift)
+        shift += 3
+        offset -= 1 << ((level - 1) * 3)
+    return 0
+
+
+def reg2bins(beg: int, end: int, min_shift: int = TABIX_MIN_SHIFT, depth: int = TABIX_DEPTH) -> list[int]:
+    """
+    Every bin which may hold records overlapping the 0-based, half-open range
+    [beg, end)
+    """
+    if beg >= end:
+        return []
+    shift = min_shift + depth * 3
+    end = min(end, 1 << shift) - 1
+    bins = []
+    offset = 0
+    for level in range(depth + 1):
+        bins.extend(range(offset + (beg >> shift), offset + (end >> shift) + 1))
+        shift -= 3
+        offset += 1 << (level * 3)
+    return bins
+
+
+class TabixIndex:
+    """
+    The contents of a .tbi or .csi index
+
+    Parameters
+    ----------
+    seqnames : list of str
+        Sequences in the order they appear in the file
+
+    bins : list of dict
+        For each sequence, the chunks (pairs of virtual offsets) of each bin
+
+    min_offsets : list of list of int
+        For each sequence, the linear index of a .tbi index (the smallest
+        offset of a record overlapping each window), empty for .csi indexes
+
+    bin_min_offsets : list of dict
+        For each sequence, the smallest offset of a record in each bin of a
+        .csi index, empty for .tbi indexes
+
+    min_shift, depth : int
+        Size of the smallest bins (as a power of 2) and number of levels of
+        bins above them
+
+    columns : tuple of int
+        Columns (counting from 1) holding the sequence name, start and end
+
+    meta_char : str
+        Lines starting with this are comments
+
+    skip : int
+        Number of header lines at the top of the file
+
+    zero_based : bool
+        Whether starts are 0-based (as in BED) rather than 1-based (as in GTF)
+    """
+
+    def __init__(
+        self,
+        seqnames: list[str],
+        bins: list[dict[int, list[tuple[int, int]]]],
+        min_offsets: list[list[int]] | None = None,
+        bin_min_offsets: list[dict[int, int]] | None = None,
+        min_shift: int = TABIX_MIN_SHIFT,
+        depth: int = TABIX_DEPTH,
+        columns: tuple[int, int, int] = GFF_COLUMNS,
+        meta_char: str = GFF_META_CHAR,
+        skip: int = 0,
+        zero_based: bool = False,
+    ) -> None:
+        self.seqnames = seqnames
+        self.bins = bins
+        self.min_offsets = min_offsets or [[] for _ in seqnames]
+        self.bin_min_offsets = bin_min_offsets or [{} for _ in seqnames]
+        self.min_shift = min_shift
+        self.depth = depth
+        self.columns = columns
+        self.meta_char = meta_char
+        self.skip = skip
+        self.zero_based = zero_based
+        self._seqname_ids = {seqname: i for i, seqname in enumerate(seqnames)}
+
+    @property
+    def max_position(self) -> int:
+        return 1 << (self.min_shift + self.depth * 3)
+
+    def _min_offset(self, seqname_id: int, beg: int) -> int:
+        """
+        No record overlapping a range starting at `beg` lies before this offset
+        """
+        min_offsets = self.min_offsets[seqname_id]
+        if min_offsets:
+            return min_offsets[min(beg >> self.min_shift, len(min_offsets) - 1)]
+        # the deepest bin holding `beg` that has any records, or one of its parents
+        bin_min_offsets = self.bin_min_offsets[seqname_id]
+        bin_id = ((1 << (self.depth * 3)) - 1) // 7 + (beg >> self.min_shift)
+        while bin_id > 0 and bin_id not in bin_min_offsets:
+            bin_id = (bin_id - 1) >> 3
+        return bin_min_offsets.get(bin_id, 0)
+
+    def chunks(self, seqname: str, beg: int, end: int) -> list[tuple[int, int]]:
+        """
+        Sorted, non-overlapping chunks of the file holding every record on
+        `seqname` which overlaps the 0-based, half-open range [beg, end)
+        """
+        if seqname not in self._seqname_ids:
+            return []
+        seqname_id = self._seqname_ids[seqname]
+        bins = self.bins[seqname_id]
+        min_offset = self._min_offset(seqname_id, beg)
+        candidates = sorted(
+            (chunk_beg, chunk_end)
+            for bin_id in reg2bins(beg, end, self.min_shift, self.depth)
+            for chunk_beg, chunk_end in bins.get(bin_id, [])
+            if chunk_end > min_offset
+        )
+        merged: list[tuple[int, int]] = []
+        for chunk_beg, chunk_end in candidates:
+            if merged and chunk_beg <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], chunk_end))
+            else:
+                merged.append((max(chunk_beg, min_offset), chunk_end))
+        return merged
+
+
+def _read_header(data: bytes, position: int) -> tuple[dict, int]:
+    """
+    The tabix header shared by .tbi files and the auxiliary data of .csi files
+    """
+    file_format, col_seq, col_beg, col_end, meta, skip, names_size = struct.unpack_from("<7i", data, position)
+    position += 28
+    names = data[position : position + names_size].split(b"\0")[:-1]
+    header = {
+        "seqnames": [name.decode() for name in names],
+        "columns": (col_seq, col_beg, col_end),
+        "meta_char": chr(meta),
+        "skip": skip,
+        "zero_based": bool(file_format & TBX_UCSC),
+    }
+    return header, position + names_size
+
+
+def read_tabix_index(index_path: str | Path) -> TabixIndex:
+    """
+    Read a .tbi or .csi index
+    """
+    with BgzfReader(index_path) as reader:
+        data = reader.read()
+    magic = data[:4]
+    if magic == TBI_MAGIC:
+        header, position = _read_header(data, 8)
+        min_shift, depth = TABIX_MIN_SHIFT, TABIX_DEPTH
+    elif magic == CSI_MAGIC:
+        min_shift, depth, aux_size = struct.unpack_from("<3i", data, 4)
+        position = 16
+        if aux_size < 28:  # noqa: PLR2004
+            msg = f"{index_path} is a .csi index without a tabix header"
+            raise ParsingError(msg)
+        header, _ = _read_header(data, position)
+        position += aux_size
+        position += 4  # the number of sequences, also known from the header
+    else:
+        msg = f"{index_path} is not a tabix (.tbi) or .csi index"
+        raise ParsingError(msg)
+
+    all_bins, all_min_offsets, all_bin_min_offsets = [], [], []
+    for _ in header["seqnames"]:
+        (n_bins,) = struct.unpack_from("<i", data, position)
+        position += 4
+        bins: dict[int, list[tuple[int, int]]] = {}
+        bin_min_offsets: dict[int, int] = {}
+        for _ in range(n_bins):
+            if magic == TBI_MAGIC:
+                bin_id, n_chunks = struct.unpack_from("<Ii", data, position)
+                position += 8
+            else:
+                bin_id, bin_min_offset, n_chunks = struct.unpack_from("<IQi", data, position)
+                bin_min_offsets[bin_id] = bin_min_offset
+                position += 16
+            offsets = struct.unpack_from(f"<{2 * n_chunks}Q", data, position)
+            position += 16 * n_chunks
+            bins[bin_id] = list(zip(offsets[::2], offsets[1::2], strict=True))
+        min_offsets: list[int] = []
+        if magic == TBI_MAGIC:
+            (n_windows,) = struct.unpack_from("<i", data, position)
+            min_offsets = list(struct.unpack_from(f"<{n_windows}Q", data, position + 4))
+            position += 4 + 8 * n_windows
+        all_bins.append(bins)
+        all_min_offsets.append(min_offsets)
+        all_bin_min_offsets.append(bin_min_offsets)
+
+    return TabixIndex(
+        header["seqnames"],
+        all_bins,
+        min_offsets=all_min_offsets,
+        bin_min_offsets=all_bin_min_offsets,
+        min_shift=min_shift,
+        depth=depth,
+        columns=header["columns"],
+        meta_char=header["meta_char"],
+        skip=header["skip"],
+        zero_based=header["zero_based"],
+    )
+
+
+def find_tabix_index(filepath: str | Path) -> Path:
+    """
+    The .tbi or .csi index next to a bgzip-compressed file
+    """
+    filepath = Path(filepath)
+    for suffix in (".tbi", ".csi"):
+        index_path = filepath.with_name(filepath.name + suffix)
+        if index_path.exists():
+            return index_path
+    msg = f"No tabix index (.tbi or .csi) found for {filepath}, build one with gtfparse.tabix.build_tabix_index"
+    raise FileNotFoundError(msg)
+
+
+def _record_span(line: bytes, columns: tuple[int, int, int], zero_based: bool) -> tuple[str, int, int]:
+    """
+    Sequence name and 0-based, half-open range of a record
+    """
+    fields = line.rstrip(b"\r\n").split(b"\t")
+    col_seq, col_beg, col_end = columns
+    try:
+        beg = int(fields[col_beg - 1]) - (0 if zero_based else 1)
+        end = int(fields[col_end - 1]) if col_end else beg + 1
+    except (IndexError, ValueError) as e:
+        msg = f"Cannot find the position of line {line[:200]!r}"
+        raise ParsingError(msg) from e
+    return fields[col_seq - 1].decode(), beg, end
+
+
+def build_tabix_index(filepath: str | Path, index_path: str | Path | None = None, skip: int = 0) -> Path:
+    """
+    Write a .tbi index for a bgzip-compressed GTF, like `tabix -p gff`. The
+    file must be sorted by sequence name (with all records of a sequence
+    next to each other) and then by start, e.g. with
+    `(grep '^#' in.gtf; grep -v '^#' in.gtf | sort -k1,1 -k4,4n) | bgzip > out.gtf.gz`.
+
+    Parameters
+    ----------
+    filepath : str or Path
+        bgzip-compressed GTF, such as one written by `df_to_gtf` to a path
+        ending in '.gz'
+
+    index_path : str or Path or None
+        Where to write the index, by default next to the file with '.tbi'
+        added to its name
+
+    skip : int
+        Number of header lines at the top of the file which aren't records,
+        even though they don't start with '#' (`tabix -S`)
+
+    Returns
+    -------
+    Path of the index
+    """
+    filepath = Path(filepath)
+    index_path = filepath.with_name(filepath.name + ".tbi") if index_path is None else Path(index_path)
+
+    seqnames: list[str] = []
+    all_bins: list[dict[int, list[list[int]]]] = []
+    all_min_offsets: list[list[int]] = []
+    last_beg = 0
+    with BgzfReader(filepath) as reader:
+        for _ in range(skip):
+            reader.readline()
+        while True:
+            offset = reader.tell()
+            line = reader.readline()
+            if not line:
+                break
+            if line.startswith(GFF_META_CHAR.encode()) or not line.strip():
+                continue
+            seqname, beg, end = _record_span(line, GFF_COLUMNS, zero_based=False)
+            if end > 1 << (TABIX_MIN_SHIFT + TABIX_DEPTH * 3):
+                msg = f"Position {end} on {seqname} is too large for a .tbi index"
+                raise ValueError(msg)
+            if not seqnames or seqname != seqnames[-1]:
+                if seqname in seqnames:
+                    msg = f"{filepath} is not sorted: the records on {seqname} aren't all next to each other"
+                    raise ParsingError(msg)
+                seqnames.append(seqname)
+                all_bins.append({})
+                all_min_offsets.append([])
+            elif beg < last_beg:
+                msg = f"{filepath} is not sorted: {seqname}:{beg + 1} comes after {seqname}:{last_beg + 1}"
+                raise ParsingError(msg)
+            last_beg = beg
+            end = max(end, beg + 1)
+            end_offset = reader.tell()
+
+            chunks = all_bins[-1].setdefault(reg2bin(beg, end), [])
+            if chunks and chunks[-1][1] == offset:
+                chunks[-1][1] = end_offset
+            else:
+                chunks.append([offset, end_offset])
+
+            min_offsets = all_min_offsets[-1]
+            last_window = (end - 1) >> TABIX_MIN_SHIFT
+            if len(min_offsets) <= last_window:
+                min_offsets.extend([-1] * (last_window + 1 - len(min_offsets)))
+            for window in range(beg >> TABIX_MIN_SHIFT, last_window + 1):
+                if min_offsets[window] < 0:
+                    min_offsets[window] = offset
+
+    names = b"".join(seqname.encode() + b"\0" for seqname in seqnames)
+    col_seq, col_beg, col_end = GFF_COLUMNS
+    pieces = [
+        TBI_MAGIC,
+        struct.pack("<8i", len(seqnames), TBX_GENERIC, col_seq, col_beg, col_end, ord(GFF_META_CHAR), skip, len(names)),
+        names,
+    ]
+    for bins, min_offsets in zip(all_bins, all_min_offsets, strict=True):
+        pieces.append(struct.pack("<i", len(bins)))
+        for bin_id, chunks in sorted(bins.items()):
+            pieces.append(struct.pack("<Ii", bin_id, len(chunks)))
+            pieces.extend(struct.pack("<2Q", *chunk) for chunk in chunks)
+        # windows without records of their own start at the previous window's offset
+        previous = 0
+        for window, window_offset in enumerate(min_offsets):
+            if window_offset < 0:
+                min_offsets[window] = previous
+            previous = min_offsets[window]
+        pieces.append(struct.pack(f"<i{len(min_offsets)}Q", len(min_offsets), *min_offsets))
+    # no records without coordinates
+    pieces.append(struct.pack("<Q", 0))
+
+    with BgzfWriter(index_path) as writer:
+        writer.write(b"".join(pieces))
+    return index_path
+
+
+def fetch_region(filepath: str | Path, region: str, index: TabixIndex | None = None) -> Iterator[str]:
+    """
+    Lines of a bgzip-compressed, indexed GTF which overlap `region` (e.g.
+    "chr1:1-5000000"), decompressing only the blocks of the file which hold
+    them
+
+    Parameters
+    ----------
+    filepath : str or Path
+        bgzip-compressed GTF, sorted by sequence name and start
+
+    region : str
+        See `parse_region`
+
+    index : TabixIndex or None
+        Index of the file, by default read from the .tbi or .csi file next
+        to it
+    """
+    if index is None:
+        index = read_tabix_index(find_tabix_index(filepath))
+    seqname, start, end = parse_region(region)
+    beg = start - 1
+    end = index.max_position if end is None else end
+    meta = index.meta_char.encode()
+
+    with BgzfReader(filepath) as reader:
+        for chunk_beg, chunk_end in index.chunks(seqname, beg, end):
+            reader.seek(chunk_beg)
+            if chunk_beg == 0:
+                # as in htslib, the header lines at the top of the file
+                # aren't records, whatever they start with
+                for _ in range(index.skip):
+                    reader.readline()
+            while reader.tell() < chunk_end:
+                line = reader.readline()
+                if not line:
+                    break
+                if line.startswith(meta) or not line.strip():
+                    continue
+                record_seqname, record_beg, record_end = _record_span(line, index.columns, index.zero_based)
+                if record_seqname != seqname or record_beg >= end:
+                    # records are sorted, so nothing later in the chunk overlaps
+                    break
+                if max(record_end, record_beg + 1) > beg:
+                    yield line.decode()
@@ -1,11 +1,33 @@
-from importlib.util import find_spec
+import gzip
+import io
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import IO
 
+import numpy as np
 import pandas as pd
-from loguru import logger
-from tqdm import tqdm
+from pandas.api.types import infer_dtype
 
+from gtfparse.bgzf import BgzfWriter
 from gtfparse.required_columns import REQUIRED_COLUMNS
 
+# number of rows formatted and written at a time
+WRITE_BLOCK_ROWS = 1 << 16
+
+FORMATS = ("gtf", "gff3")
+
+# first line of every GFF3 file
+GFF3_HEADER = "##gff-version 3\n"
+
+# characters with a reserved meaning in GFF3 column 9, "%" first so that the
+# escapes themselves aren't escaped again
+GFF3_ESCAPES = {"%": "%25", ";": "%3B", "=": "%3D", "&": "%26", "\t": "%09", "\n": "%0A", "\r": "%0D"}
+GFF3_RESERVED_CHARACTERS = "[%;=&\t\n\r]"
+
 
 def extract_seq_info(gtf_row: pd.Series) -> str:
     """Convert the data in the rows from a GTF/GFF3-formatted DataFrame
@@ -35,8 +57,81 @@ def extract_seq_info(gtf_row: pd.Series) -> str:
     return line_to_strings
 
 
-def df_to_gtf(df: pd.DataFrame, filename: str) -> None:
-    """Write a GTF/GFF3-formatted DataFrame out as a GTF
+def _column_strings(column: pd.Series) -> np.ndarray:
+    """
+    The values of a column as `extract_seq_info` renders them: taken out of
+    the frame as Python objects (so float32 values are widened, missing values
+    become None or nan) and passed to `str`
+    """
+    return pd.Series(column.to_numpy(dtype=object), dtype=object).astype(str).to_numpy(dtype=object)
+
+
+def _value_strings(column: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Which values of a column are present (neither missing nor ""), and those
+    values as strings. Whole numbers stored as floats, as attribute columns
+    with gaps in them are, are written without a trailing '.0'.
+    """
+    values = column.to_numpy(dtype=object)
+    # only compared with "" where present, since pd.NA doesn't compare
+    present = ~pd.isna(values)
+    present[present] = values[present] != ""
+    present_values = values[present]
+    if infer_dtype(present_values, skipna=False) not in {"string", "empty"}:
+        present_values = np.array(
+            [
+                str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+                for value in present_values
+            ],
+            dtype=object,
+        )
+    strings = np.full(len(values), "", dtype=object)
+    strings[present] = present_values
+    return present, strings
+
+
+def _escape_gff3(values: np.ndarray) -> np.ndarray:
+    """
+    Percent-encode the characters which can't appear as they are in a GFF3
+    attribute value. Commas are left alone, since they separate the values
+    of keys which occurred more than once.
+    """
+    values = pd.Series(values, dtype=object)
+    if not values.str.contains(GFF3_RESERVED_CHARACTERS, regex=True).any():
+        return values.to_numpy()
+    for character, escaped in GFF3_ESCAPES.items():
+        values = values.str.replace(character, escaped, regex=False)
+    return values.to_numpy()
+
+
+def _attribute_pieces(column_name: str, column: pd.Series, format: str) -> np.ndarray:  # noqa: A002
+    """
+    One column of attributes rendered as "key=value;" (GFF3) or 'key "value"; '
+    (GTF), with "" for rows in which the value is missing or empty
+    """
+    present, values = _value_strings(column)
+    pieces = np.full(len(values), "", dtype=object)
+    if not present.any():
+        return pieces
+    values = values[present]
+    if column_name == "attribute":
+        # the unparsed attribute string, or the pairs folded into it by
+        # `restrict_attribute_columns`, is written as it is
+        separator = "; " if format == "gtf" else ";"
+        pieces[present] = [value.rstrip(separator) + separator for value in values]
+    elif format == "gtf":
+        quoted = f'{column_name} "' + values + '"; '
+        # values joined from a key repeated within a row go back to being repeated
+        pieces[present] = pd.Series(quoted, dtype=object).str.replace(",", f'"; {column_name} "', regex=False)
+    else:
+        pieces[present] = f"{column_name}=" + _escape_gff3(values) + ";"
+    return pieces
+
+
+def format_gtf_lines(df: pd.DataFrame, format: str | None = None) -> str:  # noqa: A002
+    """
+    Render the rows of a GTF/GFF3-formatted DataFrame as the text written by
+    `df_to_gtf`, one column at a time
     \f
     Parameters
     ----------
@@ -44,19 +139,154 @@ def df_to_gtf(df: pd.DataFrame, filename: str) -> None:
     df : :class:`pd.DataFrame`
         GTF in the form of a Pandas DataFrame
 
-    filename : `str`
-        name of file to write GTF out as
+    format : `str` or None
+        See `df_to_gtf`
+
+    Returns
+    -------
+    The lines, each with a trailing newline, joined into one string
+    """
+    if format is not None and format not in FORMATS:
+        msg = f"format must be one of {FORMATS} or None, not {format!r}"
+        raise ValueError(msg)
+    if df.empty:
+        return ""
+
+    attribute_names = df.columns.drop(REQUIRED_COLUMNS[:-1])
+    if format is None:
+        fields = [_column_strings(df[column_name]) for column_name in REQUIRED_COLUMNS[:-1]]
+        pairs = [f"{column_name}=" + _column_strings(df[column_name]) for column_name in attribute_names]
+        if pairs:
+            fields.append([";".join(row_pairs) for row_pairs in zip(*pairs, strict=True)])
+        else:
+            fields.append([""] * len(df))
+        return "\n".join(["\t".join(row_fields) for row_fields in zip(*fields, strict=True)]) + "\n"
+
+    fields = []
+    for column_name in REQUIRED_COLUMNS[:-1]:
+        present, values = _value_strings(df[column_name])
+        values[~present] = "."
+        fields.append(values)
+
+    pieces = [_attribute_pieces(column_name, df[column_name], format) for column_name in attribute_names]
+    if format == "gtf":
+        attributes = ["".join(row_pieces).rstrip(" ") for row_pieces in zip(*pieces, strict=True)]
+    else:
+        attributes = ["".join(row_pieces).rstrip(";") or "." for row_pieces in zip(*pieces, strict=True)]
+    fields.append(attributes if pieces else ["" if format == "gtf" else "."] * len(df))
+    return "\n".join(["\t".join(row_fields) for row_fields in zip(*fields, strict=True)]) + "\n"
+
+
+def _infer_compression(filepath_or_buffer: str | Path | IO) -> str | None:
+    if isinstance(filepath_or_buffer, str | Path) and Path(filepath_or_buffer).suffix in {".gz", ".bgz"}:
+        return "bgzf"
+    return None
+
+
+@contextmanager
+def _open_output(filepath_or_buffer: str | Path | IO, compression: str | None) -> Iterator[Callable[[str], object]]:
+    """
+    Open somewhere to write text to, returning the function which writes it
     """
+    if compression == "infer":
+        compression = _infer_compression(filepath_or_buffer)
+    if compression not in {None, "gzip", "bgzf"}:
+        msg = f"compression must be 'infer', 'gzip', 'bgzf' or None, not {compression!r}"
+        raise ValueError(msg)
 
-    if find_spec("swifter"):
-        import swifter  # noqa: F401
+    if isinstance(filepath_or_buffer, io.TextIOBase):
+        if compression is not None:
+            msg = "Compressed output needs a path or a binary file object"
+            raise ValueError(msg)
+        yield filepath_or_buffer.write
+        return
 
-        logger.info("swifter found, processing in parallel")
-        line_to_strings = df.swifter.progress_bar(True).apply(extract_seq_info, axis=1)
+    if compression is None and isinstance(filepath_or_buffer, str | Path):
+        with open(filepath_or_buffer, "w") as output:
+            yield output.write
+        return
+
+    if compression == "gzip":
+        binary = gzip.open(filepath_or_buffer, "wb")
+    elif compression == "bgzf":
+        binary = BgzfWriter(filepath_or_buffer)
     else:
-        tqdm.pandas()
-        line_to_strings = df.progress_apply(extract_seq_info, axis=1)
+        binary = nullcontext(filepath_or_buffer)
+    with binary as output:
+        yield lambda text: output.write(text.encode("utf-8"))
+
+
+def df_to_gtf(
+    df: pd.DataFrame | Iterable[pd.DataFrame],
+    filename: str | Path | IO,
+    format: str | None = None,  # noqa: A002
+    compression: str | None = "infer",
+    n_jobs: int = 1,
+) -> None:
+    """Write a GTF/GFF3-formatted DataFrame out as a GTF
+    \f
+    Parameters
+    ----------
+
+    df : :class:`pd.DataFrame` or iterable of :class:`pd.DataFrame`
+        GTF in the form of a Pandas DataFrame, or a series of them (e.g.
+        from `iter_gtf`) which are written one after another, so that only
+        one needs to be in memory at a time
+
+    filename : `str`, `Path` or file object
+        name of file to write GTF out as, or a text or binary file object
+        to write it to
+
+    format : `str` or None
+        "gtf" writes attributes as `key "value";` and "gff3" as `key=value`
+        after a '##gff-version 3' line, both leaving out missing or empty
+        values and writing missing core fields as '.'. None writes every
+        attribute as `key=value`, exactly as earlier versions did.
+
+    compression : `str` or None
+        "bgzf" (bgzip-compatible gzip, which tabix can index), "gzip", None,
+        or "infer" to use BGZF for paths ending in '.gz' or '.bgz'. Since
+        "infer" is the default, such paths are now always compressed, where
+        earlier versions wrote plain text whatever the file was called.
+
+    n_jobs : `int`
+        Number of processes formatting blocks of rows. Anything other than 1
+        hands the blocks to a pool of worker processes (one per CPU for
+        values below 1); they are still written in their original order.
+    """
+    from tqdm import tqdm
+
+    frames = [df] if isinstance(df, pd.DataFrame) else df
+    blocks = (
+        frame.iloc[offset : offset + WRITE_BLOCK_ROWS]
+        for frame in frames
+        for offset in range(0, len(frame), WRITE_BLOCK_ROWS)
+    )
+    with _open_output(filename, compression) as write:
+        if format == "gff3":
+            write(GFF3_HEADER)
+        for text in tqdm(_format_blocks(blocks, format, n_jobs), desc="writing file", unit="blocks"):
+            write(text)
+
+
+def _format_blocks(blocks: Iterable[pd.DataFrame], format: str | None, n_jobs: int) -> Iterator[str]:  # noqa: A002
+    """
+    `format_gtf_lines` applied to each block, in a process pool unless
+    `n_jobs` is 1. Only a couple of blocks per worker are in flight at once,
+    so memory use doesn't depend on how many blocks there are.
+    """
+    if n_jobs == 1:
+        for block in blocks:
+            yield format_gtf_lines(block, format=format)
+        return
 
-    with open(filename, "w") as gtfoutput:
-        # gtfoutput.writelines("seqname\tsource\tfeature\tstart\tend\tscore\tstrand\tframe\tattributes\n")
-        gtfoutput.writelines(line_to_strings)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending: deque[Future[str]] = deque()
+        for block in blocks:
+            pending.append(executor.submit(format_gtf_lines, block, format=format))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,97 @@
+from importlib.resources import as_file, files
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from gtfparse.read_gtf import read_gtf
+from gtfparse.stats import ParseStats
+
+# ruff: noqa: S101
+
+pl = pytest.importorskip("polars")
+pa = pytest.importorskip("pyarrow")
+
+GTF_TEXT = (
+    "1\thavana\tgene\t11\t20\t.\t+\t.\t"
+    'gene_id "G1"; gene_name "A"; level "2"; score_value "0.5";\n'
+    "1\thavana\texon\t11\t15\t.\t.\t0\t"
+    'gene_id "G1"; exon_number "1"; level "2"; score_value "x";\n'
+    "2\tensembl\tgene\t31\t40\t.\t-\t.\t"
+    'gene_id "G2"; level "3";\n'
+)
+
+
+@pytest.fixture
+def ensembl_gtf_path():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        yield gtf
+
+
+@pytest.mark.parametrize("backend", ["polars", "arrow"])
+def test_same_values_as_pandas(ensembl_gtf_path, backend):
+    expected = read_gtf(ensembl_gtf_path)
+    result = read_gtf(ensembl_gtf_path, backend=backend)
+    assert isinstance(result, pl.DataFrame if backend == "polars" else pa.Table)
+
+    df = result.to_pandas()
+    assert list(df.columns) == list(expected.columns)
+    for name in expected.columns:
+        # keys missing from a row are null rather than ""
+        expected_values = [None if value == "" else str(value) for value in expected[name].astype(object)]
+        values = [None if pd.isna(value) else str(value) for value in df[name].astype(object)]
+        assert values == expected_values, name
+
+
+def test_types():
+    table = read_gtf(StringIO(GTF_TEXT), backend="arrow")
+    assert table.schema.field("start").type == pa.int64()
+    assert table.schema.field("frame").type == pa.int64()
+    assert table.schema.field("strand").type == pa.string()
+    assert table["strand"].to_pylist() == ["+", None, "-"]
+    assert table.schema.field("level").type == pa.int64()
+    assert table["exon_number"].to_pylist() == [None, 1, None]
+    assert table["score_value"].to_pylist() == ["0.5", "x", None]
+
+    df = read_gtf(StringIO(GTF_TEXT), backend="polars")
+    assert df.schema["level"] == pl.Int64
+    assert df["gene_name"].to_list() == ["A", None, None]
+
+
+@pytest.mark.parametrize("backend", ["polars", "arrow"])
+def test_usecols_and_filters(backend):
+    result = read_gtf(
+        StringIO(GTF_TEXT), backend=backend, usecols=["seqname", "gene_id", "level"], features={"gene"}
+    ).to_pandas()
+    assert list(result.columns) == ["seqname", "gene_id", "level"]
+    assert result["gene_id"].tolist() == ["G1", "G2"]
+
+    folded = read_gtf(StringIO(GTF_TEXT), backend=backend, usecols=["gene_id", "attribute"]).to_pandas()
+    expected = read_gtf(StringIO(GTF_TEXT), usecols=["gene_id", "attribute"])
+    assert folded["attribute"].tolist() == expected["attribute"].tolist()
+
+
+def test_unexpanded_and_categorical():
+    table = read_gtf(StringIO(GTF_TEXT), backend="arrow", expand_attribute_column=False, categorical=True)
+    assert table.column_names[-1] == "attribute"
+    assert pa.types.is_dictionary(table.schema.field("seqname").type)
+    assert pa.types.is_string(table.schema.field("attribute").type)
+
+    df = read_gtf(StringIO(GTF_TEXT), backend="polars", categorical=["gene_id"])
+    assert df.schema["gene_id"] == pl.Categorical
+    assert df.schema["seqname"] == pl.String
+
+
+def test_chunks_with_different_keys():
+    stats = ParseStats()
+    df = read_gtf(StringIO(GTF_TEXT), backend="polars", chunksize=1, stats=stats)
+    assert df.columns[8:] == ["gene_id", "gene_name", "level", "score_value", "exon_number"]
+    assert df["exon_number"].to_list() == [None, 1, None]
+    assert stats.stages["expand_attributes"].rows_in == df.height
+
+
+def test_errors():
+    with pytest.raises(ValueError, match="backend must be one of"):
+        read_gtf(StringIO(GTF_TEXT), backend="spark")
+    with pytest.raises(ValueError, match="backend='pandas'"):
+        read_gtf(StringIO(GTF_TEXT), backend="polars", column_converters={"start": str})
@@ -0,0 +1,113 @@
+import shutil
+from importlib.resources import as_file, files
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from gtfparse.cache import evict_cache, load_cached_gtf, save_cached_gtf
+from gtfparse.read_gtf import read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def gtf_path(tmp_path: Path) -> Path:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        return Path(shutil.copy(gtf, tmp_path / "ensembl_grch37.head.gtf.gz"))
+
+
+def cache_entries(cache_dir: Path) -> list[Path]:
+    return [entry for entry in cache_dir.iterdir() if entry.is_dir()]
+
+
+def test_cached_read_matches_parse(gtf_path: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    parsed = read_gtf(gtf_path)
+    first = read_gtf(gtf_path, cache_dir=cache_dir)
+    assert len(cache_entries(cache_dir)) == 1
+    second = read_gtf(gtf_path, cache_dir=cache_dir)
+    pdt.assert_frame_equal(first, parsed)
+    pdt.assert_frame_equal(second, parsed)
+
+
+def test_cache_keyed_on_options(gtf_path: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    read_gtf(gtf_path, cache_dir=cache_dir)
+    genes = read_gtf(gtf_path, cache_dir=cache_dir, features={"gene"})
+    assert len(cache_entries(cache_dir)) == 2  # noqa: PLR2004
+    pdt.assert_frame_equal(read_gtf(gtf_path, cache_dir=cache_dir, features={"gene"}), genes)
+
+
+def test_cache_invalidated_by_changes(gtf_path: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    read_gtf(gtf_path, cache_dir=cache_dir)
+    with as_file(files("tests.data").joinpath("B16.stringtie.head.gtf")) as other:
+        shutil.copy(other, gtf_path.with_suffix(""))
+    uncompressed = gtf_path.with_suffix("")
+    pdt.assert_frame_equal(read_gtf(uncompressed, cache_dir=cache_dir), read_gtf(uncompressed))
+    uncompressed.write_text(uncompressed.read_text().replace("StringTie", "Stringtie"))
+    assert (read_gtf(uncompressed, cache_dir=cache_dir)["source"] == "Stringtie").all()
+    assert len(cache_entries(cache_dir)) == 3  # noqa: PLR2004
+
+
+def test_round_trip_keeps_dtypes_and_index(tmp_path: Path):
+    df = pd.DataFrame(
+        {
+            "seqname": ["1", "2", "1"],
+            "strand": pd.Categorical(["+", "-", "+"]),
+            "start": [1, 5, 10],
+            "score": [0.5, float("nan"), 1.0],
+            "note": ["a", "", "é"],
+        },
+        index=[2, 7, 9],
+    )
+    save_cached_gtf(df, tmp_path / "entry")
+    pdt.assert_frame_equal(load_cached_gtf(tmp_path / "entry"), df)
+
+
+def test_round_trip_nullable_columns(gtf_path: Path, tmp_path: Path):
+    df = read_gtf(gtf_path, infer_types=True, cache_dir=tmp_path / "cache")
+    assert df["exon_number"].dtype == "Int64"
+    pdt.assert_frame_equal(read_gtf(gtf_path, infer_types=True, cache_dir=tmp_path / "cache"), df)
+    mapped = read_gtf(gtf_path, infer_types=True, cache_dir=tmp_path / "cache", memory_map=True)
+    assert mapped["exon_number"].equals(df["exon_number"])
+
+
+def test_missing_entry(tmp_path: Path):
+    assert load_cached_gtf(tmp_path / "nothing") is None
+
+
+def test_eviction_keeps_most_recent(gtf_path: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    read_gtf(gtf_path, cache_dir=cache_dir, features={"gene"})
+    read_gtf(gtf_path, cache_dir=cache_dir, features={"exon"}, cache_max_bytes=1)
+    assert len(cache_entries(cache_dir)) == 1
+    (entry,) = cache_entries(cache_dir)
+    assert evict_cache(cache_dir, 0) == [entry]
+
+
+def memory_mapped(array: np.ndarray) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_memory_mapped_read(gtf_path: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    parsed = read_gtf(gtf_path)
+    for _ in range(2):
+        mapped = read_gtf(gtf_path, cache_dir=cache_dir, memory_map=True)
+        assert memory_mapped(mapped["start"].to_numpy())
+        assert memory_mapped(mapped["gene_id"].cat.codes.to_numpy())
+        assert not mapped["start"].to_numpy().flags.writeable
+        pdt.assert_frame_equal(mapped.astype(parsed.dtypes), parsed)
+
+
+def test_memory_map_requires_cache_dir(gtf_path: Path):
+    with pytest.raises(ValueError, match="cache_dir"):
+        read_gtf(gtf_path, memory_map=True)
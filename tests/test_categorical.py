@@ -0,0 +1,49 @@
+from importlib.resources import as_file, files
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from gtfparse.categorical import low_cardinality_columns, to_categorical
+from gtfparse.read_gtf import read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def ensembl_gtf() -> pd.DataFrame:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        return read_gtf(gtf)
+
+
+@pytest.fixture
+def categorical_gtf() -> pd.DataFrame:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        return read_gtf(gtf, categorical=True)
+
+
+def test_low_cardinality_columns(ensembl_gtf: pd.DataFrame):
+    columns = low_cardinality_columns(ensembl_gtf)
+    assert {"seqname", "source", "feature", "gene_biotype", "gene_id"} <= set(columns)
+    assert "start" not in columns
+
+
+def test_unique_strings_stay_objects():
+    df = pd.DataFrame({"exon_id": [f"E{i}" for i in range(10)], "tag": ["basic"] * 10})
+    assert low_cardinality_columns(df) == ["tag"]
+
+
+def test_categorical_values_unchanged(ensembl_gtf: pd.DataFrame, categorical_gtf: pd.DataFrame):
+    for name in ["seqname", "source", "feature", "strand", "gene_biotype"]:
+        assert isinstance(categorical_gtf[name].dtype, pd.CategoricalDtype)
+    pdt.assert_frame_equal(categorical_gtf.astype(ensembl_gtf.dtypes), ensembl_gtf)
+
+
+def test_categorical_uses_less_memory(ensembl_gtf: pd.DataFrame, categorical_gtf: pd.DataFrame):
+    assert categorical_gtf.memory_usage(deep=True).sum() < ensembl_gtf.memory_usage(deep=True).sum() / 2
+
+
+def test_named_columns():
+    df = to_categorical(pd.DataFrame({"a": ["x", "y", "z"], "b": ["u", "u", "u"]}), columns=["a"])
+    assert isinstance(df["a"].dtype, pd.CategoricalDtype)
+    assert df["b"].dtype == object
@@ -114,3 +114,42 @@ def check_dataframe_values(df, seqname, start, end, strand):
 def test_missing_features(gtf_df_missing_features):
     assert "gene" not in gtf_df_missing_features["feature"].values
     assert "transcript" not in gtf_df_missing_features["feature"].values
+
+
+@pytest.fixture
+def exons_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "seqname": ["1", "1", "1", "2"],
+            "source": ["src"] * 4,
+            "feature": ["exon"] * 4,
+            "start": [10, 50, 5, 100],
+            "end": [20, 60, 8, 200],
+            "score": ["."] * 4,
+            "strand": pd.Categorical(["+", "+", "-", "+"]),
+            "frame": [0] * 4,
+            "gene_id": ["G1", "G1", "G2", ""],
+            "gene_name": ["A", "B", "C", "D"],
+            "gene_biotype": ["lncRNA", np.nan, "miRNA", "miRNA"],
+        }
+    )
+
+
+def test_created_features_from_groups(exons_df):
+    df = create_missing_features(
+        exons_df, unique_keys={"gene": "gene_id"}, extra_columns={"gene": {"gene_name", "gene_biotype"}}
+    )
+    genes = df[df["feature"] == "gene"].set_index("gene_id")
+    # rows without a key don't make a feature
+    assert genes.index.tolist() == ["G1", "G2"]
+    assert genes.loc["G1", ["start", "end"]].tolist() == [10, 60]
+    assert genes["source"].tolist() == ["gtfparse", "gtfparse"]
+    # extra columns are only filled in when the group agrees on one value
+    assert genes["gene_name"].tolist() == ["", "C"]
+    assert genes["gene_biotype"].tolist() == ["lncRNA", "miRNA"]
+
+
+def test_created_features_with_categorical_key(exons_df):
+    exons_df["gene_id"] = pd.Categorical(exons_df["gene_id"])
+    df = create_missing_features(exons_df.iloc[:2], unique_keys={"gene": "gene_id"})
+    assert df.loc[df["feature"] == "gene", "gene_id"].tolist() == ["G1"]
@@ -0,0 +1,87 @@
+import bz2
+import gzip
+import lzma
+import threading
+from importlib.resources import as_file, files
+from pathlib import Path
+
+import pandas.testing as pdt
+import pytest
+
+from gtfparse import decompress
+from gtfparse.bgzf import BgzfWriter
+from gtfparse.decompress import is_bgzf, open_decompressed
+from gtfparse.read_gtf import discover_attribute_keys, read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def gtf_bytes() -> bytes:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        return Path(gtf).read_bytes()
+
+
+@pytest.fixture
+def gzipped(tmp_path: Path, gtf_bytes: bytes) -> Path:
+    filepath = tmp_path / "plain.gtf.gz"
+    filepath.write_bytes(gzip.compress(gtf_bytes))
+    return filepath
+
+
+@pytest.fixture
+def bgzipped(tmp_path: Path, gtf_bytes: bytes) -> Path:
+    filepath = tmp_path / "blocked.gtf.bgz"
+    with BgzfWriter(filepath) as writer:
+        writer.write(gtf_bytes)
+    return filepath
+
+
+def test_is_bgzf(gzipped: Path, bgzipped: Path):
+    assert is_bgzf(bgzipped)
+    assert not is_bgzf(gzipped)
+
+
+@pytest.mark.parametrize("n_threads", [1, 3])
+def test_decompress_bgzf(bgzipped: Path, gtf_bytes: bytes, n_threads: int, monkeypatch: pytest.MonkeyPatch):
+    # several small batches, so that they're inflated side by side
+    monkeypatch.setattr(decompress, "BLOCKS_PER_BATCH", 1)
+    with open_decompressed(bgzipped, n_threads=n_threads) as data:
+        assert data.read() == gtf_bytes
+
+
+def test_decompress_gzip(gzipped: Path, gtf_bytes: bytes, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(decompress, "GZIP_READ_SIZE", 1000)
+    with open_decompressed(gzipped) as data:
+        assert data.readline() == gtf_bytes.split(b"\n")[0] + b"\n"
+        assert data.read() == gtf_bytes[gtf_bytes.index(b"\n") + 1 :]
+
+
+def test_stop_reading_early(gzipped: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(decompress, "GZIP_READ_SIZE", 100)
+    with open_decompressed(gzipped) as data:
+        data.read(10)
+    assert not any(thread.name.startswith("gunzip") for thread in threading.enumerate())
+
+
+def test_corrupt_gzip(tmp_path: Path, gzipped: Path):
+    corrupt = tmp_path / "corrupt.gtf.gz"
+    corrupt.write_bytes(gzipped.read_bytes()[:-100])
+    with open_decompressed(corrupt) as data, pytest.raises(EOFError):
+        data.read()
+
+
+def test_read_compressed_gtf(gzipped: Path, bgzipped: Path):
+    expected = read_gtf(gzipped)
+    pdt.assert_frame_equal(read_gtf(bgzipped), expected)
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        pdt.assert_frame_equal(read_gtf(gtf), expected)
+    assert discover_attribute_keys(bgzipped) == discover_attribute_keys(gzipped)
+
+
+@pytest.mark.parametrize(("suffix", "compress"), [(".bz2", bz2.compress), (".xz", lzma.compress)])
+def test_read_other_compressions(tmp_path: Path, gzipped: Path, gtf_bytes: bytes, suffix: str, compress):
+    compressed = tmp_path / f"plain.gtf{suffix}"
+    compressed.write_bytes(compress(gtf_bytes))
+    pdt.assert_frame_equal(read_gtf(compressed), read_gtf(gzipped))
+    assert discover_attribute_keys(compressed) == discover_attribute_keys(gzipped)
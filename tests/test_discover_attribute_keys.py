@@ -0,0 +1,50 @@
+from importlib.resources import as_file, files
+from io import StringIO
+
+import pytest
+
+from gtfparse.read_gtf import discover_attribute_keys, read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def ensembl_keys() -> list[str]:
+    return [
+        "gene_id",
+        "gene_name",
+        "gene_source",
+        "gene_biotype",
+        "transcript_id",
+        "transcript_name",
+        "transcript_source",
+        "exon_number",
+        "exon_id",
+        "tag",
+        "ccds_id",
+        "protein_id",
+    ]
+
+
+def test_discover_attribute_keys(ensembl_keys: list[str]):
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        assert discover_attribute_keys(gtf) == ensembl_keys
+
+
+def test_discover_attribute_keys_sample_rows():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        assert discover_attribute_keys(gtf, sample_rows=1) == ["gene_id", "gene_name", "gene_source", "gene_biotype"]
+
+
+def test_discover_attribute_keys_rewinds_buffer():
+    with as_file(files("tests.data").joinpath("refseq.ucsc.small.gtf")) as gtf:
+        buffer = StringIO(gtf.read_text())
+    assert discover_attribute_keys(buffer) == ["gene_id", "transcript_id"]
+    assert read_gtf(buffer)["transcript_id"].iloc[0] == "NR_075077"
+
+
+def test_read_gtf_usecols_only_expands_wanted_keys():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        df = read_gtf(gtf, usecols=["feature", "gene_name", "exon_number"])
+    assert list(df.columns) == ["feature", "gene_name", "exon_number"]
+    assert df.loc[df["feature"] == "exon", "exon_number"].min() == 1
@@ -0,0 +1,109 @@
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from gtfparse.expand_attributes import expand_attribute_column, infer_attribute_type, join_groups
+from gtfparse.read_gtf import parse_gtf_and_expand_attributes
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def attributes() -> pd.Series:
+    return pd.Series(
+        [
+            'gene_id "ENSG01";transcript_id "ENST01";tag "basic";tag "CCDS";',
+            "gene_id=ENSG02;exon_number=2",
+            'gene_id "ENSG03";note "has spaces in it";level 2;',
+            "",
+        ],
+        index=[3, 5, 8, 13],
+    )
+
+
+@pytest.fixture
+def expanded(attributes: pd.Series) -> pd.DataFrame:
+    return expand_attribute_column(attributes)
+
+
+def test_expanded_columns_in_order_of_appearance(expanded: pd.DataFrame):
+    pdt.assert_index_equal(expanded.columns, pd.Index(["gene_id", "transcript_id", "tag", "exon_number", "level"]))
+
+
+def test_expanded_index(attributes: pd.Series, expanded: pd.DataFrame):
+    pdt.assert_index_equal(expanded.index, attributes.index)
+
+
+def test_expanded_gene_id(expanded: pd.DataFrame):
+    assert expanded["gene_id"].tolist() == ["ENSG01", "ENSG02", "ENSG03", ""]
+
+
+def test_expanded_repeated_key(expanded: pd.DataFrame):
+    assert expanded.loc[3, "tag"] == "basic,CCDS"
+    assert expanded.loc[5, "tag"] == ""
+
+
+def test_join_groups():
+    groups, joined = join_groups(np.array(["a", "b", "c", "d", "e"], dtype=object), np.array([5, 1, 5, 1, 3]), ",")
+    assert groups.tolist() == [1, 3, 5]
+    assert joined.tolist() == ["b,d", "e", "a,c"]
+
+
+def test_restricted_columns_are_folded(attributes: pd.Series):
+    restricted = expand_attribute_column(attributes, restrict_attribute_columns=["gene_id", "not_a_key"])
+    pdt.assert_index_equal(restricted.columns, pd.Index(["attribute", "gene_id"]))
+    assert restricted["attribute"].tolist() == [
+        "transcript_id=ENST01;tag=basic,CCDS",
+        "exon_number=2",
+        "level=2",
+        "",
+    ]
+
+
+@pytest.fixture
+def gtf_text() -> str:
+    return (
+        "1\thavana\tgene\t11869\t14409\t.\t+\t.\t"
+        'gene_id "ENSG00000223972"; gene_name "DDX11L1";\n'
+        "1\thavana\texon\t11869\t12227\t.\t+\t.\t"
+        'gene_id "ENSG00000223972"; transcript_id "ENST00000456328"; exon_number "1";\n'
+        "1\thavana\tgene\t14404\t29570\t.\t-\t.\t"
+        'gene_id "ENSG00000227232"; gene_name "WASH7P";\n'
+    )
+
+
+def test_expand_attributes_with_features(gtf_text: str):
+    genes = parse_gtf_and_expand_attributes(StringIO(gtf_text), features={"gene"})
+    assert genes["gene_name"].tolist() == ["DDX11L1", "WASH7P"]
+    assert genes["gene_id"].tolist() == ["ENSG00000223972", "ENSG00000227232"]
+
+
+def test_attribute_keys_skip_other_keys(attributes: pd.Series):
+    selected = expand_attribute_column(attributes, attribute_keys={"tag", "level"})
+    pdt.assert_index_equal(selected.columns, pd.Index(["tag", "level"]))
+    assert selected["tag"].tolist() == ["basic,CCDS", "", "", ""]
+
+
+def test_infer_attribute_type():
+    values = pd.Series(["1", None, "12345678901"], index=[4, 5, 6], name="level")
+    pdt.assert_series_equal(
+        infer_attribute_type(values), pd.Series([1, None, 12345678901], index=[4, 5, 6], name="level", dtype="Int64")
+    )
+    pdt.assert_series_equal(
+        infer_attribute_type(pd.Series(["1.5", float("nan"), "2"])), pd.Series([1.5, None, 2.0], dtype="Float64")
+    )
+    assert infer_attribute_type(pd.Series(["2.0", None])).dtype == "Int64"
+    strings = pd.Series(["1", "x", None])
+    assert infer_attribute_type(strings) is strings
+
+
+def test_infer_types(attributes: pd.Series):
+    expanded = expand_attribute_column(attributes, infer_types=True)
+    assert expanded["exon_number"].dtype == "Int64"
+    assert expanded["exon_number"].isna().tolist() == [True, False, True, True]
+    assert expanded["level"].dtype == "Int64"
+    # string columns still use "" for missing values
+    assert expanded["transcript_id"].tolist() == ["ENST01", "", "", ""]
@@ -0,0 +1,33 @@
+from importlib.resources import as_file, files
+
+import pandas as pd
+import pytest
+
+from gtfparse.read_gtf import parse_gtf, read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def ensembl_genes() -> pd.DataFrame:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        return read_gtf(gtf, features={"gene"}, chunksize=100)
+
+
+def test_read_gtf_features_with_expanded_attributes(ensembl_genes: pd.DataFrame):
+    assert (ensembl_genes["feature"] == "gene").all()
+    assert (ensembl_genes["gene_id"] != "").all()
+    # only keys that occur on gene rows are expanded
+    assert "transcript_id" not in ensembl_genes.columns
+
+
+def test_read_gtf_seqnames():
+    with as_file(files("tests.data").joinpath("B16.stringtie.head.gtf")) as gtf:
+        df = read_gtf(gtf, seqnames={"chr2"})
+    assert len(df) == 0
+
+
+def test_parse_gtf_interval():
+    with as_file(files("tests.data").joinpath("refseq.ucsc.small.gtf")) as gtf:
+        df = parse_gtf(gtf, chunksize=5, interval=(67096300, 67103300))
+    assert df["start"].tolist() == [67096252, 67103238, 67096252, 67096252, 67103238, 67103238]
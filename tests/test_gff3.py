@@ -0,0 +1,94 @@
+import bz2
+import gzip
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gtfparse import read_gff3
+from gtfparse.gff3 import Gff3Index, expand_gff3_attributes, percent_decode
+from gtfparse.stats import ParseStats
+
+# ruff: noqa: S101
+
+GFF3_TEXT = """##gff-version 3
+chr%3B1\tsrc\tgene\t1\t1000\t.\t+\t.\tID=gene1;Name=ABC%3B1;Note=free text, with%2C comma,second
+chr%3B1\tsrc\tmRNA\t1\t1000\t.\t+\t.\tID=mrna1;Parent=gene1
+chr%3B1\tsrc\tmRNA\t1\t900\t.\t+\t.\tID=mrna2;Parent=gene1
+chr%3B1\tsrc\texon\t1\t100\t.\t+\t.\tID=exon1;Parent=mrna1,mrna2
+chr%3B1\tsrc\tCDS\t10\t100\t.\t+\t0\tID=cds1;Parent=mrna1
+chr%3B1\tsrc\tCDS\t200\t300\t.\t+\t2\tID=cds1;Parent=mrna1
+chr2\tsrc\tgene\t2000\t3000\t.\t-\t.\tID=gene2; Dbxref=GeneID:1,HGNC:2 ;Alias=x
+##FASTA
+>chr2
+ACGT
+"""
+
+
+def test_read_gff3():
+    stats = ParseStats()
+    df = read_gff3(StringIO(GFF3_TEXT), stats=stats)
+    assert len(df) == stats.stages["expand_attributes"].rows_out == len(GFF3_TEXT.splitlines()) - 4
+    assert list(df.columns[8:]) == ["ID", "Name", "Note", "Parent", "Dbxref", "Alias"]
+    assert df["seqname"].iloc[0] == "chr;1"
+    assert df["Name"].tolist()[:2] == ["ABC;1", None]
+    # commas split values before escapes are decoded
+    assert df["Note"].iloc[0] == ["free text", " with, comma", "second"]
+    assert df["Parent"].iloc[3] == ["mrna1", "mrna2"]
+    assert df["Dbxref"].iloc[-1] == ["GeneID:1", "HGNC:2"]
+    assert df["frame"].tolist()[4:6] == [0, 2]
+
+
+def test_read_gff3_options(tmp_path):
+    path = tmp_path / "annotation.gff3.gz"
+    path.write_bytes(gzip.compress(GFF3_TEXT.encode()))
+    df = read_gff3(path, features={"exon", "CDS"}, explode="Parent")
+    assert df["ID"].tolist() == ["exon1", "exon1", "cds1", "cds1"]
+    assert df["Parent"].tolist() == ["mrna1", "mrna2", "mrna1", "mrna1"]
+
+    path = tmp_path / "annotation.gff3.bz2"
+    path.write_bytes(bz2.compress(GFF3_TEXT.encode()))
+    pd.testing.assert_frame_equal(read_gff3(path), read_gff3(StringIO(GFF3_TEXT)))
+
+    df = read_gff3(StringIO(GFF3_TEXT), multi_valued=["Parent"])
+    assert df["Note"].iloc[0] == "free text, with, comma,second"
+
+    with pytest.raises(ValueError, match="explode"):
+        read_gff3(StringIO(GFF3_TEXT), explode="Name")
+
+
+def test_expand_gff3_attributes():
+    attributes = pd.Series(["a=1;b=x y;a=2", "", "c=%25", None])
+    df = expand_gff3_attributes(attributes, multi_valued=["a"])
+    assert df.to_dict("list") == {
+        "a": [["1", "2"], None, None, None],
+        "b": ["x y", None, None, None],
+        "c": [None, None, "%", None],
+    }
+    assert percent_decode(np.array(["%3D%26", "plain"], dtype=object)).tolist() == ["=&", "plain"]
+
+
+def test_gff3_index():
+    df = read_gff3(StringIO(GFF3_TEXT))
+    index = Gff3Index.from_dataframe(df)
+    assert len(index) == len(df)
+    assert "mrna1" in index
+    assert "missing" not in index
+
+    assert index.rows("cds1").tolist() == [4, 5]
+    assert index.children("gene1").tolist() == [1, 2]
+    assert index.children("mrna1").tolist() == [3, 4, 5]
+    assert index.parents("exon1").tolist() == [1, 2]
+    assert index.parent_ids(3) == ["mrna1", "mrna2"]
+    assert index.descendants("gene1").tolist() == [1, 2, 3, 4, 5]
+    assert index.descendants("gene2").tolist() == []
+    assert index.rows("missing").tolist() == []
+
+
+def test_gff3_index_parents_without_rows():
+    # 'gene0' is only ever a parent, and 'a' and 'b' are each other's parents
+    index = Gff3Index(["a", "b", None], [["b", "gene0"], "a", "a"])
+    assert index.rows("gene0").tolist() == []
+    assert index.children("gene0").tolist() == [0]
+    assert index.descendants("a").tolist() == [0, 1, 2]
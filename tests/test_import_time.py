@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from importlib.resources import as_file, files
+
+# ruff: noqa: S101, S603, PLC0415
+
+HEAVY_MODULES = ("pandas", "numpy", "tqdm", "loguru")
+
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+
+
+def test_import_is_light():
+    loaded = run_python(
+        "import sys, gtfparse\n"
+        "from gtfparse import ParsingError, REQUIRED_COLUMNS\n"
+        f"print(','.join(m for m in {HEAVY_MODULES} if m in sys.modules))"
+    )
+    assert loaded == ""
+
+
+def test_exports():
+    callables = run_python(
+        "from gtfparse import read_gtf, create_missing_features\n"
+        "print(callable(read_gtf), callable(create_missing_features))"
+    )
+    assert callables == "True True"
+
+    import gtfparse.create_missing_features
+    import gtfparse.read_gtf
+    from gtfparse import create_missing_features, read_gtf
+
+    # the functions, even though modules of the same names have been imported
+    assert callable(read_gtf)
+    assert callable(create_missing_features)
+    assert gtfparse.read_gtf is read_gtf
+    assert set(gtfparse.__all__) <= set(dir(gtfparse))
+    for name in gtfparse.__all__:
+        getattr(gtfparse, name)
+
+
+def test_logging_stays_off():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        logged = run_python(
+            "import gtfparse\n"
+            "from loguru import logger\n"
+            "logger.remove()\n"
+            "messages = []\n"
+            "logger.add(messages.append)\n"
+            f"gtfparse.parse_gtf({str(gtf)!r})\n"
+            "before = len(messages)\n"
+            "logger.enable('gtfparse')\n"
+            f"gtfparse.parse_gtf({str(gtf)!r})\n"
+            "print(before, len(messages) > 0)"
+        )
+    assert logged == "0 True"
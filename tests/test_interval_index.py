@@ -0,0 +1,92 @@
+from importlib.resources import as_file, files
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gtfparse.interval_index import GtfIndex
+from gtfparse.read_gtf import read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def ensembl_gtf() -> pd.DataFrame:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        return read_gtf(gtf)
+
+
+@pytest.fixture
+def random_intervals() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n_rows = 2000
+    starts = rng.integers(1, 10_000, n_rows)
+    is_long = rng.random(n_rows) < 0.05  # noqa: PLR2004
+    return pd.DataFrame(
+        {
+            "seqname": rng.choice(["1", "2", "X"], n_rows),
+            "start": starts,
+            # mostly short intervals with some long ones containing many others
+            "end": starts + np.where(is_long, rng.integers(0, 5000, n_rows), rng.integers(0, 50, n_rows)),
+            "strand": rng.choice(["+", "-"], n_rows),
+        }
+    )
+
+
+def scan(df: pd.DataFrame, seqname: str, start: int, end: int, strand: str | None = None) -> np.ndarray:
+    mask = (df["seqname"] == seqname) & (df["start"] <= end) & (df["end"] >= start)
+    if strand is not None:
+        mask &= df["strand"] == strand
+    return np.flatnonzero(mask.to_numpy())
+
+
+def test_query_matches_scan(random_intervals: pd.DataFrame):
+    index = GtfIndex.from_dataframe(random_intervals)
+    assert len(index) == len(random_intervals)
+    assert sorted(index.seqnames) == ["1", "2", "X"]
+    for seqname, start, end in [("1", 500, 700), ("2", 1, 1), ("X", 9000, 20_000), ("1", 4000, 4000)]:
+        np.testing.assert_array_equal(index.query(seqname, start, end), scan(random_intervals, seqname, start, end))
+    np.testing.assert_array_equal(index.query("1", 4000), scan(random_intervals, "1", 4000, 4000))
+    np.testing.assert_array_equal(
+        index.query("2", 100, 3000, strand="-"), scan(random_intervals, "2", 100, 3000, strand="-")
+    )
+    assert len(index.query("MT", 1, 10_000)) == 0
+
+
+def test_query_batch(random_intervals: pd.DataFrame):
+    index = GtfIndex.from_dataframe(random_intervals)
+    rng = np.random.default_rng(1)
+    seqnames = rng.choice(["1", "2", "X", "Y"], 300)
+    starts = rng.integers(1, 12_000, 300)
+    ends = starts + rng.integers(0, 200, 300)
+    query_indices, rows = index.query_batch(seqnames, starts, ends)
+    # overlaps come grouped by query
+    assert (np.diff(query_indices) >= 0).all()
+    order = np.lexsort((rows, query_indices))
+    query_indices, rows = query_indices[order], rows[order]
+    expected_queries, expected_rows = [], []
+    for i, (seqname, start, end) in enumerate(zip(seqnames, starts, ends, strict=True)):
+        overlapping = scan(random_intervals, seqname, start, end)
+        expected_queries += [i] * len(overlapping)
+        expected_rows += overlapping.tolist()
+    np.testing.assert_array_equal(query_indices, expected_queries)
+    np.testing.assert_array_equal(rows, expected_rows)
+
+
+def test_nested_and_identical_intervals():
+    index = GtfIndex(["1"] * 5, [100, 100, 150, 200, 120], [1000, 1000, 300, 250, 900])
+    np.testing.assert_array_equal(index.query("1", 260, 280), [0, 1, 2, 4])
+    np.testing.assert_array_equal(index.query("1", 950), [0, 1])
+
+
+def test_query_gtf(ensembl_gtf: pd.DataFrame):
+    index = GtfIndex.from_dataframe(ensembl_gtf)
+    rows = index.query("1", 12_000, 13_000)
+    assert len(rows)
+    np.testing.assert_array_equal(rows, scan(ensembl_gtf.astype({"seqname": str}), "1", 12_000, 13_000))
+
+
+def test_strand_needs_strands():
+    index = GtfIndex(["1"], [1], [10])
+    with pytest.raises(ValueError, match="without strands"):
+        index.query("1", 5, strand="+")
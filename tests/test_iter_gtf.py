@@ -0,0 +1,47 @@
+from importlib.resources import as_file, files
+
+import pandas as pd
+import pytest
+
+from gtfparse.read_gtf import iter_gtf, read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def ensembl_chunks() -> list[pd.DataFrame]:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        return list(iter_gtf(gtf, chunksize=128))
+
+
+@pytest.fixture
+def ensembl_gtf() -> pd.DataFrame:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        return read_gtf(gtf)
+
+
+def test_iter_gtf_chunk_sizes(ensembl_chunks: list[pd.DataFrame], ensembl_gtf: pd.DataFrame):
+    assert len(ensembl_chunks) > 1
+    assert all(len(chunk) <= 128 for chunk in ensembl_chunks)  # noqa: PLR2004
+    assert sum(len(chunk) for chunk in ensembl_chunks) == len(ensembl_gtf)
+
+
+def test_iter_gtf_same_columns(ensembl_chunks: list[pd.DataFrame], ensembl_gtf: pd.DataFrame):
+    for chunk in ensembl_chunks:
+        pd.testing.assert_index_equal(chunk.columns, ensembl_gtf.columns)
+        pd.testing.assert_series_equal(chunk.dtypes, ensembl_chunks[0].dtypes)
+
+
+def test_iter_gtf_values(ensembl_chunks: list[pd.DataFrame], ensembl_gtf: pd.DataFrame):
+    streamed = pd.concat(ensembl_chunks)
+    assert streamed["gene_name"].tolist() == ensembl_gtf["gene_name"].tolist()
+    assert streamed["exon_number"].tolist() == [str(x).removesuffix(".0") for x in ensembl_gtf["exon_number"]]
+
+
+def test_iter_gtf_usecols_and_features():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        chunks = list(iter_gtf(gtf, chunksize=200, features={"CDS"}, usecols=["start", "protein_id", "not_a_key"]))
+    for chunk in chunks:
+        assert list(chunk.columns) == ["start", "protein_id", "not_a_key"]
+        assert (chunk["not_a_key"] == "").all()
+    assert all((chunk["protein_id"] != "").all() for chunk in chunks)
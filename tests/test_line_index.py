@@ -0,0 +1,103 @@
+import os
+from importlib.resources import as_file, files
+from math import ceil
+from pathlib import Path
+
+import pandas.testing as pdt
+import pytest
+
+from gtfparse.line_index import build_line_index, line_index_path, load_line_index, open_byte_ranges
+from gtfparse.read_gtf import _iter_chunks, parse_gtf, read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def multi_seqname_gtf(tmp_path: Path) -> Path:
+    """
+    The Ensembl test GTF with its rows spread over several seqnames, one of
+    which comes back after another seqname
+    """
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        lines = Path(gtf).read_text().splitlines(keepends=True)
+    seqnames = ["1", "2", "1", "X"]
+    quarter = ceil(len(lines) / len(seqnames))
+    relabelled = [
+        line if line.startswith("#") else seqnames[i // quarter] + line[line.index("\t") :]
+        for i, line in enumerate(lines)
+    ]
+    filepath = tmp_path / "multi.gtf"
+    filepath.write_text("".join(relabelled))
+    return filepath
+
+
+def test_build_line_index(multi_seqname_gtf: Path):
+    index_path = build_line_index(multi_seqname_gtf)
+    assert index_path == line_index_path(multi_seqname_gtf)
+    index = load_line_index(multi_seqname_gtf)
+    df = parse_gtf(multi_seqname_gtf)
+
+    assert [run[0] for run in index.runs] == ["1", "2", "1", "X"]
+    assert sorted(index.seqnames) == ["1", "2", "X"]
+    assert index.n_rows() == len(df)
+    assert index.n_rows({"1"}, {"exon"}) == ((df["seqname"] == "1") & (df["feature"] == "exon")).sum()
+    with open_byte_ranges(multi_seqname_gtf, index.byte_ranges({"2"})) as data:
+        lines = data.read().decode().splitlines()
+    assert len(lines) == index.n_rows({"2"})
+    assert all(line.startswith("2\t") for line in lines)
+
+
+def test_parse_with_line_index(multi_seqname_gtf: Path):
+    without_index = read_gtf(multi_seqname_gtf, seqnames={"1", "X"})
+    build_line_index(multi_seqname_gtf)
+    with_index = read_gtf(multi_seqname_gtf, seqnames={"1", "X"})
+    pdt.assert_frame_equal(with_index, without_index)
+    assert set(with_index["seqname"]) == {"1", "X"}
+
+
+def test_malformed_lines_are_not_counted(tmp_path: Path):
+    # lines with more than nine fields are skipped by the parser, so they
+    # mustn't shift the row labels of the records after them
+    rows = [
+        '1\tsrc\texon\t1\t10\t.\t+\t.\tgene_id "A";',
+        '2\tsrc\texon\t1\t10\t.\t+\t.\tgene_id "B";\textra',
+        '2\tsrc\texon\t1\t10\t.\t+\t.\tgene_id "C"; # a comment\twith\ttabs',
+        '2\tsrc\texon\t1\t10\t.\t+\t.\tgene_id "D";',
+    ]
+    filepath = tmp_path / "malformed.gtf"
+    filepath.write_text("\n".join(rows) + "\n")
+    without_index = read_gtf(filepath, seqnames={"2"})
+    build_line_index(filepath)
+    assert load_line_index(filepath).n_rows() == len(parse_gtf(filepath))
+    with_index = read_gtf(filepath, seqnames={"2"})
+    pdt.assert_frame_equal(with_index, without_index)
+    assert with_index["gene_id"].tolist() == ["C", "D"]
+
+
+def test_exact_chunk_count(multi_seqname_gtf: Path):
+    build_line_index(multi_seqname_gtf)
+    index = load_line_index(multi_seqname_gtf)
+    chunks = list(_iter_chunks(multi_seqname_gtf, chunksize=100, seqnames={"2"}))
+    assert len(chunks) == ceil(index.n_rows({"2"}) / 100)
+
+
+def test_stale_line_index(multi_seqname_gtf: Path):
+    build_line_index(multi_seqname_gtf)
+    assert load_line_index(multi_seqname_gtf) is not None
+    with open(multi_seqname_gtf, "a") as gtf:
+        gtf.write('2\tsrc\texon\t1\t10\t.\t+\t.\tgene_id "G";\n')
+    assert load_line_index(multi_seqname_gtf) is None
+    # the row added at the end is still found, since the stale index is ignored
+    n_rows = sum(line.startswith("2\t") for line in multi_seqname_gtf.read_text().splitlines())
+    assert len(read_gtf(multi_seqname_gtf, seqnames={"2"})) == n_rows
+
+    build_line_index(multi_seqname_gtf)
+    stat = multi_seqname_gtf.stat()
+    os.utime(multi_seqname_gtf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_line_index(multi_seqname_gtf) is None
+
+
+def test_compressed_files_are_not_line_indexed():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        with pytest.raises(ValueError, match="tabix"):
+            build_line_index(gtf)
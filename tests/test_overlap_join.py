@@ -0,0 +1,87 @@
+from importlib.resources import as_file, files
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gtfparse.interval_index import GtfIndex
+from gtfparse.overlap_join import overlap_join
+from gtfparse.read_gtf import read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture
+def ensembl_gtf() -> pd.DataFrame:
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        return read_gtf(gtf).astype({"seqname": str})
+
+
+@pytest.fixture
+def variants() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"seqname": ["1", "1", "1", "2"], "position": [12_000, 14_500, 1, 12_000], "ref": ["A", "C", "G", "T"]},
+        index=["v1", "v2", "v3", "v4"],
+    )
+
+
+def overlapping(gtf: pd.DataFrame, seqname: str, position: int) -> pd.DataFrame:
+    return gtf[(gtf["seqname"] == seqname) & (gtf["start"] <= position) & (gtf["end"] >= position)]
+
+
+def test_join_positions(ensembl_gtf: pd.DataFrame, variants: pd.DataFrame):
+    joined = overlap_join(variants, ensembl_gtf)
+    expected = sum(
+        len(overlapping(ensembl_gtf, seqname, position))
+        for seqname, position in zip(variants["seqname"], variants["position"], strict=True)
+    )
+    assert len(joined) == expected
+    assert set(joined.index) <= {"v1", "v2"}
+    assert list(joined.columns[:3]) == ["seqname", "position", "ref"]
+    assert ((joined["start"] <= joined["position"]) & (joined["end"] >= joined["position"])).all()
+    v1 = overlapping(ensembl_gtf, "1", 12_000)
+    assert sorted(joined.loc[["v1"], "feature"]) == sorted(v1["feature"])
+
+
+def test_join_features_and_strand(ensembl_gtf: pd.DataFrame, variants: pd.DataFrame):
+    exons = overlap_join(variants, ensembl_gtf, features={"exon"}, columns=["feature", "strand", "transcript_id"])
+    assert list(exons.columns) == ["seqname", "position", "ref", "feature", "strand", "transcript_id"]
+    assert set(exons["feature"]) == {"exon"}
+
+    # a prebuilt index gives the same overlaps, though not necessarily in the
+    # same order within a query
+    index = GtfIndex.from_dataframe(ensembl_gtf)
+    reused = overlap_join(
+        variants, ensembl_gtf, features={"exon"}, columns=["feature", "strand", "transcript_id"], index=index
+    )
+    pd.testing.assert_frame_equal(
+        reused.rename_axis("variant").sort_values(["variant", "transcript_id"]),
+        exons.rename_axis("variant").sort_values(["variant", "transcript_id"]),
+    )
+
+    minus = overlap_join(variants, ensembl_gtf, strand="-")
+    assert set(minus["strand"]) <= {"-"}
+    stranded = variants.assign(strand=["+", "-", "+", "+"])
+    same = overlap_join(stranded, ensembl_gtf, strand="same")
+    assert (same["strand"] == same["strand_gtf"]).all()
+    with pytest.raises(ValueError, match="needs a 'strand' column"):
+        overlap_join(variants, ensembl_gtf, strand="same")
+
+
+def test_join_tuples(ensembl_gtf: pd.DataFrame):
+    points = overlap_join([("1", 12_000)], ensembl_gtf)
+    intervals = overlap_join([("1", 11_990, 12_000)], ensembl_gtf)
+    assert len(points) == len(overlapping(ensembl_gtf, "1", 12_000))
+    assert len(intervals) >= len(points)
+    assert list(intervals.columns[:3]) == ["seqname", "start", "end"]
+    assert "start_gtf" in intervals.columns
+
+
+def test_join_many_positions(ensembl_gtf: pd.DataFrame):
+    rng = np.random.default_rng(0)
+    positions = pd.DataFrame({"seqname": "1", "position": rng.integers(1, 100_000, 10_000)})
+    joined = overlap_join(positions, ensembl_gtf, features={"gene"})
+    counts = joined.groupby(level=0).size().reindex(positions.index, fill_value=0)
+    genes = ensembl_gtf[ensembl_gtf["feature"] == "gene"]
+    expected = [((genes["start"] <= p) & (genes["end"] >= p)).sum() for p in positions["position"][:200]]
+    assert counts.iloc[:200].tolist() == expected
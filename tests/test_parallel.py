@@ -0,0 +1,45 @@
+from importlib.resources import as_file, files
+from itertools import pairwise
+from pathlib import Path
+
+import pandas.testing as pdt
+import pytest
+
+from gtfparse.parallel import byte_ranges
+from gtfparse.read_gtf import read_gtf
+
+# ruff: noqa: S101
+
+
+@pytest.fixture(params=["refseq.ucsc.small.gtf", "B16.stringtie.head.gtf"])
+def gtf_path(request: pytest.FixtureRequest):
+    with as_file(files("tests.data").joinpath(request.param)) as gtf:
+        yield Path(gtf)
+
+
+def test_byte_ranges_split_on_newlines(gtf_path: Path):
+    data = gtf_path.read_bytes()
+    ranges = byte_ranges(gtf_path, 7)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in pairwise(ranges):
+        assert end == start
+        assert data[end - 1 : end] == b"\n"
+
+
+def test_parallel_matches_serial(gtf_path: Path):
+    serial = read_gtf(gtf_path)
+    parallel = read_gtf(gtf_path, n_jobs=3, chunksize=16)
+    pdt.assert_frame_equal(parallel, serial)
+
+
+def test_parallel_with_usecols_and_features(gtf_path: Path):
+    usecols = ["seqname", "start", "end", "gene_id", "attribute"]
+    serial = read_gtf(gtf_path, usecols=usecols, features={"exon"})
+    parallel = read_gtf(gtf_path, usecols=usecols, features={"exon"}, n_jobs=3)
+    pdt.assert_frame_equal(parallel, serial)
+
+
+def test_parallel_falls_back_for_compressed_files():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        pdt.assert_frame_equal(read_gtf(gtf, n_jobs=2), read_gtf(gtf))
@@ -173,3 +173,20 @@ def bad_gtf_text_too_few_fields(gtf_text: str) -> str:
 def test_parse_bad_gtf_error_too_few_fields(bad_gtf_text_too_few_fields: str):
     with pytest.raises(ParsingError):
         parse_gtf(StringIO(bad_gtf_text_too_few_fields))
+
+
+def test_parsed_gtf_frame(parsed_gtf: pd.DataFrame):
+    pdt.assert_series_equal(parsed_gtf["frame"], pd.Series([0, 0], name="frame", dtype=np.int64))
+
+
+def test_core_columns_keep_their_text():
+    parsed = parse_gtf(StringIO('NA\tnan\tCDS\t1\t9\t0.5\t-\t2\tgene_id "G1";\n'))
+    assert parsed.loc[0, "seqname"] == "NA"
+    assert parsed.loc[0, "source"] == "nan"
+    assert parsed.loc[0, "score"] == "0.5"
+    assert parsed.loc[0, "frame"] == 2  # noqa: PLR2004
+
+
+def test_parse_bad_gtf_error_bad_frame(gtf_text: str):
+    with pytest.raises(ParsingError):
+        parse_gtf(StringIO(gtf_text.replace("+\t.\t", "+\t3\t", 1)))
@@ -46,3 +46,14 @@ def check_float_cov_and_FPKM(b16_float_gtf):  # noqa: N802
             assert isinstance(i.FPKM, float)
             assert i.cov >= 0
             assert i.FPKM >= 0
+
+
+def test_b16_inferred_types():
+    with as_file(files("tests.data").joinpath("B16.stringtie.head.gtf")) as gtf:
+        df = read_gtf(gtf, infer_types=True)
+    assert df["cov"].dtype == "Float64"
+    assert df["FPKM"].dtype == "Float64"
+    assert df["exon_number"].dtype == "Int64"
+    # transcripts have no exon_number and exons no FPKM
+    assert df.loc[df["feature"] == "transcript", "exon_number"].isna().all()
+    assert df.loc[df["feature"] == "exon", "FPKM"].isna().all()
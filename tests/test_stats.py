@@ -0,0 +1,98 @@
+import json
+from importlib.resources import as_file, files
+from pathlib import Path
+
+import pytest
+
+from gtfparse.line_index import build_line_index
+from gtfparse.read_gtf import iter_gtf, read_gtf
+from gtfparse.stats import ParseStats, StageStats
+
+# ruff: noqa: S101
+
+EXPANDED_STAGES = ["read", "concat", "repair", "expand_attributes", "concat_attributes", "finish"]
+
+
+@pytest.fixture
+def gtf_path(tmp_path: Path) -> Path:
+    # copied so that line indexes and caches don't end up in the test data
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        filepath = tmp_path / "ensembl.gtf"
+        filepath.write_bytes(Path(gtf).read_bytes())
+    return filepath
+
+
+def test_read_gtf_stats(gtf_path: Path):
+    stats = ParseStats()
+    df = read_gtf(gtf_path, features={"exon"}, chunksize=100, stats=stats)
+
+    assert list(stats.stages) == EXPANDED_STAGES
+    assert stats.bytes_read == gtf_path.stat().st_size
+    read = stats.stages["read"]
+    assert read.rows_in == len(read_gtf(gtf_path))
+    assert read.rows_out == stats.stages["finish"].rows_out == len(df)
+    assert all(stage.wall_time >= 0 and stage.cpu_time >= 0 for stage in stats.stages.values())
+    assert stats.wall_time == sum(stage.wall_time for stage in stats.stages.values())
+    assert stats.peak_rss is None or stats.peak_rss > 0
+
+    summary = json.loads(json.dumps(stats.to_dict()))
+    assert [stage["name"] for stage in summary["stages"]] == EXPANDED_STAGES
+
+
+def test_compressed_and_buffered_stats(gtf_path: Path):
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        stats = ParseStats()
+        read_gtf(gtf, stats=stats)
+    # bytes of text, after decompression
+    assert stats.bytes_read == gtf_path.stat().st_size
+
+    stats = ParseStats()
+    with open(gtf_path) as lines:
+        read_gtf(lines, expand_attribute_column=False, stats=stats)
+    assert stats.bytes_read == gtf_path.stat().st_size
+    assert "expand_attributes" not in stats.stages
+
+
+def test_callback(gtf_path: Path):
+    calls: list[tuple[str, int]] = []
+
+    def record(stats: ParseStats, stage: StageStats) -> None:
+        assert stats.stages[stage.name] is stage
+        calls.append((stage.name, stage.rows_in))
+
+    chunksize = 200
+    df = read_gtf(gtf_path, chunksize=chunksize, stats=ParseStats(callback=record))
+    read_calls = [rows_in for name, rows_in in calls if name == "read"]
+    # once per chunk, with running totals, and once more finding the end
+    assert read_calls == sorted(read_calls)
+    assert len(read_calls) == -(-len(df) // chunksize) + 1
+    assert [name for name, _ in calls if name != "read"] == EXPANDED_STAGES[1:]
+
+
+def test_line_index_bytes(gtf_path: Path):
+    build_line_index(gtf_path)
+    stats = ParseStats()
+    df = read_gtf(gtf_path, seqnames={"1"}, stats=stats)
+    assert stats.bytes_read <= gtf_path.stat().st_size
+    assert stats.stages["read"].rows_in == stats.stages["read"].rows_out == len(df)
+
+
+def test_iter_gtf_stats(gtf_path: Path):
+    stats = ParseStats()
+    n_rows = sum(len(chunk) for chunk in iter_gtf(gtf_path, chunksize=300, stats=stats))
+    assert list(stats.stages) == ["read", "repair", "expand_attributes"]
+    assert all(stage.rows_out == n_rows for stage in stats.stages.values())
+    assert stats.bytes_read == gtf_path.stat().st_size
+
+
+def test_parallel_and_cached_stats(gtf_path: Path, tmp_path: Path):
+    stats = ParseStats()
+    df = read_gtf(gtf_path, n_jobs=2, cache_dir=tmp_path / "cache", stats=stats)
+    assert list(stats.stages) == ["cache_load", "parallel_parse", "cache_save", "finish"]
+    assert stats.stages["parallel_parse"].rows_out == len(df)
+
+    stats = ParseStats()
+    read_gtf(gtf_path, n_jobs=2, cache_dir=tmp_path / "cache", stats=stats)
+    assert list(stats.stages) == ["cache_load", "finish"]
+    assert stats.stages["cache_load"].rows_out == len(df)
+    assert stats.bytes_read == 0
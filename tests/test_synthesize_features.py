@@ -0,0 +1,132 @@
+import pandas as pd
+import pytest
+from loguru import logger
+
+from gtfparse.create_missing_features import create_missing_features
+from gtfparse.logging import init_logger
+from gtfparse.synthesize_features import synthesize_features
+
+# ruff: noqa: S101
+
+logger.disable("gtfparse")
+init_logger(verbose=3, save=False)
+logger.enable("gtfparse")
+
+
+@pytest.fixture
+def exons_and_cds() -> pd.DataFrame:
+    # T1: + strand, three exons, CDS from the middle of exon 1 to the middle of
+    # exon 3; T2: - strand, two exons, CDS within exon 2; T3: non-coding
+    rows = [
+        ("exon", 100, 200, "+", "T1", "G1"),
+        ("exon", 300, 400, "+", "T1", "G1"),
+        ("exon", 500, 600, "+", "T1", "G1"),
+        ("CDS", 150, 200, "+", "T1", "G1"),
+        ("CDS", 300, 400, "+", "T1", "G1"),
+        ("CDS", 500, 547, "+", "T1", "G1"),
+        ("stop_codon", 548, 550, "+", "T1", "G1"),
+        ("exon", 1000, 1100, "-", "T2", "G2"),
+        ("exon", 1200, 1300, "-", "T2", "G2"),
+        ("CDS", 1220, 1280, "-", "T2", "G2"),
+        ("exon", 150, 250, "+", "T3", "G1"),
+    ]
+    feature, start, end, strand, transcript_id, gene_id = zip(*rows, strict=True)
+    return pd.DataFrame(
+        {
+            "seqname": ["1"] * len(rows),
+            "source": ["src"] * len(rows),
+            "feature": feature,
+            "start": start,
+            "end": end,
+            "score": ["."] * len(rows),
+            "strand": pd.Categorical(strand),
+            "frame": [0] * len(rows),
+            "gene_id": gene_id,
+            "transcript_id": transcript_id,
+            "gene_name": ["A"] * 7 + ["B"] * 3 + ["A"],
+            "transcript_name": ["A-1"] * 7 + ["B-1"] * 3 + ["A-2"],
+        }
+    )
+
+
+def spans(df: pd.DataFrame, feature: str, key: str = "transcript_id") -> list[tuple]:
+    rows = df[df["feature"] == feature].sort_values([key, "start"])
+    return list(zip(rows[key], rows["start"], rows["end"], strict=True))
+
+
+def test_hierarchy_matches_create_missing_features(exons_and_cds):
+    df = synthesize_features(
+        exons_and_cds,
+        extra_columns={"gene": {"gene_name"}, "transcript": {"gene_name", "transcript_name"}},
+    )
+    expected = create_missing_features(
+        exons_and_cds,
+        unique_keys={"gene": "gene_id", "transcript": "transcript_id"},
+        extra_columns={"gene": {"gene_name"}, "transcript": {"gene_name", "transcript_name"}},
+    )
+    for feature, key in [("transcript", "transcript_id"), ("gene", "gene_id")]:
+        columns = ["seqname", "source", "start", "end", "strand", key, "gene_name"]
+        pd.testing.assert_frame_equal(
+            df[df["feature"] == feature][columns].sort_values(key).reset_index(drop=True).astype(object),
+            expected[expected["feature"] == feature][columns].sort_values(key).reset_index(drop=True).astype(object),
+        )
+    transcripts = df[df["feature"] == "transcript"].set_index("transcript_id")
+    assert transcripts["gene_id"].to_dict() == {"T1": "G1", "T2": "G2", "T3": "G1"}
+    assert transcripts["transcript_name"].to_dict() == {"T1": "A-1", "T2": "B-1", "T3": "A-2"}
+    # the original rows come first, unchanged
+    pd.testing.assert_frame_equal(df.iloc[: len(exons_and_cds)].astype(object), exons_and_cds.astype(object))
+
+
+def test_gene_without_transcripts(exons_and_cds):
+    gene_only = exons_and_cds.iloc[[0]].assign(
+        feature="CDS", start=5000, end=5100, gene_id="G3", transcript_id="", gene_name="C"
+    )
+    # a row of G1 outside any transcript widens the gene
+    stray = exons_and_cds.iloc[[0]].assign(start=50, transcript_id="")
+    rows = pd.concat([exons_and_cds, gene_only, stray], ignore_index=True)
+    df = synthesize_features(rows, extra_columns={"gene": {"gene_name"}})
+    expected = create_missing_features(rows, unique_keys={"gene": "gene_id"}, extra_columns={"gene": {"gene_name"}})
+    assert spans(df, "gene", "gene_id") == [("G1", 50, 600), ("G2", 1000, 1300), ("G3", 5000, 5100)]
+    assert spans(df, "gene", "gene_id") == spans(expected, "gene", "gene_id")
+    genes = df[df["feature"] == "gene"].set_index("gene_id")
+    assert genes["gene_name"].to_dict() == {"G1": "A", "G2": "B", "G3": "C"}
+
+
+def test_genes_from_existing_transcripts(exons_and_cds):
+    with_transcripts = synthesize_features(exons_and_cds)
+    without_genes = with_transcripts[with_transcripts["feature"] != "gene"]
+    df = synthesize_features(without_genes)
+    assert spans(df, "transcript") == spans(with_transcripts, "transcript")
+    assert spans(df, "gene", "gene_id") == [("G1", 100, 600), ("G2", 1000, 1300)]
+
+
+def test_introns(exons_and_cds):
+    df = synthesize_features(exons_and_cds, introns=True)
+    assert spans(df, "intron") == [("T1", 201, 299), ("T1", 401, 499), ("T2", 1101, 1199)]
+    assert df.loc[df["feature"] == "intron", "gene_id"].tolist() == ["G1", "G1", "G2"]
+
+
+def test_overlapping_exons_make_no_intron(exons_and_cds):
+    exons = exons_and_cds[exons_and_cds["transcript_id"] == "T1"].copy()
+    exons.loc[exons.index[0], "end"] = 450
+    df = synthesize_features(exons, introns=True)
+    assert spans(df, "intron") == [("T1", 451, 499)]
+
+
+def test_utrs(exons_and_cds):
+    df = synthesize_features(exons_and_cds, utrs=True)
+    # + strand: 5' UTR before the CDS and 3' UTR after the stop codon; - strand
+    # the other way round; nothing for the non-coding transcript
+    assert spans(df, "five_prime_utr") == [("T1", 100, 149), ("T2", 1281, 1300)]
+    assert spans(df, "three_prime_utr") == [("T1", 551, 600), ("T2", 1000, 1100), ("T2", 1200, 1219)]
+
+
+def test_existing_features_are_not_created_again(exons_and_cds):
+    df = synthesize_features(exons_and_cds, introns=True, utrs=True)
+    again = synthesize_features(df, introns=True, utrs=True)
+    assert len(again) == len(df)
+
+
+def test_missing_extra_column(exons_and_cds):
+    with pytest.raises(ValueError, match="does not exist"):
+        synthesize_features(exons_and_cds, extra_columns={"gene": {"gene_biotype"}})
@@ -0,0 +1,170 @@
+import struct
+from importlib.resources import as_file, files
+from pathlib import Path
+
+import pandas.testing as pdt
+import pytest
+
+from gtfparse.bgzf import BgzfWriter
+from gtfparse.parsing_error import ParsingError
+from gtfparse.read_gtf import read_gtf
+from gtfparse.tabix import (
+    CSI_MAGIC,
+    TabixIndex,
+    build_tabix_index,
+    fetch_region,
+    parse_region,
+    read_tabix_index,
+    reg2bin,
+    reg2bins,
+)
+
+# ruff: noqa: S101
+
+# the first bins of the two deepest levels, as numbered by htslib
+FIRST_16KB_BIN = 4681
+FIRST_128KB_BIN = 585
+
+
+def sorted_lines() -> list[str]:
+    """
+    The Ensembl test GTF sorted by start, and again on a second sequence
+    starting further along
+    """
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf")) as gtf:
+        lines = [line for line in Path(gtf).read_text().splitlines(keepends=True) if not line.startswith("#")]
+    lines.sort(key=lambda line: int(line.split("\t")[3]))
+    shifted = []
+    for line in lines:
+        fields = line.split("\t")
+        fields[0] = "2"
+        fields[3] = str(int(fields[3]) + 10_000_000)
+        fields[4] = str(int(fields[4]) + 10_000_000)
+        shifted.append("\t".join(fields))
+    return ["#!genome-build GRCh37\n", *lines, *shifted]
+
+
+@pytest.fixture
+def bgzipped_gtf(tmp_path: Path) -> Path:
+    filepath = tmp_path / "sorted.gtf.gz"
+    with BgzfWriter(filepath) as writer:
+        writer.write("".join(sorted_lines()).encode())
+    build_tabix_index(filepath)
+    return filepath
+
+
+def overlapping(seqname: str, start: int, end: int) -> list[str]:
+    return [
+        line
+        for line in sorted_lines()[1:]
+        if line.split("\t")[0] == seqname and int(line.split("\t")[3]) <= end and int(line.split("\t")[4]) >= start
+    ]
+
+
+def test_parse_region():
+    assert parse_region("chr7:55,000,000-55,300,000") == ("chr7", 55_000_000, 55_300_000)
+    assert parse_region("chr1") == ("chr1", 1, None)
+    assert parse_region("chr1:1000") == ("chr1", 1000, None)
+    with pytest.raises(ValueError, match="empty"):
+        parse_region("chr1:200-100")
+
+
+def test_bins():
+    # bins as computed by htslib
+    assert reg2bin(0, 1) == FIRST_16KB_BIN
+    assert reg2bin(0, 1 << 14) == FIRST_16KB_BIN
+    assert reg2bin(0, (1 << 14) + 1) == FIRST_128KB_BIN
+    assert reg2bin(0, 1 << 29) == 0
+    assert reg2bins(0, 1) == [0, 1, 9, 73, FIRST_128KB_BIN, FIRST_16KB_BIN]
+
+
+@pytest.mark.parametrize(
+    "region",
+    ["1:1-20000", "1:30000-35000", "1:100000", "2:10012000-10013000", "2:1-100", "1", "3:1-1000"],
+)
+def test_fetch_region(bgzipped_gtf: Path, region: str):
+    seqname, start, end = parse_region(region)
+    assert list(fetch_region(bgzipped_gtf, region)) == overlapping(seqname, start, end or 1 << 29)
+
+
+def test_index_contents(bgzipped_gtf: Path):
+    index = read_tabix_index(bgzipped_gtf.with_name(bgzipped_gtf.name + ".tbi"))
+    assert index.seqnames == ["1", "2"]
+    assert index.columns == (1, 4, 5)
+    assert index.meta_char == "#"
+    assert not index.zero_based
+    # the linear index only ever moves forward through the file
+    assert all(a <= b for a, b in zip(index.min_offsets[0], index.min_offsets[0][1:], strict=False))
+
+
+def write_csi(index: TabixIndex, filepath: Path) -> None:
+    """
+    The same index in the .csi layout, with the smallest offset of each bin
+    in place of the linear index
+    """
+    names = b"".join(seqname.encode() + b"\0" for seqname in index.seqnames)
+    aux = struct.pack("<7i", 0, 1, 4, 5, ord("#"), 0, len(names)) + names
+    pieces = [CSI_MAGIC, struct.pack("<3i", index.min_shift, index.depth, len(aux)), aux]
+    pieces.append(struct.pack("<i", len(index.seqnames)))
+    for bins in index.bins:
+        pieces.append(struct.pack("<i", len(bins)))
+        for bin_id, chunks in bins.items():
+            pieces.append(struct.pack("<IQi", bin_id, min(chunk[0] for chunk in chunks), len(chunks)))
+            pieces.extend(struct.pack("<2Q", *chunk) for chunk in chunks)
+    with BgzfWriter(filepath) as writer:
+        writer.write(b"".join(pieces))
+
+
+def test_csi_index(bgzipped_gtf: Path):
+    tbi = bgzipped_gtf.with_name(bgzipped_gtf.name + ".tbi")
+    csi = bgzipped_gtf.with_name(bgzipped_gtf.name + ".csi")
+    write_csi(read_tabix_index(tbi), csi)
+    tbi.unlink()
+    index = read_tabix_index(csi)
+    assert index.seqnames == ["1", "2"]
+    assert not any(index.min_offsets)
+    assert list(fetch_region(bgzipped_gtf, "1:30000-35000")) == overlapping("1", 30000, 35000)
+
+
+def test_read_gtf_region(bgzipped_gtf: Path):
+    start, end = 30_000, 35_000
+    df = read_gtf(bgzipped_gtf, region=f"1:{start:,}-{end:,}")
+    everything = read_gtf(bgzipped_gtf)
+    expected = everything[(everything["seqname"] == "1") & (everything["start"] <= end) & (everything["end"] >= start)]
+    assert len(df) == len(expected) > 0
+    pdt.assert_frame_equal(
+        df[["seqname", "feature", "start", "end"]].reset_index(drop=True),
+        expected[["seqname", "feature", "start", "end"]].reset_index(drop=True),
+    )
+
+
+def test_missing_index(tmp_path: Path):
+    filepath = tmp_path / "unindexed.gtf.gz"
+    with BgzfWriter(filepath) as writer:
+        writer.write("".join(sorted_lines()).encode())
+    with pytest.raises(FileNotFoundError, match="build_tabix_index"):
+        read_gtf(filepath, region="1:1-1000")
+
+
+def test_skipped_header_lines(tmp_path: Path):
+    filepath = tmp_path / "with_header.gtf.gz"
+    header = "seqname\tsource\tfeature\tstart\tend\tscore\tstrand\tframe\tattribute\n"
+    with BgzfWriter(filepath) as writer:
+        writer.write("".join([header, *sorted_lines()[1:]]).encode())
+    build_tabix_index(filepath, skip=1)
+    index = read_tabix_index(filepath.with_name(filepath.name + ".tbi"))
+    assert index.skip == 1
+    assert list(fetch_region(filepath, "1:1-20000", index=index)) == overlapping("1", 1, 20000)
+
+    # a chunk from the very start of the file begins with the header line
+    whole_file = TabixIndex(index.seqnames, [{0: [(0, 1 << 62)]}, {}], skip=1)
+    assert list(fetch_region(filepath, "1:1-20000", index=whole_file)) == overlapping("1", 1, 20000)
+
+
+def test_unsorted(tmp_path: Path):
+    filepath = tmp_path / "unsorted.gtf.gz"
+    lines = sorted_lines()[1:]
+    with BgzfWriter(filepath) as writer:
+        writer.write("".join([*lines[1:], lines[0]]).encode())
+    with pytest.raises(ParsingError, match="not sorted"):
+        build_tabix_index(filepath)
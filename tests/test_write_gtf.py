@@ -0,0 +1,115 @@
+import gzip
+from importlib.resources import as_file, files
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from gtfparse import write_gtf
+from gtfparse.bgzf import BGZF_EOF
+from gtfparse.read_gtf import iter_gtf, read_gtf
+from gtfparse.required_columns import REQUIRED_COLUMNS
+from gtfparse.write_gtf import df_to_gtf, extract_seq_info, format_gtf_lines
+
+# ruff: noqa: S101
+
+
+@pytest.fixture(params=["B16.stringtie.head.gtf", "ensembl_grch37.head.gtf.gz", "refseq.ucsc.small.gtf"])
+def gtf_df(request: pytest.FixtureRequest) -> pd.DataFrame:
+    with as_file(files("tests.data").joinpath(request.param)) as gtf:
+        return read_gtf(gtf)
+
+
+@pytest.fixture
+def odd_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "seqname": ["1", "2"],
+            "source": ["havana", None],
+            "feature": ["gene", "exon"],
+            "start": [1, 2],
+            "end": [3, 4],
+            "score": np.array([0.1, np.nan], dtype=np.float32),
+            "strand": pd.Categorical(["+", None]),
+            "frame": [0, 1],
+            "gene_id": ["G1", np.nan],
+            "level": [1.5, 2.0],
+        }
+    )
+
+
+def test_written_gtf_matches_extract_seq_info(gtf_df: pd.DataFrame, tmp_path: Path):
+    df_to_gtf(gtf_df, tmp_path / "out.gtf")
+    assert (tmp_path / "out.gtf").read_text() == "".join(gtf_df.apply(extract_seq_info, axis=1))
+
+
+def test_format_matches_extract_seq_info(odd_df: pd.DataFrame):
+    assert format_gtf_lines(odd_df) == "".join(odd_df.apply(extract_seq_info, axis=1))
+
+
+def test_format_without_attributes(odd_df: pd.DataFrame):
+    assert format_gtf_lines(odd_df.iloc[:1, :8]) == "1\thavana\tgene\t1\t3\t0.10000000149011612\t+\t0\t\n"
+
+
+def test_gtf_format_round_trip(gtf_df: pd.DataFrame, tmp_path: Path):
+    df_to_gtf(gtf_df, tmp_path / "out.gtf", format="gtf")
+    pdt.assert_frame_equal(read_gtf(tmp_path / "out.gtf"), gtf_df)
+
+
+def test_gtf_format_skips_missing_values(odd_df: pd.DataFrame):
+    assert format_gtf_lines(odd_df, format="gtf").splitlines() == [
+        '1\thavana\tgene\t1\t3\t0.10000000149011612\t+\t0\tgene_id "G1"; level "1.5";',
+        '2\t.\texon\t2\t4\t.\t.\t1\tlevel "2";',
+    ]
+
+
+def test_gtf_format_repeats_keys():
+    df = pd.DataFrame(
+        [["1", "x", "exon", 1, 2, ".", "+", 0, "T1", "basic,CCDS"]],
+        columns=[*REQUIRED_COLUMNS[:8], "transcript_id", "tag"],
+    )
+    assert format_gtf_lines(df, format="gtf").endswith('transcript_id "T1"; tag "basic"; tag "CCDS";\n')
+
+
+def test_gff3_format_escapes_values(odd_df: pd.DataFrame):
+    odd_df["note"] = ["a;b=c", ""]
+    assert format_gtf_lines(odd_df, format="gff3").splitlines() == [
+        "1\thavana\tgene\t1\t3\t0.10000000149011612\t+\t0\tgene_id=G1;level=1.5;note=a%3Bb%3Dc",
+        "2\t.\texon\t2\t4\t.\t.\t1\tlevel=2",
+    ]
+
+
+def test_gff3_output_starts_with_version(odd_df: pd.DataFrame):
+    output = StringIO()
+    df_to_gtf(odd_df, output, format="gff3")
+    lines = output.getvalue().splitlines(keepends=True)
+    assert lines[0] == "##gff-version 3\n"
+    assert "".join(lines[1:]) == format_gtf_lines(odd_df, format="gff3")
+
+
+def test_bgzf_output(gtf_df: pd.DataFrame, tmp_path: Path):
+    df_to_gtf(gtf_df, tmp_path / "out.gtf.gz", format="gtf")
+    compressed = (tmp_path / "out.gtf.gz").read_bytes()
+    assert compressed.endswith(BGZF_EOF)
+    assert gzip.decompress(compressed).decode() == format_gtf_lines(gtf_df, format="gtf")
+
+
+def test_streamed_chunks_to_handle():
+    with as_file(files("tests.data").joinpath("ensembl_grch37.head.gtf.gz")) as gtf:
+        output = StringIO()
+        df_to_gtf(iter_gtf(gtf, chunksize=100), output, format="gtf")
+        expected = format_gtf_lines(read_gtf(gtf), format="gtf")
+    assert output.getvalue() == expected
+
+
+@pytest.mark.parametrize("output_format", [None, "gtf"])
+def test_parallel_output_in_order(
+    gtf_df: pd.DataFrame, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, output_format: str | None
+):
+    monkeypatch.setattr(write_gtf, "WRITE_BLOCK_ROWS", 50)
+    df_to_gtf(gtf_df, tmp_path / "serial.gtf", format=output_format)
+    df_to_gtf(gtf_df, tmp_path / "parallel.gtf", format=output_format, n_jobs=3)
+    assert (tmp_path / "parallel.gtf").read_text() == (tmp_path / "serial.gtf").read_text()